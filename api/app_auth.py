@@ -4,6 +4,8 @@ from flask import url_for, session, redirect, request, Blueprint, jsonify, curre
 from authlib.integrations.base_client.errors import OAuthError  # <--- IMPORT ADDED
 from config import Config
 from utils.db import get_connection
+from utils import identity
+from models.senderNameModel.senderNameModel import SenderNames
 from psycopg2.extras import RealDictCursor
 from datetime import datetime
 import requests
@@ -90,6 +92,13 @@ def auth():
         # Connection is already closed in finally block if it existed
         return jsonify({'error': str(e)}), 500
 
+    # Resolve ID / role / tutor status once; later requests read them from the session
+    try:
+        identity.refresh()
+    except Exception as e:
+        identity.forget()
+        print(f"⚠️ [Auth] Could not resolve identity claims at login: {e}")
+
     # CLOUDFLARE FIX: Prevent caching of the redirect response
     # This ensures User A's session cookie isn't cached and served to User B.
     response = make_response(redirect(Config.FRONTEND_URL))
@@ -109,51 +118,19 @@ def get_user():
     if not user:
         return jsonify({'error': 'User not logged in'}), 401
 
-    # Default values
-    registered = False
-    id_number = None
-    role = "GUEST"
-    tutor_status = None
-    account_status = "ACTIVE"
-
     try:
-        conn = get_connection()
-        with conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                # Optimized Query: Get ID, Role, Account Status, and Tutor Status at once
-                query = """
-                    SELECT 
-                        te.id_number AS tutee_id,  -- Get ID from the Tutee table, not User Account
-                        ua.role,
-                        ua.status AS account_status,
-                        t.status AS tutor_status
-                    FROM user_account ua
-                    -- 1. Join Tutee using Google ID (Reliable)
-                    LEFT JOIN tutee te ON ua.google_id = te.google_id
-                    -- 2. Join Tutor using the ID found in Tutee
-                    LEFT JOIN tutor t ON te.id_number = t.tutor_id
-                    WHERE ua.google_id = %s
-                """
-                cursor.execute(query, (user['sub'],))
-                result = cursor.fetchone()
-
-                if result:
-                    registered = True
-                    id_number = result['tutee_id']
-                    role = result['role']
-                    account_status = result['account_status']
-                    tutor_status = result['tutor_status']  # Will be None if they aren't a tutor
-
+        # ID, Role, Account Status and Tutor Status, cached in the session since login
+        claims = identity.claims()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
     # Combine Google session data with DB data
     user_with_status = dict(user)
-    user_with_status['registered_tutee'] = registered
-    user_with_status['id_number'] = id_number
-    user_with_status['role'] = role
-    user_with_status['status'] = account_status
-    user_with_status['tutor_status'] = tutor_status
+    user_with_status['registered_tutee'] = claims['registered']
+    user_with_status['id_number'] = claims['id_number']
+    user_with_status['role'] = claims['role']
+    user_with_status['status'] = claims['status']
+    user_with_status['tutor_status'] = claims['tutor_status']  # None if they aren't a tutor
 
     # Return response with cache control
     response = make_response(jsonify(user_with_status))
@@ -193,6 +170,14 @@ def register_tutee():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+    SenderNames.invalidate(id_number)
+
+    # The user now has an id_number; update the cached claims
+    try:
+        identity.refresh()
+    except Exception:
+        identity.forget()  # resolved again on the next request
+
     return jsonify({'message': 'Tutee registered successfully'})
 
 @auth_bp.route('/logout')
@@ -201,6 +186,7 @@ def logout():
     Logs the user out by clearing the session.
     """
     session.pop('user', None)
+    identity.forget()
   
     response = make_response(redirect(Config.FRONTEND_URL))
     
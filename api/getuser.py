@@ -1,5 +1,9 @@
-from flask import Blueprint, jsonify, request,send_from_directory
+from flask import Blueprint, g, jsonify, request,send_from_directory
 from utils.db import get_connection
+from utils.db_stream import stream_query
+from utils.etag import versioned
+from models.tutorProfileModel.tutorProfileModel import TutorProfile
+from models.tutorReputationModel.tutorReputationModel import TutorReputation
 from psycopg2.extras import RealDictCursor ,Json
 import traceback
 import os
@@ -17,36 +21,27 @@ tutor_badges_bp = Blueprint('tutor_badges', __name__)
 @tutee_bp.route("/all")
 def get_all_tutees():
     try:
-        conn = get_connection()
-        with conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute("SELECT * FROM tutee")  # fetch all tutees
-                users = cursor.fetchall()
-        return jsonify(users)
+        # Streamed from a server-side cursor: memory stays flat however many tutees there are
+        return stream_query("SELECT * FROM tutee")
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
 
 
+def _encode_binary_columns(row):
+    for k, v in list(row.items()):
+        if isinstance(v, memoryview):
+            row[k] = base64.b64encode(v.tobytes()).decode("utf-8")
+        elif isinstance(v, (bytes, bytearray)):
+            row[k] = base64.b64encode(v).decode("utf-8")
+    return row
+
+
 @tutor_bp.route("/all")
 def get_all_tutors():
     try:
-        conn = get_connection()
-        with conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute("SELECT * FROM tutor")
-                tutors = cursor.fetchall()
-
-     
-        for row in tutors:
-            for k, v in list(row.items()):
-                if isinstance(v, memoryview):
-                    row[k] = base64.b64encode(v.tobytes()).decode("utf-8")
-                elif isinstance(v, (bytes, bytearray)):
-                    row[k] = base64.b64encode(v).decode("utf-8")
-
-        return jsonify(tutors), 200
+        return stream_query("SELECT * FROM tutor", transform=_encode_binary_columns)
 
     except Exception as e:
         import traceback
@@ -57,70 +52,16 @@ def get_all_tutors():
 
     
 @tutor_bp.route("/<tutor_id>")
+@versioned(("profile", "ratings", "badges"), "tutor_id")
 def get_tutor(tutor_id):
     try:
-        conn = get_connection()
-        with conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute("""
-                    SELECT 
-                        t.tutor_id,
-                        tt.first_name,
-                        tt.middle_name,
-                        tt.last_name,
-                        tt.year_level,
-                        tt.program_code,
-                        p.program_name,
-                        t.status,
-                        t.about,
-                        t.profile_img_url,  
-                        tt.google_id
-                    FROM tutor t
-                    JOIN tutee tt ON t.tutor_id = tt.id_number
-                    LEFT JOIN program p ON tt.program_code = p.program_code
-                    WHERE t.tutor_id = %s
-                """, (tutor_id,))
-                
-                tutor = cursor.fetchone()
-                if not tutor:
-                    return jsonify({"error": "Tutor not found"}), 404
+        # Profile, availability, courses, rating summary and badge counts in one
+        # round trip, cached per tutor and ETag (models/tutorProfileModel)
+        profile = TutorProfile.get(tutor_id, version=g.get("entity_etag"))
+        if not profile:
+            return jsonify({"error": "Tutor not found"}), 404
 
-                cursor.execute("""
-                    SELECT 
-                        vacant_id,
-                        day_of_week,
-                        start_time,
-                        end_time
-                    FROM availability
-                    WHERE tutor_id = %s
-                    ORDER BY day_of_week, start_time;
-                """, (tutor_id,))
-                availability = cursor.fetchall()
-
-                for slot in availability:
-                    slot["start_time"] = slot["start_time"].strftime("%H:%M:%S")
-                    slot["end_time"] = slot["end_time"].strftime("%H:%M:%S")
-
-                cursor.execute("SELECT course_code FROM teaches WHERE tutor_id = %s", (tutor_id,))
-                courses = [row["course_code"] for row in cursor.fetchall()]
-
-        response = {
-            "tutor_id": tutor["tutor_id"],
-            "first_name": tutor["first_name"],
-            "middle_name": tutor["middle_name"],
-            "last_name": tutor["last_name"],
-            "year_level": tutor["year_level"],
-            "program_code": tutor["program_code"],
-            "program_name": tutor["program_name"],
-            "status": tutor["status"],
-            "about": tutor["about"] or "",
-            "profile_img_url": tutor.get("profile_img_url"),  # ✅ add this
-            "google_id": tutor["google_id"],
-            "availability": availability,
-            "courses": courses
-        }
-
-        return jsonify(response), 200
+        return jsonify(profile), 200
 
     except Exception as e:
         traceback.print_exc()
@@ -186,6 +127,7 @@ def give_badges():
                     RETURNING id;
                 """, (tutee_id, tutor_id, friendly, punctual, engaging, proficient))
                 badge_id = cursor.fetchone()["id"]
+        TutorProfile.invalidate(tutor_id)
         return jsonify({"badge": badge_id}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -215,22 +157,22 @@ def get_badge_status(tutor_id, tutee_id):
 
 # === GET TOTAL BADGES PER TUTOR ===
 @tutor_bp.route("/badge_counts/<tutor_id>", methods=["GET"])
+@versioned("badges", "tutor_id")
 def get_badge_counts(tutor_id):
     try:
-        conn = get_connection()
-        with conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute("""
-                    SELECT
-                        COALESCE(SUM(CASE WHEN friendly THEN 1 ELSE 0 END), 0) AS friendly_count,
-                        COALESCE(SUM(CASE WHEN punctual THEN 1 ELSE 0 END), 0) AS punctual_count,
-                        COALESCE(SUM(CASE WHEN engaging THEN 1 ELSE 0 END), 0) AS engaging_count,
-                        COALESCE(SUM(CASE WHEN proficient THEN 1 ELSE 0 END), 0) AS proficient_count
-                    FROM tutor_badges
-                    WHERE tutor_id = %s
-                """, (tutor_id,))
-                counts = cursor.fetchone()
-        return jsonify(counts), 200
+        # Running totals kept by migration 0005 (models/tutorReputationModel)
+        return jsonify(TutorReputation.fetch(tutor_id).badge_counts()), 200
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
+
+# === GET RATING + BADGE SUMMARY PER TUTOR ===
+@tutor_bp.route("/reputation/<tutor_id>", methods=["GET"])
+@versioned(("ratings", "badges"), "tutor_id")
+def get_reputation(tutor_id):
+    try:
+        return jsonify(TutorReputation.fetch(tutor_id).to_api_response()), 200
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -267,6 +209,7 @@ def update_about():
                         SET about = %s
                         WHERE tutor_id = %s
                     """, (about, tutor_id))
+        TutorProfile.invalidate(tutor_id)
 
         return jsonify({"message": "Tutor info updated successfully"}), 200
     except Exception as e:
@@ -390,6 +333,7 @@ def update_profile_img():
                     SET profile_img_url = %s
                     WHERE tutor_id = %s
                 """, (out["public_url"], tutor_id))
+        TutorProfile.invalidate(tutor_id)
 
         return jsonify({
             "message": "Profile image updated successfully",
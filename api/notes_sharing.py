@@ -1,7 +1,9 @@
 from flask import Blueprint, jsonify, request, session
 from utils.db import get_connection
+from utils.db_stream import stream_query
+from utils import identity
+from utils.etag import versioned
 from utils.supabase_client import upload_file
-from psycopg2.extras import RealDictCursor
 
 notes_sharing = Blueprint('notes_sharing', __name__)
 
@@ -75,14 +77,13 @@ def upload_notes():
         return jsonify({"error": str(e)}), 500
     
 @notes_sharing.route("/get-notes/<tutor_id>", methods=['GET'])
+@versioned("notes", "tutor_id")
 def get_notes(tutor_id):
     try:
-        conn = get_connection()
-        with conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute("SELECT * FROM posted_notes WHERE tutor_id = %s ORDER BY date_posted DESC", (tutor_id,))
-                notes = cursor.fetchall()
-        return jsonify(notes), 200
+        return stream_query(
+            "SELECT * FROM posted_notes WHERE tutor_id = %s ORDER BY date_posted DESC",
+            (tutor_id,)
+        )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
     
@@ -108,13 +109,9 @@ def is_profile_owner(tutor_id):
         return jsonify({"is_owner": False}), 200
 
     try:
-        conn = get_connection()
-        with conn:
-            with conn.cursor() as cursor:
-                # Get the tutee's id_number using the google_id
-                cursor.execute("SELECT id_number FROM tutee WHERE google_id = %s", (user_google_id,))
-                result = cursor.fetchone()
-                is_owner = result is not None and str(result[0]) == str(tutor_id)
+        # The tutee's id_number comes from the session's identity claims
+        claims = identity.claims()
+        is_owner = bool(claims and claims["id_number"] is not None) and str(claims["id_number"]) == str(tutor_id)
         return jsonify({"is_owner": is_owner}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -4,6 +4,8 @@ import uuid
 import os
 from psycopg2.extras import RealDictCursor
 from utils.db import get_connection
+from utils.etag import conditional_json
+from models.catalogModel.catalogModel import Catalog
 from utils.supabase_client import upload_file
 
 tutor_application_bp = Blueprint("tutor_applications", __name__)
@@ -119,24 +121,13 @@ def submit_tutor_application():
 @tutor_application_bp.route('/courses', methods=['GET'])
 def get_courses():
     try:
-        conn = get_connection()
-        with conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute("""
-                    SELECT course_code, course_name 
-                    FROM course 
-                    ORDER BY course_code
-                """)
-                courses = cursor.fetchall()
+        catalog = Catalog.get()
+        return conditional_json(catalog.etag, lambda: {
+            'courses': catalog.courses,
+            'total': len(catalog.courses)
+        })
 
-        return jsonify({
-            'courses': courses,
-            'total': len(courses)
-        }), 200
-        
     except Exception as e:
-        if conn:
-            conn.close()
         return jsonify({
             'error': 'Failed to fetch courses',
             'details': str(e)
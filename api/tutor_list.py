@@ -1,10 +1,14 @@
 from flask import Blueprint, jsonify, request
-from utils.db import get_connection
+from utils.db import get_connection, read_replica
 from psycopg2.extras import RealDictCursor
+from models.catalogModel.catalogModel import Catalog
+from models.tutorReputationModel.tutorReputationModel import TutorReputation
+from utils.etag import conditional_json
 
 tutor_list = Blueprint('tutor_list', __name__)
 
 @tutor_list.route("/all")
+@read_replica
 def get_tutor_list():
     try:
         page = int(request.args.get('page', 1))
@@ -61,13 +65,16 @@ def get_tutor_list():
                 cursor.execute(count_query, params[:-2])  # Exclude LIMIT/OFFSET
                 total_tutors = cursor.fetchone()['count']
 
+                reputations = TutorReputation.fetch_many([t['tutor_id'] for t in tutors])
+
                 tutor_details = []
                 for t in tutors:
                     cursor.execute("SELECT * FROM teaches WHERE tutor_id = %s", (t['tutor_id'],))
                     courses = [row['course_code'] for row in cursor.fetchall()]
                     cursor.execute("SELECT * FROM tutee WHERE id_number = %s", (t['tutor_id'],))
                     tutee_info = cursor.fetchone()
-                    tutor_details.append({'tutorName': tutee_info['first_name'] + ' ' + tutee_info['last_name'], 'courses': courses, 'tutorId': t['tutor_id']})
+                    tutor_details.append({'tutorName': tutee_info['first_name'] + ' ' + tutee_info['last_name'], 'courses': courses, 'tutorId': t['tutor_id'],
+                                          'reputation': reputations[t['tutor_id']].to_api_response()})
 
                 max_pages = (total_tutors + per_page - 1) // per_page
 
@@ -88,24 +95,10 @@ def get_courses():
         per_page = 6
         offset = (page - 1) * per_page
 
-        conn = get_connection()
-        with conn:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                if search:
-                    cursor.execute(
-                        "SELECT DISTINCT course_code FROM course WHERE course_code ILIKE %s ORDER BY course_code LIMIT %s OFFSET %s",
-                        (f"%{search}%", per_page, offset)
-                    )
-                else:
-                    cursor.execute(
-                        "SELECT DISTINCT course_code FROM course ORDER BY course_code LIMIT %s OFFSET %s",
-                        (per_page, offset)
-                    )
-                courses = [row['course_code'] for row in cursor.fetchall()]
-
-
-        return jsonify({
-            "courses": courses
+        # Served from the in-memory catalog; no database round trip
+        catalog = Catalog.get()
+        return conditional_json(catalog.etag, lambda: {
+            "courses": catalog.search_course_codes(search, per_page, offset)
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
\ No newline at end of file
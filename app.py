@@ -42,6 +42,27 @@ def create_app():
     CORS(app, supports_credentials=True)
     socketio.init_app(app)
 
+    # One pooled DB connection per request / socket event, returned at teardown
+    from utils.db import init_app as init_db
+    init_db(app)
+
+    # Several views read tables that only migrations create; say so once instead of failing per request
+    from migrations import warn_if_pending
+    warn_if_pending()
+
+    # Chat messages are inserted in background batches when CHAT_WRITE_BEHIND is on
+    from utils import message_writer
+    message_writer.start(socketio)
+
+    # Side effects that callers don't wait for (e.g. chat notifications)
+    from utils import task_queue
+    task_queue.start(socketio)
+
+    # Programs/courses are served from memory; load them before the first request
+    from models.catalogModel.catalogModel import Catalog
+    with app.app_context():
+        Catalog.warm_up()
+
     # OAuth setup
     from api.app_auth import oauth
     oauth.init_app(app)
@@ -75,6 +96,7 @@ def create_app():
     from controllers.adminDashboardController import admin_dashboard_bp
     from controllers.appealsController import bp_appeals
     from controllers.chatUserController.chatUserController import chat_bp
+    from controllers.chatController.messageController import chat_bp as chat_messages_bp
     from controllers.NotificationController.NotificationController import bp_notifications
     from controllers.subjectRequestController.subjectRequestController import subject_request_bp
     from controllers.calendar import calendar_bp
@@ -98,6 +120,7 @@ def create_app():
     app.register_blueprint(bp_availability)
     app.register_blueprint(bp_create_pending)
     app.register_blueprint(chat_bp)
+    app.register_blueprint(chat_messages_bp, name="chat_messages")  # shares the /api/chat prefix
     app.register_blueprint(bp_notifications)
     app.register_blueprint(calendar_bp, url_prefix="/api/calendar")
 
@@ -0,0 +1,120 @@
+# benchmarks/green_db_latency.py
+"""
+Socket message latency while a slow query runs, with and without green DB I/O.
+
+A TCP echo server and a client run as greenlets on the eventlet hub, the same
+hub that delivers Socket.IO messages in run.py. The client sends a small
+message every few milliseconds and records how late each reply arrives. Meanwhile another
+greenlet runs `SELECT pg_sleep(...)` through utils.db.get_connection().
+
+With blocking psycopg2 the hub is frozen for the whole query, so the echo
+replies stall for the query's duration. With the wait callback from
+utils/db_green.py the query yields and latency stays flat.
+
+Usage (from the project root, with config.py / .env pointing at a database):
+    python -m benchmarks.green_db_latency [--sleep 1.0] [--interval 0.005] [--mode both]
+"""
+import argparse
+import time
+
+import eventlet
+eventlet.monkey_patch()
+
+from eventlet.green import socket  # noqa: E402
+
+from utils.db import get_connection  # noqa: E402
+from utils.db_green import enable_green_io, disable_green_io  # noqa: E402
+
+
+def echo_server(listener):
+    while True:
+        client, _ = listener.accept()
+        eventlet.spawn(_echo, client)
+
+
+def _echo(client):
+    try:
+        while True:
+            data = client.recv(64)
+            if not data:
+                break
+            client.sendall(data)
+    finally:
+        client.close()
+
+
+def slow_query(seconds):
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_sleep(%s)", (seconds,))
+    finally:
+        conn.close()
+
+
+def measure(address, duration, interval, query_seconds):
+    """
+    Returns message latencies (seconds) recorded while the slow query runs.
+
+    Latency is measured from when a message was due to be sent, so time the
+    client greenlet spent unable to run (hub blocked) is counted too.
+    """
+    client = socket.create_connection(address)
+    samples = []
+
+    # Start the query shortly after measuring begins.
+    query = eventlet.spawn_after(interval * 10, slow_query, query_seconds)
+
+    start = time.perf_counter()
+    due = start
+    while due < start + duration:
+        delay = due - time.perf_counter()
+        eventlet.sleep(max(delay, 0))
+        client.sendall(b"ping")
+        client.recv(64)
+        samples.append(time.perf_counter() - due)
+        due += interval
+
+    query.wait()
+    client.close()
+    return samples
+
+
+def summarize(label, samples):
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    print(
+        f"{label:<9} messages={len(ordered):<5} "
+        f"p50={pick(0.50):8.2f}ms  p99={pick(0.99):8.2f}ms  max={ordered[-1] * 1000:8.2f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sleep", type=float, default=1.0, help="seconds the slow query runs")
+    parser.add_argument("--interval", type=float, default=0.005, help="seconds between echo messages")
+    parser.add_argument("--mode", choices=("blocking", "green", "both"), default="both")
+    args = parser.parse_args()
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    eventlet.spawn(echo_server, listener)
+    address = listener.getsockname()
+
+    # Measure for a little longer than the query so the stall is fully captured.
+    duration = args.sleep * 1.5
+
+    if args.mode in ("blocking", "both"):
+        disable_green_io()
+        summarize("blocking", measure(address, duration, args.interval, args.sleep))
+
+    if args.mode in ("green", "both"):
+        if not enable_green_io():
+            print("green mode unavailable (DB_GREEN_IO disabled?)")
+            return
+        summarize("green", measure(address, duration, args.interval, args.sleep))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# conftest.py
+"""
+Shared pytest setup. Tests import the app's modules, so config.py must exist
+(see readme.md). Database-backed tests also need DB_* to point at a
+migrated database; the unit tests under tests/ do not touch one.
+
+Every test runs under the N+1 query detector (utils/pytest_nplusone.py).
+"""
+pytest_plugins = ["utils.pytest_nplusone"]
@@ -1,32 +1,21 @@
 from flask import Blueprint, jsonify, session, request
 from models.NotificationModel.NotificationModel import Notification
-from utils.db import get_connection
+from utils import identity
 
 bp_notifications = Blueprint("notifications", __name__, url_prefix="/api/notifications")
 
-# Helper to get current user ID from session/DB (used in multiple places)
+# Helper to get current user ID from the session's identity claims (used in multiple places)
 def get_current_user_id():
     user = session.get("user")
     if not user or not user.get("email"):
         return None
-    email = user.get("email")
     
     try:
-        conn = get_connection()
-        cur = conn.cursor()
-        query = """
-            SELECT t.id_number 
-            FROM user_account ua
-            JOIN tutee t ON ua.google_id = t.google_id
-            WHERE ua.email = %s
-        """
-        cur.execute(query, (email,))
-        row = cur.fetchone()
-        cur.close()
-        conn.close()
+        claims = identity.claims()
+        id_number = claims["id_number"] if claims else None
         
         # Ensure we return a string ID and strip it for consistency
-        return str(row[0]).strip() if row and row[0] else None
+        return str(id_number).strip() if id_number else None
     except Exception as e:
         print(f"Error resolving user ID in helper: {e}")
         return None
@@ -1,9 +1,18 @@
 from flask import Blueprint, jsonify, request, session
-from utils.db import get_connection
+from utils.db import get_connection, read_replica
+from utils import identity
+from utils.db_metrics import endpoint_stats
+from utils.db_stream import stream_query
+from utils.query_cache import cached
+from utils.db_timeout import blueprint_statement_timeout
+from config import Config
+from models.catalogModel.catalogModel import Catalog
+from models.tutorProfileModel.tutorProfileModel import TutorProfile
 from psycopg2.extras import RealDictCursor
 from math import ceil
 
 admin_dashboard_bp = Blueprint("admin_dashboard", __name__)
+blueprint_statement_timeout(admin_dashboard_bp, 15000)
 
 def build_pagination_metadata(total_items, page, limit):
     return {
@@ -13,7 +22,29 @@ def build_pagination_metadata(total_items, page, limit):
         "items_per_page": limit
     }
 
+def _fetch_course_page(cur, wheres, params, limit, offset):
+    # Active tutor counts are kept per course by the triggers from migration 0004.
+    join_clause = "FROM course c JOIN course_tutor_count tc ON c.course_code = tc.course_code"
+    if wheres:
+        join_clause += " WHERE " + " AND ".join(wheres)
+
+    cur.execute(f"SELECT COUNT(*) {join_clause}", params)
+    total_items = cur.fetchone()['count']
+
+    sql = f"""
+        SELECT 
+            c.course_code, 
+            c.course_name, 
+            tc.active_tutors as tutor_count
+        {join_clause}
+        ORDER BY c.course_code ASC 
+        LIMIT %s OFFSET %s
+    """
+    cur.execute(sql, params + [limit, offset])
+    return total_items, cur.fetchall()
+
 @admin_dashboard_bp.route("/api/admin/courses", methods=["GET"])
+@read_replica
 def get_all_courses():
     try:
         page = int(request.args.get("page", 1))
@@ -23,51 +54,22 @@ def get_all_courses():
         
         offset = (page - 1) * limit
         params = []
-        
-        join_clause = """
-            FROM course c
-            LEFT JOIN (
-                SELECT te.course_code, COUNT(t.tutor_id) as active_tutors
-                FROM teaches te
-                JOIN tutor t ON te.tutor_id = t.tutor_id
-                WHERE t.status = 'ACTIVE'
-                GROUP BY te.course_code
-            ) tc ON c.course_code = tc.course_code
-        """
-        
+
         wheres = []
         if search:
             wheres.append("(c.course_code ILIKE %s OR c.course_name ILIKE %s)")
             params.extend([f"%{search}%", f"%{search}%"])
-            
-        if wheres:
-            join_clause += " WHERE " + " AND ".join(wheres)
-            
+
         if filter_type == 'no_tutors':
-            join_clause += " AND " if wheres else " WHERE "
-            join_clause += " COALESCE(tc.active_tutors, 0) = 0"
+            wheres.append("tc.active_tutors = 0")
         elif filter_type == 'with_tutors':
-            join_clause += " AND " if wheres else " WHERE "
-            join_clause += " COALESCE(tc.active_tutors, 0) > 0"
+            wheres.append("tc.active_tutors > 0")
 
         conn = get_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
-        
-        cur.execute(f"SELECT COUNT(*) {join_clause}", params)
-        total_items = cur.fetchone()['count']
-        
-        sql = f"""
-            SELECT 
-                c.course_code, 
-                c.course_name, 
-                COALESCE(tc.active_tutors, 0) as tutor_count
-            {join_clause}
-            ORDER BY c.course_code ASC 
-            LIMIT %s OFFSET %s
-        """
-        cur.execute(sql, params + [limit, offset])
-        courses = cur.fetchall()
-        
+
+        total_items, courses = _fetch_course_page(cur, wheres, params, limit, offset)
+
         cur.close()
         conn.close()
 
@@ -93,6 +95,7 @@ def add_course():
         cur = conn.cursor()
         cur.execute("INSERT INTO course (course_code, course_name) VALUES (%s, %s)", (code, name))
         conn.commit()
+        Catalog.invalidate()
         cur.close()
         conn.close()
         return jsonify({"success": True}), 200
@@ -104,8 +107,14 @@ def delete_course(course_code):
     try:
         conn = get_connection()
         cur = conn.cursor()
+        # Tutors teaching this course lose it from their profile
+        cur.execute("SELECT DISTINCT tutor_id FROM teaches WHERE course_code = %s", (course_code,))
+        affected_tutors = [row[0] for row in cur.fetchall()]
         cur.execute("DELETE FROM course WHERE course_code = %s", (course_code,))
         conn.commit()
+        Catalog.invalidate()
+        for tutor_id in affected_tutors:
+            TutorProfile.invalidate(tutor_id)
         cur.close()
         conn.close()
         return jsonify({"success": True}), 200
@@ -113,11 +122,10 @@ def delete_course(course_code):
         return jsonify({"success": False, "error": str(e)}), 500
 
 @admin_dashboard_bp.route("/api/admin/courses/<course_code>/tutors", methods=["GET"])
+@read_replica
+@cached(ttl=60)
 def get_tutors_by_course(course_code):
     try:
-        conn = get_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
         query = """
             SELECT DISTINCT
                 t.tutor_id as google_id,
@@ -132,17 +140,12 @@ def get_tutors_by_course(course_code):
             WHERE te.course_code = %s AND t.status = 'ACTIVE'
             ORDER BY tutee.last_name, tutee.first_name
         """
-        cur.execute(query, (course_code,))
-        tutors = cur.fetchall()
-        
-        cur.close()
-        conn.close()
-        
-        return jsonify({"success": True, "tutors": tutors}), 200
+        return stream_query(query, (course_code,), key="tutors", extra={"success": True})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 @admin_dashboard_bp.route("/api/admin/subject-requests", methods=["GET"])
+@read_replica
 def get_subject_requests():
     try:
         page = int(request.args.get("page", 1))
@@ -246,6 +249,8 @@ def resolve_subject_request(request_id):
             cur.execute("UPDATE subject_request SET status = %s WHERE request_id = %s", (status, request_id))
 
         conn.commit()
+        if status == 'APPROVED':
+            Catalog.invalidate()
         cur.close()
         conn.close()
         return jsonify({"success": True}), 200
@@ -253,6 +258,7 @@ def resolve_subject_request(request_id):
         return jsonify({"success": False, "error": str(e)}), 500
 
 @admin_dashboard_bp.route("/api/tutor-applications/admin/applications", methods=["GET"])
+@read_replica
 def get_all_tutor_applications():
     try:
         page = int(request.args.get("page", 1))
@@ -379,6 +385,9 @@ def approve_tutor_application(application_id):
             cursor.execute("INSERT INTO teaches (tutor_id, course_code) VALUES (%s, %s) ON CONFLICT DO NOTHING", (student_id, course['course_code']))
 
         conn.commit()
+        Catalog.invalidate()
+        identity.invalidate(id_number=student_id)
+        TutorProfile.invalidate(student_id)
         cursor.close()
         conn.close()
 
@@ -400,6 +409,7 @@ def reject_tutor_application(application_id):
         return jsonify({"success": False, "message": str(e)}), 500
 
 @admin_dashboard_bp.route("/api/tutor-applications/admin/users", methods=["GET"])
+@read_replica
 def get_all_users_for_admin():
     try:
         page = int(request.args.get("page", 1))
@@ -503,18 +513,21 @@ def update_user_status():
         cur = conn.cursor()
         cur.execute("UPDATE user_account SET status = %s, status_note = %s WHERE google_id = %s", (data.get("status"), data.get("note", ""), google_id))
         conn.commit()
+        identity.invalidate(google_id=google_id)
         cur.close()
         conn.close()
         return jsonify({"success": True}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+def _format_report(r):
+    r['date_submitted'] = r['date_submitted'].strftime("%Y-%m-%d")
+    return r
+
 @admin_dashboard_bp.route("/api/admin/users/<user_id>/reports", methods=["GET"])
+@read_replica
 def get_user_reports(user_id):
     try:
-        conn = get_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        
         query = """
             SELECT r.report_id, r.reporter_id, r.type, r.description, r.reasons, r.date_submitted, r.status
             FROM report r
@@ -522,58 +535,30 @@ def get_user_reports(user_id):
             WHERE t.google_id = %s
             ORDER BY r.date_submitted DESC
         """
-        cur.execute(query, (user_id,))
-        reports = cur.fetchall()
-        
-        cur.close()
-        conn.close()
-        
-        for r in reports:
-            r['date_submitted'] = r['date_submitted'].strftime("%Y-%m-%d")
-            
-        return jsonify({"success": True, "reports": reports}), 200
+        return stream_query(query, (user_id,), transform=_format_report, key="reports", extra={"success": True})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 @admin_dashboard_bp.route("/api/tutor-applications/admin/statistics", methods=["GET"])
+@read_replica
 def get_admin_statistics():
     try:
         conn = get_connection()
         cursor = conn.cursor()
 
-        cursor.execute("SELECT COUNT(*) FROM tutor_application")
-        total_applications = cursor.fetchone()[0]
-
-        cursor.execute("""
-            SELECT 
-                SUM(CASE WHEN status = 'PENDING' THEN 1 ELSE 0 END),
-                SUM(CASE WHEN status = 'APPROVED' THEN 1 ELSE 0 END),
-                SUM(CASE WHEN status = 'REJECTED' THEN 1 ELSE 0 END)
-            FROM tutor_application
-        """)
-        pending, approved, rejected = cursor.fetchone()
-
-        cursor.execute("SELECT COUNT(*) FROM tutor")
-        total_tutors = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM tutee")
-        total_tutees = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM course")
-        total_courses = cursor.fetchone()[0]
-
-        cursor.execute("SELECT COUNT(*) FROM appointment WHERE status IN ('PENDING', 'BOOKED')")
-        active_sessions = cursor.fetchone()[0]
+        # Kept current by the triggers from migration 0003.
+        cursor.execute("SELECT name, value FROM admin_statistic")
+        counters = dict(cursor.fetchall())
 
         statistics = {
-            "total_applications": total_applications,
-            "pending": pending or 0,
-            "approved": approved or 0,
-            "rejected": rejected or 0,
-            "total_tutors": total_tutors,
-            "total_tutees": total_tutees,
-            "total_courses": total_courses,
-            "active_sessions": active_sessions
+            "total_applications": counters.get("total_applications", 0),
+            "pending": counters.get("applications_pending", 0),
+            "approved": counters.get("applications_approved", 0),
+            "rejected": counters.get("applications_rejected", 0),
+            "total_tutors": counters.get("total_tutors", 0),
+            "total_tutees": counters.get("total_tutees", 0),
+            "total_courses": counters.get("total_courses", 0),
+            "active_sessions": counters.get("active_sessions", 0)
         }
 
         cursor.close()
@@ -581,4 +566,12 @@ def get_admin_statistics():
         return jsonify({"statistics": statistics})
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_dashboard_bp.route("/api/admin/db-stats", methods=["GET"])
+def get_db_stats():
+    # Per-endpoint query totals since the process started; only exposed while debugging queries.
+    if not getattr(Config, "DB_DEBUG_QUERIES", False):
+        return jsonify({"error": "Not found"}), 404
+    return jsonify({"endpoints": endpoint_stats()}), 200
@@ -1,11 +1,14 @@
 from flask import Blueprint, jsonify, request, session
-from utils.db import get_connection
+from utils.db import get_connection, read_replica
+from utils import identity
+from utils.db_timeout import blueprint_statement_timeout
 from utils.supabase_client import upload_file
 from psycopg2.extras import RealDictCursor
 from math import ceil
 import uuid
 
 bp_appeals = Blueprint("appeals", __name__, url_prefix="/api/appeals")
+blueprint_statement_timeout(bp_appeals, 15000)
 
 ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png'}
 
@@ -13,6 +16,7 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 @bp_appeals.route("/all", methods=["GET"])
+@read_replica
 def get_appeals():
     try:
         page = int(request.args.get("page", 1))
@@ -167,6 +171,7 @@ def resolve_appeal(appeal_id):
             """, (appeal_google_id,))
             
         conn.commit()
+        identity.invalidate(google_id=appeal_google_id)
         return jsonify({"success": True}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,10 +1,12 @@
 from flask import Blueprint, jsonify, request, session
-from utils.db import get_connection
+from utils.db import get_connection, read_replica
+from utils import identity
 from psycopg2.extras import RealDictCursor
 
 calendar_bp = Blueprint('calendar', __name__)
 
 @calendar_bp.route('/my-calendar', methods=['GET'])
+@read_replica
 def get_calendar_appointments():
     user_id = request.args.get('user_id') 
     role = request.args.get('role', 'both')  # 'tutor', 'tutee', or 'both'
@@ -81,27 +83,15 @@ def get_calendar_appointments():
 def check_if_tutor(google_id):
 
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Get the user's tutee id_number using google_id
-        cursor.execute("SELECT id_number FROM tutee WHERE google_id = %s", (google_id,))
-        tutee_row = cursor.fetchone()
-        if not tutee_row:
+        # Session claims for the logged-in user, one user_account/tutee/tutor query otherwise
+        claims = identity.lookup(google_id=google_id)
+        if not claims or not claims['id_number']:
             return jsonify({'is_tutor': False, 'tutee_id': None}), 200
 
-        tutee_id = tutee_row[0]
-
-        # Check if this tutee_id exists in the tutor table
-        cursor.execute("SELECT COUNT(*) FROM tutor WHERE tutor_id = %s", (tutee_id,))
-        result = cursor.fetchone()
-        is_tutor = result[0] > 0
+        is_tutor = claims['tutor_status'] is not None
 
-        return jsonify({'is_tutor': is_tutor, 'tutee_id': tutee_id}), 200
+        return jsonify({'is_tutor': is_tutor, 'tutee_id': claims['id_number']}), 200
 
     except Exception as e:
         print(f"Error: {e}")
-        return jsonify({'error': 'Failed to check tutor status'}), 500
-    finally:
-        cursor.close()
-        conn.close()
\ No newline at end of file
+        return jsonify({'error': 'Failed to check tutor status'}), 500
\ No newline at end of file
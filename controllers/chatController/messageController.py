@@ -1,13 +1,46 @@
 from flask import Blueprint, request, jsonify, session
 from models.messageModel.messageModel import MessageModel
-from models.NotificationModel.NotificationModel import Notification
+from controllers.chatController.sendService import send_chat_message
+from utils import identity
+from utils.db_timeout import blueprint_statement_timeout
 
 chat_bp = Blueprint("chat", __name__, url_prefix="/api/chat")
+blueprint_statement_timeout(chat_bp, 3000)  # chat is latency-sensitive
+
+def _participant_id(appointment_id):
+    """
+    The logged-in user's id_number when they are the student or tutor of
+    `appointment_id`, else None plus the error response to return.
+    """
+    if not session.get("user"):
+        return None, (jsonify({"error": "Unauthorized"}), 401)
+
+    claims = identity.claims()
+    id_number = claims["id_number"] if claims else None
+    participants = MessageModel.get_appointment_participants(appointment_id)
+    if not id_number or not participants or str(id_number) not in {str(p) for p in participants}:
+        return None, (jsonify({"error": "Forbidden"}), 403)
+    return id_number, None
 
 @chat_bp.route("/messages/<int:appointment_id>", methods=["GET"])
 def get_messages(appointment_id):
-    messages = MessageModel.get_messages_by_appointment(appointment_id)
-    return jsonify(messages)
+    _user_id, error = _participant_id(appointment_id)
+    if error:
+        return error
+
+    # Keyset pagination: ?before=<message_id> for older pages, ?after=<message_id> for newer ones
+    before = request.args.get("before", type=int)
+    after = request.args.get("after", type=int)
+    limit = request.args.get("limit", type=int)
+    if before is not None and after is not None:
+        return jsonify({"error": "Use either before or after, not both"}), 400
+
+    messages, has_more = MessageModel.get_messages_by_appointment(appointment_id, before=before, after=after, limit=limit)
+    return jsonify({
+        "appointment_id": appointment_id,
+        "messages": messages,
+        "has_more": has_more
+    })
 
 @chat_bp.route("/messages", methods=["POST"])
 def send_message():
@@ -15,53 +48,27 @@ def send_message():
     appointment_id = data.get("appointment_id")
     message_text = data.get("message_text")
     
-    # 1. Get Sender ID from Session (Secure)
-    # Note: We need the ID_NUMBER, not the Google ID. 
-    # Ensure your frontend sends it or your session middleware sets it.
-    # For now, assuming session["user"] has "id_number" (from the login fix we discussed earlier)
-    # OR we can trust the frontend to send sender_id if you prefer simpler logic for now.
-    user = session.get("user")
-    # For robustness, we'll try to get it from the request if session fails (dev mode), 
-    # but strictly you should use session.
-    sender_id = data.get("sender_id") 
-
-    if not appointment_id or not message_text or not sender_id:
+    if not appointment_id or not message_text:
         return jsonify({"error": "Missing required fields"}), 400
 
-    # 2. Save the Message
-    timestamp = MessageModel.save_message(appointment_id, sender_id, message_text)
-
-    # -------------------------------------------------------------
-    # 3. NOTIFICATION LOGIC (CHAT)
-    # -------------------------------------------------------------
     try:
-        # A. Find out who is in this chat
-        participants = MessageModel.get_appointment_participants(appointment_id)
-        
-        if participants:
-            student_id, tutor_id = participants
-            
-            # B. Determine Recipient (The one who is NOT the sender)
-            if sender_id == student_id:
-                recipient_id = tutor_id
-            else:
-                recipient_id = student_id
-            
-            # C. Send Notification
-            # The model automatically checks if there's already an unread notif
-            # and updates the timestamp instead of spamming duplicates.
-            Notification.create_chat_notification(
-                appointment_id=appointment_id,
-                recipient_id=recipient_id,
-                sender_id=sender_id
-            )
-            print(f"🔔 Chat notification processed for {recipient_id}")
-            
-    except Exception as e:
-        print(f"❌ Chat notification failed: {e}")
-    # -------------------------------------------------------------
+        appointment_id = int(appointment_id)
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid appointment_id"}), 400
+
+    # 1. The sender is the logged-in participant, never an id from the request body
+    sender_id, error = _participant_id(appointment_id)
+    if error:
+        return error
+
+    # 2. Save + broadcast (same path as the send_message socket event);
+    #    the recipient's notification is sent in the background
+    message = send_chat_message(appointment_id, sender_id, message_text)
+    if message is None:
+        return jsonify({"error": "Message could not be saved"}), 500
 
     return jsonify({
         "status": "success", 
-        "timestamp": timestamp.isoformat() if timestamp else None
+        "message_id": message["message_id"],
+        "timestamp": message["timestamp"]
     }), 201
\ No newline at end of file
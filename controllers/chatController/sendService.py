@@ -0,0 +1,59 @@
+# controllers/chatController/sendService.py
+"""
+The one way a chat message is sent, shared by the REST endpoint
+(POST /api/chat/messages) and the `send_message` socket event.
+
+Only what the chat room needs happens before returning: the message is saved
+and broadcast to `appointment_<id>` as `receive_message`. The recipient's
+notification (participants lookup, NEW_MESSAGE upsert, sender name,
+`new_global_notification` to their personal room) runs on the background
+task queue.
+"""
+from app import socketio
+from models.messageModel.messageModel import MessageModel
+from models.NotificationModel.NotificationModel import Notification
+from utils import task_queue
+
+
+def send_chat_message(appointment_id, sender_id, message_text):
+    """
+    Saves and broadcasts a message. Returns the broadcast payload, or None
+    when the message could not be saved (nothing is broadcast then).
+    """
+    message_id, timestamp = MessageModel.save_message(appointment_id, sender_id, message_text)
+    if message_id is None:
+        return None
+
+    message = {
+        "message_id": message_id,
+        "appointment_id": appointment_id,
+        "sender_id": sender_id,
+        "message_text": message_text,
+        "timestamp": timestamp.isoformat()
+    }
+    socketio.emit("receive_message", message, room=f"appointment_{appointment_id}")
+
+    task_queue.submit(notify_recipient, appointment_id, sender_id)
+    return message
+
+
+def notify_recipient(appointment_id, sender_id):
+    """Creates or re-flags the other participant's NEW_MESSAGE notification (and emits it)."""
+    participants = MessageModel.get_appointment_participants(appointment_id)
+    if not participants:
+        print(f"❌ Error sending chat notification: Could not find participants for appt {appointment_id}")
+        return
+
+    student_id, tutor_id = participants
+    recipient_id = tutor_id if str(sender_id) == str(student_id) else student_id
+    if not recipient_id:
+        print(f"❌ Error sending chat notification: Recipient ID is None for appt {appointment_id}")
+        return
+
+    # Emits new_global_notification to the recipient's personal room itself
+    Notification.create_chat_notification(
+        appointment_id=appointment_id,
+        recipient_id=recipient_id,
+        sender_id=sender_id
+    )
+    print(f"🔔 Chat Notification created/reset for {recipient_id}")
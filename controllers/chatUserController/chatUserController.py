@@ -1,10 +1,14 @@
 from flask import Blueprint, jsonify, request
 # Ensure you are importing the class where you put the new 'get_chat_partners' SQL logic
 from models.chatUserModel.chatUserModel import UserModel 
+from utils.db import read_replica
+from utils.db_timeout import blueprint_statement_timeout
 
 chat_bp = Blueprint("chat", __name__, url_prefix="/api/chat")
+blueprint_statement_timeout(chat_bp, 3000)  # chat is latency-sensitive
 
 @chat_bp.route("/partners", methods=["GET"])
+@read_replica
 def get_partners():
     # 1. We now expect the Database ID (e.g., '2023-0639'), not the Google ID
     user_id = request.args.get("user_id")
@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request, session
 from models.createNewPendingAppointmentModel.createNewPendingAppointmentModel import PendingAppointment
 from models.NotificationModel.NotificationModel import Notification 
+from utils.db import unit_of_work, after_commit, UnitOfWorkRolledBack
 import traceback
 
 # 🟢 1. IMPORT SOCKETIO (CRITICAL FOR REAL-TIME EMISSION FROM A REST ROUTE)
@@ -32,26 +33,27 @@ def create_pending_appointment():
     new_id = None # Ensure new_id is initialized for scope
 
     try:
-        # 3. Get Tutee ID (delegated to Model)
-        tutee_id = PendingAppointment.get_tutee_id_by_google_id(google_id)
-        if not tutee_id:
-            return jsonify({"error": "No tutee found for this Google account"}), 404
-
-        # 4. Create Appointment (delegated to Model)
-        new_id = PendingAppointment.create(
-            vacant_id=data["vacant_id"],
-            tutee_id=tutee_id,
-            course_code=data["course_code"],
-            appointment_date=data["appointment_date"]
-        )
-
-        # -------------------------------------------------------------
-        # 5. NOTIFICATION LOGIC (NEW)
-        # -------------------------------------------------------------
-        try:
+        # The booking and its notification commit together (one connection, one COMMIT)
+        with unit_of_work():
+            # 3. Get Tutee ID (delegated to Model)
+            tutee_id = PendingAppointment.get_tutee_id_by_google_id(google_id)
+            if not tutee_id:
+                return jsonify({"error": "No tutee found for this Google account"}), 404
+
+            # 4. Create Appointment (delegated to Model)
+            new_id = PendingAppointment.create(
+                vacant_id=data["vacant_id"],
+                tutee_id=tutee_id,
+                course_code=data["course_code"],
+                appointment_date=data["appointment_date"]
+            )
+
+            # -------------------------------------------------------------
+            # 5. NOTIFICATION LOGIC
+            # -------------------------------------------------------------
             # A. Find out who the tutor is for this slot
             tutor_id = PendingAppointment.get_tutor_from_vacant(data["vacant_id"])
-            
+
             if tutor_id:
                 # B. Send the database notification
                 Notification.create_booking_notification(
@@ -62,35 +64,40 @@ def create_pending_appointment():
                 )
                 print(f"🔔 Notification sent to tutor {tutor_id}")
 
-                # C. 🟢 ADD SOCKET EMIT FOR REAL-TIME UPDATE
+                # C. 🟢 SOCKET EMIT FOR REAL-TIME UPDATE (only after the booking is committed)
                 if socketio:
                     tutor_room = str(tutor_id)
-                    socketio.emit(
-                        'new_notification', # Client listens for this event
-                        {
-                            'type': 'BOOKING_REQUEST',
-                            'message': 'You have a new session request!',
-                            'appointment_id': new_id
-                        }, 
-                        room=tutor_room, 
-                        namespace='/'
-                    )
-                    print(f"🔔 Real-time notification emitted to tutor room: {tutor_room}")
+
+                    def emit_booking_request():
+                        socketio.emit(
+                            'new_notification', # Client listens for this event
+                            {
+                                'type': 'BOOKING_REQUEST',
+                                'message': 'You have a new session request!',
+                                'appointment_id': new_id
+                            },
+                            room=tutor_room,
+                            namespace='/'
+                        )
+                        print(f"🔔 Real-time notification emitted to tutor room: {tutor_room}")
+
+                    after_commit(emit_booking_request)
                 # ---------------------------------------------------
 
             else:
                 print(f"⚠️ Could not find tutor for vacant_id {data['vacant_id']}")
-
-        except Exception as notif_error:
-            # Don't crash the whole request if notification fails; just log it
-            print(f"❌ Notification failed: {notif_error}")
-        # -------------------------------------------------------------
+            # -------------------------------------------------------------
 
         return jsonify({
             "message": "Pending appointment created successfully", 
             "appointment_id": new_id
         }), 201
 
+    except UnitOfWorkRolledBack as rb:
+        # e.g. the notification insert failed, so the booking was rolled back with it
+        print(f"❌ Booking rolled back: {rb}")
+        return jsonify({"error": "Could not create the appointment, please try again"}), 500
+
     except ValueError as ve:
         return jsonify({"error": str(ve)}), 400
 
@@ -1,10 +1,12 @@
 from flask import Blueprint, jsonify, request, session
 from models.getCreateAppointmentsFormScheduleModel.getCreateAppointmentsFormScheduleModel import AvailabilityCard
+from utils.db import read_replica
 import traceback
 
 bp_availability = Blueprint("availability_by_subject", __name__, url_prefix="/api")
 
 @bp_availability.route("/availability/by-subject", methods=["GET"])
+@read_replica
 def get_availability_by_subject():
     # 1. Extract Query Params
     course_code = request.args.get("course_code")
@@ -2,6 +2,8 @@
 
 from flask import Blueprint, jsonify, request
 from utils.db import get_connection
+from utils.etag import versioned
+from models.tutorProfileModel.tutorProfileModel import TutorProfile
 from psycopg2.extras import RealDictCursor
 
 rate_session_bp = Blueprint("rate_session_bp", __name__, url_prefix="/api/rate-session")
@@ -117,11 +119,15 @@ def submit_rating(appointment_id):
             SET rating = %s,
                 comment = %s
             WHERE appointment_id = %s
+            RETURNING tutor_id
             """,
             (rating, comment, appointment_id),
         )
+        rated_tutors = {r["tutor_id"] for r in cur.fetchall()}
 
         conn.commit()
+        for tutor_id in rated_tutors:
+            TutorProfile.invalidate(tutor_id)
         return jsonify({"message": "Rating submitted successfully"}), 200
 
     except Exception as e:
@@ -135,6 +141,7 @@ def submit_rating(appointment_id):
 
 
 @rate_session_bp.route("/tutor/<tutor_id>", methods=["GET"])
+@versioned("ratings", "tutor_id")
 def get_tutor_ratings(tutor_id):
     """
     Return all ratings for a tutor (rated sessions only).
@@ -175,7 +182,6 @@ def get_tutor_ratings(tutor_id):
 
             WHERE sr.tutor_id = %s
               AND sr.rating > 0
-              AND a.status = 'COMPLETED'
             ORDER BY sr.created_at DESC
             """,
             (tutor_id,),
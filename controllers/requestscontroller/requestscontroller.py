@@ -1,8 +1,12 @@
 from flask import Blueprint, jsonify, request
 from utils.db import get_connection
+from utils.db_timeout import blueprint_statement_timeout
 from psycopg2.extras import RealDictCursor
+from models.messageModel.messageModel import MessageModel
+from models.recentMessagesModel.recentMessagesModel import RecentMessages
 
 requests_bp = Blueprint("requests_bp", __name__, url_prefix="/api/requests")
+blueprint_statement_timeout(requests_bp, 5000)
 
 
 @requests_bp.route("/pending/<tutor_id>", methods=["GET"])
@@ -273,6 +277,8 @@ def clear_appointment(appointment_id):
     try:
         cur.execute("DELETE FROM appointment WHERE appointment_id = %s", (appointment_id,))
         conn.commit()
+        MessageModel.forget_participants(appointment_id)
+        RecentMessages.forget(appointment_id)
         return jsonify({"message": f"Appointment {appointment_id} cleared"}), 200
 
     except Exception as e:
@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request, session
 from utils.db import get_connection
+from utils import identity
 
 subject_request_bp = Blueprint("subject_request_bp", __name__)
 
@@ -17,18 +18,16 @@ def request_subject():
     if not subject_code or not subject_name:
         return jsonify({"error": "Both Subject Code and Course Name are required."}), 400
 
+    claims = identity.claims()
+    if not claims or not claims["id_number"]:
+        return jsonify({"error": "User profile not found."}), 404
+
+    requester_id = claims["id_number"]
+
     conn = get_connection()
     cur = conn.cursor()
 
     try:
-        cur.execute("SELECT id_number FROM tutee WHERE google_id = %s", (user['sub'],))
-        row = cur.fetchone()
-        
-        if not row:
-            return jsonify({"error": "User profile not found."}), 404
-        
-        requester_id = row[0]
-
         cur.execute("""
             INSERT INTO subject_request (requester_id, subject_code, subject_name, description, status)
             VALUES (%s, %s, %s, %s, 'PENDING')
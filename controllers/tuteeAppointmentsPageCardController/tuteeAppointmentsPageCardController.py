@@ -1,10 +1,12 @@
 from flask import Blueprint, jsonify, session
 from models.tuteeAppointmentsPageCardModel.tuteeAppointmentsPageCardModel import AppointmentCard
+from utils.db import read_replica
 import traceback
 
 bp_appointments = Blueprint("appointments", __name__, url_prefix="/api")
 
 @bp_appointments.route("/appointments")
+@read_replica
 def get_user_appointments():
     # 1. Auth Check
     user = session.get("user")
@@ -0,0 +1,206 @@
+# migrations/__init__.py
+"""
+Versioned schema migrations.
+
+Each module in migrations/versions/ is named `NNNN_description.py` and defines:
+
+    def upgrade(cursor): ...
+    def downgrade(cursor): ...
+    TRANSACTIONAL = True   # optional; False runs the module in autocommit
+                           # (needed for CREATE INDEX CONCURRENTLY)
+
+Applied versions are recorded in the `schema_migrations` table. Run with:
+
+    python -m migrations status
+    python -m migrations upgrade [VERSION]      # default: latest
+    python -m migrations downgrade [VERSION]    # default: one step back; 0 = everything
+"""
+import importlib
+import os
+import pkgutil
+import re
+
+import psycopg2
+
+from config import Config
+
+_VERSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "versions")
+_MODULE_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.module = module
+
+    @property
+    def transactional(self):
+        return getattr(self.module, "TRANSACTIONAL", True)
+
+    def __repr__(self):
+        return f"{self.version}_{self.name}"
+
+
+def connect():
+    return psycopg2.connect(
+        dbname=Config.DB_NAME,
+        user=Config.DB_USER,
+        password=Config.DB_PASSWORD,
+        host=Config.DB_HOST,
+        port=Config.DB_PORT
+    )
+
+
+def discover():
+    """All migrations in migrations/versions/, oldest first."""
+    migrations = []
+    for info in pkgutil.iter_modules([_VERSIONS_DIR]):
+        match = _MODULE_NAME.match(info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"migrations.versions.{info.name}")
+        migrations.append(Migration(match.group(1), match.group(2), module))
+    migrations.sort(key=lambda m: m.version)
+    return migrations
+
+
+def _ensure_table(conn):
+    with conn, conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version    VARCHAR(4) PRIMARY KEY,
+                name       TEXT NOT NULL,
+                applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+            )
+        """)
+
+
+def applied_versions(conn):
+    _ensure_table(conn)
+    with conn, conn.cursor() as cur:
+        cur.execute("SELECT version FROM schema_migrations ORDER BY version")
+        return [row[0] for row in cur.fetchall()]
+
+
+def warn_if_pending():
+    """Prints a warning at startup when the database is missing migrations the code relies on."""
+    try:
+        conn = connect()
+    except psycopg2.Error as e:
+        print(f"⚠️ [MIGRATIONS] Could not check for pending migrations: {e}")
+        return
+    try:
+        done = set(applied_versions(conn))
+        pending = [m for m in discover() if m.version not in done]
+    except psycopg2.Error as e:
+        print(f"⚠️ [MIGRATIONS] Could not check for pending migrations: {e}")
+        return
+    finally:
+        conn.close()
+    if pending:
+        print(f"⚠️ [MIGRATIONS] {len(pending)} pending ({', '.join(map(str, pending))}); "
+              f"run `python -m migrations upgrade`")
+
+
+def _run(conn, migration, direction):
+    step = getattr(migration.module, direction)
+
+    if migration.transactional:
+        with conn, conn.cursor() as cur:
+            step(cur)
+            _record(cur, migration, direction)
+        return
+
+    # Non-transactional steps must be re-runnable: a failure leaves earlier statements applied.
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            step(cur)
+            _record(cur, migration, direction)
+    finally:
+        conn.autocommit = False
+
+
+def _record(cur, migration, direction):
+    if direction == "upgrade":
+        cur.execute(
+            "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+            (migration.version, migration.name)
+        )
+    else:
+        cur.execute("DELETE FROM schema_migrations WHERE version = %s", (migration.version,))
+
+
+def upgrade(conn, target=None):
+    """Applies pending migrations up to and including `target` (default: all)."""
+    done = set(applied_versions(conn))
+    ran = []
+    for migration in discover():
+        if target is not None and migration.version > target:
+            break
+        if migration.version in done:
+            continue
+        print(f"⬆️ [MIGRATIONS] Applying {migration}")
+        _run(conn, migration, "upgrade")
+        ran.append(migration)
+    return ran
+
+
+def downgrade(conn, target=None):
+    """
+    Rolls back applied migrations newer than `target`. Without a target only
+    the latest one is rolled back; target "0000" rolls back everything.
+    """
+    done = applied_versions(conn)
+    if not done:
+        return []
+    if target is None:
+        target = done[-2] if len(done) > 1 else "0000"
+
+    by_version = {m.version: m for m in discover()}
+    ran = []
+    for version in reversed(done):
+        if version <= target:
+            break
+        migration = by_version.get(version)
+        if migration is None:
+            raise MigrationError(f"Migration {version} is applied but its module is missing")
+        print(f"⬇️ [MIGRATIONS] Rolling back {migration}")
+        _run(conn, migration, "downgrade")
+        ran.append(migration)
+    return ran
+
+
+# ---------------------------------------------------------
+# Helpers for migration modules
+# ---------------------------------------------------------
+def create_index(cur, name, table, columns, where=None, concurrently=True):
+    """
+    CREATE INDEX [CONCURRENTLY] IF NOT EXISTS, dropping a leftover INVALID
+    index of the same name first (what an interrupted concurrent build leaves).
+    """
+    cur.execute("""
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s AND NOT i.indisvalid
+    """, (name,))
+    if cur.fetchone():
+        drop_index(cur, name, concurrently=concurrently)
+
+    sql = (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name} "
+        f"ON {table} ({columns})"
+    )
+    if where:
+        sql += f" WHERE {where}"
+    cur.execute(sql)
+
+
+def drop_index(cur, name, concurrently=True):
+    cur.execute(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {name}")
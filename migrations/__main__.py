@@ -0,0 +1,45 @@
+# migrations/__main__.py
+import argparse
+import sys
+
+from migrations import MigrationError, applied_versions, connect, discover, downgrade, upgrade
+
+
+def _version(value):
+    return value.zfill(4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m migrations", description="Apply or roll back schema migrations.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="list migrations and whether they are applied")
+    up = commands.add_parser("upgrade", help="apply pending migrations")
+    up.add_argument("version", nargs="?", type=_version, help="stop after this version (default: latest)")
+    down = commands.add_parser("downgrade", help="roll back migrations")
+    down.add_argument("version", nargs="?", type=_version,
+                      help="roll back everything newer than this version (default: one step, 0 = all)")
+    args = parser.parse_args(argv)
+
+    conn = connect()
+    try:
+        if args.command == "status":
+            done = set(applied_versions(conn))
+            for migration in discover():
+                mark = "applied" if migration.version in done else "pending"
+                print(f"{migration.version}  {mark:<8} {migration.name}")
+        elif args.command == "upgrade":
+            ran = upgrade(conn, args.version)
+            print(f"✅ [MIGRATIONS] {len(ran)} migration(s) applied")
+        else:
+            ran = downgrade(conn, args.version)
+            print(f"✅ [MIGRATIONS] {len(ran)} migration(s) rolled back")
+    except MigrationError as e:
+        print(f"❌ [MIGRATIONS] {e}")
+        return 1
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
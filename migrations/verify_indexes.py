@@ -0,0 +1,107 @@
+# migrations/verify_indexes.py
+"""
+Checks that the planner uses the hot-path indexes from 0001_hot_path_indexes
+and 0006_message_keyset_index.
+
+Each check EXPLAINs a statement shaped like the one in the model/controller
+and looks for the expected index anywhere in the plan. Sequential scans are
+disabled for the check so small tables still show index plans. Where two
+indexes share a leading column (notifications) the planner needs statistics
+to tell them apart, so run it against a database with real data, after ANALYZE.
+
+Usage (from the project root):
+    python -m migrations.verify_indexes
+"""
+import sys
+
+from migrations import connect
+
+# (expected index, statement, parameters)
+CHECKS = [
+    ("idx_appointment_vacant_date_status",
+     "SELECT 1 FROM appointment WHERE vacant_id = %s AND appointment_date = %s AND status = 'BOOKED'",
+     (1, "2025-01-01")),
+    ("idx_appointment_tutee_date",
+     "SELECT appointment_id FROM appointment a WHERE a.tutee_id = %s ORDER BY a.appointment_date",
+     ("2020-0001",)),
+    ("idx_message_appointment_timestamp",
+     "SELECT MAX(timestamp) FROM message WHERE message.appointment_id = %s",
+     (1,)),
+    ("idx_message_appointment_id",
+     "SELECT message_id FROM message WHERE appointment_id = %s AND message_id < %s ORDER BY message_id DESC LIMIT 50",
+     (1, 1000)),
+    ("idx_message_unread",
+     "SELECT COUNT(*) FROM message m WHERE m.appointment_id = %s AND m.is_read = FALSE AND m.sender_id != %s",
+     (1, "2020-0001")),
+    ("idx_notifications_recipient_reference_type",
+     "SELECT notification_id FROM notifications WHERE recipient_id = %s AND reference_id = %s AND type = 'NEW_MESSAGE'",
+     ("2020-0001", 1)),
+    ("idx_notifications_recipient_created",
+     "SELECT * FROM notifications n WHERE n.recipient_id = %s ORDER BY n.created_at DESC LIMIT 20",
+     ("2020-0001",)),
+    ("idx_availability_tutor_day",
+     "SELECT vacant_id FROM availability WHERE tutor_id = %s ORDER BY day_of_week, start_time",
+     ("2020-0001",)),
+    ("idx_session_rating_tutor_rated",
+     "SELECT rating_id FROM session_rating sr WHERE sr.tutor_id = %s AND sr.rating > 0",
+     ("2020-0001",)),
+    ("idx_session_rating_tutee_pending",
+     "SELECT rating_id FROM session_rating sr WHERE sr.tutee_id = %s AND COALESCE(sr.rating, 0) = 0",
+     ("2020-0001",)),
+    ("idx_teaches_course",
+     "SELECT tutor_id FROM teaches WHERE course_code = %s",
+     ("CSC101",)),
+    ("idx_tutee_google_id",
+     "SELECT id_number FROM tutee WHERE google_id = %s LIMIT 1",
+     ("google-oauth-sub",)),
+    ("idx_tutor_badges_tutor",
+     "SELECT COUNT(*) FROM tutor_badges WHERE tutor_id = %s",
+     ("2020-0001",)),
+    ("idx_posted_notes_tutor_date",
+     "SELECT * FROM posted_notes WHERE tutor_id = %s ORDER BY date_posted DESC",
+     ("2020-0001",)),
+    ("idx_report_reported_pending",
+     "SELECT COUNT(*) FROM report r WHERE r.reported_id = %s AND r.status = 'PENDING'",
+     ("2020-0001",)),
+]
+
+
+def _index_names(plan):
+    names = set()
+    if "Index Name" in plan:
+        names.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        names |= _index_names(child)
+    return names
+
+
+def verify(conn):
+    """Returns a list of (index, used indexes) for every check that failed."""
+    failures = []
+    with conn.cursor() as cur:
+        for index, sql, params in CHECKS:
+            cur.execute("SET LOCAL enable_seqscan = off")
+            cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cur.fetchone()[0][0]["Plan"]
+            used = _index_names(plan)
+            print(f"{'✅' if index in used else '❌'} {index}")
+            if index not in used:
+                failures.append((index, sorted(used)))
+            conn.rollback()
+    return failures
+
+
+def main():
+    conn = connect()
+    try:
+        failures = verify(conn)
+    finally:
+        conn.close()
+
+    for index, used in failures:
+        print(f"❌ [MIGRATIONS] {index} not used; plan used: {', '.join(used) or 'no index'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
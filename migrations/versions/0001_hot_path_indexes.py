@@ -0,0 +1,53 @@
+# migrations/versions/0001_hot_path_indexes.py
+"""
+Composite and partial indexes for the predicates the models and controllers
+filter on. Built CONCURRENTLY so the tables stay writable while they build.
+
+migrations/verify_indexes.py checks that the planner picks each of them.
+"""
+from migrations import create_index, drop_index
+
+TRANSACTIONAL = False
+
+# (name, table, columns, partial predicate)
+INDEXES = [
+    # Slot conflict checks: createNewPendingAppointmentModel.create, requestscontroller accept,
+    # getCreateAppointmentsFormScheduleModel booked slots.
+    ("idx_appointment_vacant_date_status", "appointment", "vacant_id, appointment_date, status", None),
+    # Tutee appointment cards and calendar: WHERE a.tutee_id = %s ORDER BY a.appointment_date.
+    ("idx_appointment_tutee_date", "appointment", "tutee_id, appointment_date", None),
+    # Chat history (ORDER BY timestamp) and the latest-message subquery in chatUserModel.
+    ("idx_message_appointment_timestamp", "message", "appointment_id, timestamp", None),
+    # Unread counts per chat: is_read = FALSE AND sender_id != %s.
+    ("idx_message_unread", "message", "appointment_id, sender_id", "is_read = FALSE"),
+    # Chat notification upsert in NotificationModel.create_chat_notification.
+    ("idx_notifications_recipient_reference_type", "notifications", "recipient_id, reference_id, type", None),
+    # Notification dropdown: WHERE recipient_id = %s ORDER BY created_at DESC LIMIT 20.
+    ("idx_notifications_recipient_created", "notifications", "recipient_id, created_at DESC", None),
+    # Tutor profile availability (ORDER BY day_of_week) and the tutor list day filter.
+    ("idx_availability_tutor_day", "availability", "tutor_id, day_of_week", None),
+    # Tutor ratings page only lists submitted ratings.
+    ("idx_session_rating_tutor_rated", "session_rating", "tutor_id", "rating > 0"),
+    # Tutee's pending ratings.
+    ("idx_session_rating_tutee_pending", "session_rating", "tutee_id", "COALESCE(rating, 0) = 0"),
+    # teaches' primary key leads with tutor_id; course filters need their own index.
+    ("idx_teaches_course", "teaches", "course_code", None),
+    # Every google_id -> id_number lookup behind the session user.
+    ("idx_tutee_google_id", "tutee", "google_id", None),
+    # Badge counts per tutor.
+    ("idx_tutor_badges_tutor", "tutor_badges", "tutor_id", None),
+    # Notes list per tutor, newest first.
+    ("idx_posted_notes_tutor_date", "posted_notes", "tutor_id, date_posted DESC", None),
+    # Admin user list: pending reports per reported user.
+    ("idx_report_reported_pending", "report", "reported_id", "status = 'PENDING'"),
+]
+
+
+def upgrade(cursor):
+    for name, table, columns, where in INDEXES:
+        create_index(cursor, name, table, columns, where)
+
+
+def downgrade(cursor):
+    for name, _table, _columns, _where in reversed(INDEXES):
+        drop_index(cursor, name)
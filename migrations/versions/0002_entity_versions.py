@@ -0,0 +1,159 @@
+# migrations/versions/0002_entity_versions.py
+"""
+Per-tutor version counters behind the ETags of the tutor profile pages
+(utils/etag.py).
+
+`entity_version` holds one row per (scope, tutor_id); triggers bump it on
+every change to the data a scope renders:
+
+    profile  tutor, tutee, availability, teaches, program (name shown on the profile)
+    ratings  session_rating, appointment (status/date), availability (times),
+             tutee (rater names)
+    badges   tutor_badges
+    notes    posted_notes
+
+A missing row means "never changed since this migration" and reads as version 0.
+"""
+
+# (table, id column, scopes) for the tables whose rows carry the tutor id themselves.
+TRACKED = [
+    ("tutor", "tutor_id", ("profile",)),
+    ("availability", "tutor_id", ("profile", "ratings")),
+    ("teaches", "tutor_id", ("profile",)),
+    ("session_rating", "tutor_id", ("ratings",)),
+    ("tutor_badges", "tutor_id", ("badges",)),
+    ("posted_notes", "tutor_id", ("notes",)),
+]
+
+# Tables that reach the tutor through another table get their own trigger function.
+CUSTOM = ["tutee", "appointment", "program"]
+
+
+def upgrade(cursor):
+    cursor.execute("""
+        CREATE TABLE entity_version (
+            scope      TEXT NOT NULL,
+            entity_id  TEXT NOT NULL,
+            version    BIGINT NOT NULL DEFAULT 1,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp(),
+            PRIMARY KEY (scope, entity_id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE FUNCTION bump_entity_version(p_scope TEXT, p_id TEXT) RETURNS VOID AS $$
+            INSERT INTO entity_version (scope, entity_id)
+            SELECT p_scope, p_id WHERE p_id IS NOT NULL
+            ON CONFLICT (scope, entity_id) DO UPDATE
+            SET version = entity_version.version + 1, updated_at = clock_timestamp();
+        $$ LANGUAGE sql
+    """)
+
+    # TG_ARGV: id column, then the scopes to bump.
+    cursor.execute("""
+        CREATE FUNCTION entity_version_trigger() RETURNS trigger AS $$
+        DECLARE
+            old_id TEXT;
+            new_id TEXT;
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD IS NOT DISTINCT FROM NEW THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                EXECUTE format('SELECT ($1).%I::text', TG_ARGV[0]) USING OLD INTO old_id;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                EXECUTE format('SELECT ($1).%I::text', TG_ARGV[0]) USING NEW INTO new_id;
+            END IF;
+            FOR i IN 1 .. TG_NARGS - 1 LOOP
+                PERFORM bump_entity_version(TG_ARGV[i], old_id);
+                IF new_id IS DISTINCT FROM old_id THEN
+                    PERFORM bump_entity_version(TG_ARGV[i], new_id);
+                END IF;
+            END LOOP;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    cursor.execute("""
+        CREATE FUNCTION tutee_entity_version_trigger() RETURNS trigger AS $$
+        DECLARE
+            ids TEXT[] := ARRAY[]::TEXT[];
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD IS NOT DISTINCT FROM NEW THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN ids := ids || OLD.id_number::text; END IF;
+            IF TG_OP <> 'DELETE' THEN ids := ids || NEW.id_number::text; END IF;
+
+            PERFORM bump_entity_version('profile', id) FROM (SELECT DISTINCT unnest(ids) AS id) s;
+            -- Rater names appear on the ratings of every tutor this tutee rated.
+            PERFORM bump_entity_version('ratings', tutor_id)
+            FROM (SELECT DISTINCT tutor_id FROM session_rating WHERE tutee_id = ANY(ids)) s;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    cursor.execute("""
+        CREATE FUNCTION appointment_entity_version_trigger() RETURNS trigger AS $$
+        DECLARE
+            slots INT[] := ARRAY[]::INT[];
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD IS NOT DISTINCT FROM NEW THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN slots := slots || OLD.vacant_id; END IF;
+            IF TG_OP <> 'DELETE' THEN slots := slots || NEW.vacant_id; END IF;
+
+            PERFORM bump_entity_version('ratings', tutor_id)
+            FROM (SELECT DISTINCT tutor_id FROM availability WHERE vacant_id = ANY(slots)) s;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    cursor.execute("""
+        CREATE FUNCTION program_entity_version_trigger() RETURNS trigger AS $$
+        DECLARE
+            codes TEXT[] := ARRAY[]::TEXT[];
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD IS NOT DISTINCT FROM NEW THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN codes := codes || OLD.program_code::text; END IF;
+            IF TG_OP <> 'DELETE' THEN codes := codes || NEW.program_code::text; END IF;
+
+            PERFORM bump_entity_version('profile', t.tutor_id)
+            FROM tutor t
+            JOIN tutee te ON te.id_number = t.tutor_id
+            WHERE te.program_code = ANY(codes);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    for table, column, scopes in TRACKED:
+        args = ", ".join(f"'{arg}'" for arg in (column, *scopes))
+        cursor.execute(f"""
+            CREATE TRIGGER trg_entity_version
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION entity_version_trigger({args})
+        """)
+    for table in CUSTOM:
+        cursor.execute(f"""
+            CREATE TRIGGER trg_entity_version
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_entity_version_trigger()
+        """)
+
+
+def downgrade(cursor):
+    for table in [t for t, _c, _s in TRACKED] + CUSTOM:
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_entity_version ON {table}")
+    for table in CUSTOM:
+        cursor.execute(f"DROP FUNCTION IF EXISTS {table}_entity_version_trigger()")
+    cursor.execute("DROP FUNCTION IF EXISTS entity_version_trigger()")
+    cursor.execute("DROP FUNCTION IF EXISTS bump_entity_version(TEXT, TEXT)")
+    cursor.execute("DROP TABLE IF EXISTS entity_version")
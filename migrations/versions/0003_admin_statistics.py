@@ -0,0 +1,126 @@
+# migrations/versions/0003_admin_statistics.py
+"""
+Running totals behind the admin dashboard statistics
+(/api/tutor-applications/admin/statistics), so the endpoint reads a handful
+of rows instead of counting five tables on every load.
+
+`admin_statistic` holds one counter per name; row triggers apply +1/-1 for
+every row entering or leaving a counter, whichever code path (or Supabase)
+wrote it:
+
+    tutor_application  total_applications, applications_<status>
+    tutor              total_tutors
+    tutee              total_tutees
+    course             total_courses
+    appointment        active_sessions (status PENDING or BOOKED)
+
+TRUNCATE on any of them recounts everything with refresh_admin_statistics(),
+which can also be called by hand if the counters are ever in doubt.
+"""
+
+TABLES = ["tutor_application", "tutor", "tutee", "course", "appointment"]
+
+
+def upgrade(cursor):
+    cursor.execute("""
+        CREATE TABLE admin_statistic (
+            name       TEXT PRIMARY KEY,
+            value      BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT clock_timestamp()
+        )
+    """)
+
+    # The counters a row of `tbl` contributes to.
+    cursor.execute("""
+        CREATE FUNCTION admin_statistic_keys(tbl TEXT, r JSONB) RETURNS TEXT[] AS $$
+            SELECT CASE tbl
+                WHEN 'tutor_application' THEN
+                    ARRAY['total_applications', 'applications_' || lower(coalesce(r->>'status', 'unknown'))]
+                WHEN 'tutor' THEN ARRAY['total_tutors']
+                WHEN 'tutee' THEN ARRAY['total_tutees']
+                WHEN 'course' THEN ARRAY['total_courses']
+                WHEN 'appointment' THEN
+                    CASE WHEN r->>'status' IN ('PENDING', 'BOOKED') THEN ARRAY['active_sessions'] ELSE ARRAY[]::TEXT[] END
+                ELSE ARRAY[]::TEXT[]
+            END
+        $$ LANGUAGE sql IMMUTABLE
+    """)
+
+    cursor.execute("""
+        CREATE FUNCTION admin_statistic_trigger() RETURNS trigger AS $$
+        DECLARE
+            removed TEXT[] := ARRAY[]::TEXT[];
+            added   TEXT[] := ARRAY[]::TEXT[];
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN removed := admin_statistic_keys(TG_TABLE_NAME, to_jsonb(OLD)); END IF;
+            IF TG_OP <> 'DELETE' THEN added := admin_statistic_keys(TG_TABLE_NAME, to_jsonb(NEW)); END IF;
+            -- Most updates (e.g. BOOKED -> PENDING, profile edits) leave the counters alone.
+            IF removed = added THEN
+                RETURN NULL;
+            END IF;
+
+            INSERT INTO admin_statistic (name, value)
+            SELECT name, sum(delta)
+            FROM (
+                SELECT unnest(removed) AS name, -1 AS delta
+                UNION ALL
+                SELECT unnest(added), 1
+            ) d
+            GROUP BY name
+            HAVING sum(delta) <> 0
+            ON CONFLICT (name) DO UPDATE
+            SET value = admin_statistic.value + EXCLUDED.value, updated_at = clock_timestamp();
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    cursor.execute("""
+        CREATE FUNCTION refresh_admin_statistics() RETURNS VOID AS $$
+            DELETE FROM admin_statistic;
+            INSERT INTO admin_statistic (name, value)
+            SELECT 'total_applications', count(*) FROM tutor_application
+            UNION ALL
+            SELECT 'applications_' || lower(coalesce(status::text, 'unknown')), count(*)
+            FROM tutor_application GROUP BY 1
+            UNION ALL SELECT 'total_tutors', count(*) FROM tutor
+            UNION ALL SELECT 'total_tutees', count(*) FROM tutee
+            UNION ALL SELECT 'total_courses', count(*) FROM course
+            UNION ALL SELECT 'active_sessions', count(*) FROM appointment WHERE status IN ('PENDING', 'BOOKED');
+        $$ LANGUAGE sql
+    """)
+
+    cursor.execute("""
+        CREATE FUNCTION admin_statistic_truncate_trigger() RETURNS trigger AS $$
+        BEGIN
+            PERFORM refresh_admin_statistics();
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Hold off writers until the triggers exist and the first count is in.
+    cursor.execute(f"LOCK TABLE {', '.join(TABLES)} IN SHARE MODE")
+    for table in TABLES:
+        cursor.execute(f"""
+            CREATE TRIGGER trg_admin_statistic
+            AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION admin_statistic_trigger()
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER trg_admin_statistic_truncate
+            AFTER TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION admin_statistic_truncate_trigger()
+        """)
+    cursor.execute("SELECT refresh_admin_statistics()")
+
+
+def downgrade(cursor):
+    for table in TABLES:
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_admin_statistic ON {table}")
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_admin_statistic_truncate ON {table}")
+    cursor.execute("DROP FUNCTION IF EXISTS admin_statistic_truncate_trigger()")
+    cursor.execute("DROP FUNCTION IF EXISTS refresh_admin_statistics()")
+    cursor.execute("DROP FUNCTION IF EXISTS admin_statistic_trigger()")
+    cursor.execute("DROP FUNCTION IF EXISTS admin_statistic_keys(TEXT, JSONB)")
+    cursor.execute("DROP TABLE IF EXISTS admin_statistic")
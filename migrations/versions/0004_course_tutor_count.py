@@ -0,0 +1,130 @@
+# migrations/versions/0004_course_tutor_count.py
+"""
+Active tutor count per course for the admin course list
+(GET /api/admin/courses), so its tutor_count column and the `no_tutors` /
+`with_tutors` filters read one indexed row per course instead of
+aggregating teaches x tutor on every page.
+
+`course_tutor_count` has a row for every course (created by a trigger on
+course, removed with it). Triggers apply +1/-1 as:
+
+    teaches  rows of ACTIVE tutors are added or removed
+    tutor    a tutor becomes or stops being ACTIVE, or is deleted
+
+Counts are adjusted in place (never recounted inside a trigger) so that
+concurrent writers to the same course cannot overwrite each other.
+"""
+
+
+def upgrade(cursor):
+    cursor.execute("""
+        CREATE TABLE course_tutor_count (
+            course_code   TEXT PRIMARY KEY REFERENCES course (course_code) ON DELETE CASCADE ON UPDATE CASCADE,
+            active_tutors INT NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("CREATE INDEX idx_course_tutor_count_none ON course_tutor_count (course_code) WHERE active_tutors = 0")
+    cursor.execute("CREATE INDEX idx_course_tutor_count_some ON course_tutor_count (course_code) WHERE active_tutors > 0")
+
+    cursor.execute("""
+        CREATE FUNCTION course_tutor_count_course_trigger() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO course_tutor_count (course_code) VALUES (NEW.course_code)
+            ON CONFLICT (course_code) DO NOTHING;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    # FOR SHARE on the tutor row orders this against a concurrent status change,
+    # which would otherwise miss a teaches row it cannot see yet.
+    # A tutor that is gone was handled by its BEFORE DELETE trigger.
+    cursor.execute("""
+        CREATE FUNCTION course_tutor_count_teaches_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP <> 'INSERT' AND EXISTS (
+                SELECT 1 FROM tutor WHERE tutor_id = OLD.tutor_id AND status = 'ACTIVE' FOR SHARE
+            ) THEN
+                UPDATE course_tutor_count SET active_tutors = active_tutors - 1
+                WHERE course_code = OLD.course_code;
+            END IF;
+            IF TG_OP <> 'DELETE' AND EXISTS (
+                SELECT 1 FROM tutor WHERE tutor_id = NEW.tutor_id AND status = 'ACTIVE' FOR SHARE
+            ) THEN
+                UPDATE course_tutor_count SET active_tutors = active_tutors + 1
+                WHERE course_code = NEW.course_code;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Runs BEFORE DELETE so the tutor's teaches rows are still there to count,
+    # whether or not they are removed by a cascade afterwards.
+    cursor.execute("""
+        CREATE FUNCTION course_tutor_count_tutor_trigger() RETURNS trigger AS $$
+        DECLARE
+            was_active BOOLEAN := TG_OP <> 'INSERT' AND OLD.status IS NOT DISTINCT FROM 'ACTIVE';
+            is_active  BOOLEAN := TG_OP <> 'DELETE' AND NEW.status IS NOT DISTINCT FROM 'ACTIVE';
+        BEGIN
+            IF TG_OP = 'UPDATE' AND was_active = is_active AND OLD.tutor_id = NEW.tutor_id THEN
+                RETURN NULL;
+            END IF;
+            IF was_active THEN
+                UPDATE course_tutor_count ctc SET active_tutors = active_tutors - 1
+                FROM teaches te
+                WHERE te.tutor_id = OLD.tutor_id AND te.course_code = ctc.course_code;
+            END IF;
+            IF is_active THEN
+                UPDATE course_tutor_count ctc SET active_tutors = active_tutors + 1
+                FROM teaches te
+                WHERE te.tutor_id = NEW.tutor_id AND te.course_code = ctc.course_code;
+            END IF;
+            IF TG_OP = 'DELETE' THEN
+                RETURN OLD;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Hold off writers until the triggers exist and the first count is in.
+    cursor.execute("LOCK TABLE course, teaches, tutor IN SHARE MODE")
+    cursor.execute("""
+        CREATE TRIGGER trg_course_tutor_count
+        AFTER INSERT ON course
+        FOR EACH ROW EXECUTE FUNCTION course_tutor_count_course_trigger()
+    """)
+    cursor.execute("""
+        CREATE TRIGGER trg_course_tutor_count
+        AFTER INSERT OR UPDATE OR DELETE ON teaches
+        FOR EACH ROW EXECUTE FUNCTION course_tutor_count_teaches_trigger()
+    """)
+    cursor.execute("""
+        CREATE TRIGGER trg_course_tutor_count
+        AFTER INSERT OR UPDATE ON tutor
+        FOR EACH ROW EXECUTE FUNCTION course_tutor_count_tutor_trigger()
+    """)
+    cursor.execute("""
+        CREATE TRIGGER trg_course_tutor_count_delete
+        BEFORE DELETE ON tutor
+        FOR EACH ROW EXECUTE FUNCTION course_tutor_count_tutor_trigger()
+    """)
+
+    cursor.execute("""
+        INSERT INTO course_tutor_count (course_code, active_tutors)
+        SELECT c.course_code, COUNT(t.tutor_id)
+        FROM course c
+        LEFT JOIN teaches te ON te.course_code = c.course_code
+        LEFT JOIN tutor t ON t.tutor_id = te.tutor_id AND t.status = 'ACTIVE'
+        GROUP BY c.course_code
+    """)
+
+
+def downgrade(cursor):
+    cursor.execute("DROP TRIGGER IF EXISTS trg_course_tutor_count_delete ON tutor")
+    for table in ("tutor", "teaches", "course"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_course_tutor_count ON {table}")
+    for table in ("tutor", "teaches", "course"):
+        cursor.execute(f"DROP FUNCTION IF EXISTS course_tutor_count_{table}_trigger()")
+    cursor.execute("DROP TABLE IF EXISTS course_tutor_count")
@@ -0,0 +1,179 @@
+# migrations/versions/0005_tutor_reputation.py
+"""
+Per-tutor reputation summary: rating count, sum and 1-5 histogram, when the
+tutor was last rated, and the four badge totals. Read by
+models/tutorReputationModel instead of aggregating session_rating and
+tutor_badges on every request.
+
+Triggers keep `tutor_reputation` current as ratings are submitted
+(submit_rating sets session_rating.rating) and badges are given (the
+give_badges upsert): the old row's contribution is subtracted and the new
+one added, so changing a rating from 4 to 5, or unticking a badge, moves
+the counts instead of adding to them. Only submitted ratings (rating > 0)
+count, whatever the appointment's status, which is the same rule the tutor
+profile's rating summary and the tutor ratings list use. Rows are created
+on a tutor's first rating or badge.
+"""
+
+BADGES = ["friendly", "punctual", "engaging", "proficient"]
+
+
+def upgrade(cursor):
+    cursor.execute("""
+        CREATE TABLE tutor_reputation (
+            tutor_id         TEXT PRIMARY KEY REFERENCES tutor (tutor_id) ON DELETE CASCADE ON UPDATE CASCADE,
+            rating_count     INT NOT NULL DEFAULT 0,
+            rating_sum       BIGINT NOT NULL DEFAULT 0,
+            rating_1         INT NOT NULL DEFAULT 0,
+            rating_2         INT NOT NULL DEFAULT 0,
+            rating_3         INT NOT NULL DEFAULT 0,
+            rating_4         INT NOT NULL DEFAULT 0,
+            rating_5         INT NOT NULL DEFAULT 0,
+            last_rated_at    TIMESTAMPTZ,
+            friendly_count   INT NOT NULL DEFAULT 0,
+            punctual_count   INT NOT NULL DEFAULT 0,
+            engaging_count   INT NOT NULL DEFAULT 0,
+            proficient_count INT NOT NULL DEFAULT 0
+        )
+    """)
+
+    # The EXISTS skips tutors being deleted: their row goes with them.
+    cursor.execute("""
+        CREATE FUNCTION add_tutor_rating(p_tutor_id TEXT, p_rating INT, p_sign INT, p_rated_at TIMESTAMPTZ)
+        RETURNS VOID AS $$
+            INSERT INTO tutor_reputation AS r
+                (tutor_id, rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5, last_rated_at)
+            SELECT p_tutor_id, p_sign, p_sign * p_rating,
+                   p_sign * (p_rating = 1)::int, p_sign * (p_rating = 2)::int, p_sign * (p_rating = 3)::int,
+                   p_sign * (p_rating = 4)::int, p_sign * (p_rating = 5)::int, p_rated_at
+            WHERE EXISTS (SELECT 1 FROM tutor WHERE tutor_id = p_tutor_id)
+            ON CONFLICT (tutor_id) DO UPDATE SET
+                rating_count  = r.rating_count + EXCLUDED.rating_count,
+                rating_sum    = r.rating_sum + EXCLUDED.rating_sum,
+                rating_1      = r.rating_1 + EXCLUDED.rating_1,
+                rating_2      = r.rating_2 + EXCLUDED.rating_2,
+                rating_3      = r.rating_3 + EXCLUDED.rating_3,
+                rating_4      = r.rating_4 + EXCLUDED.rating_4,
+                rating_5      = r.rating_5 + EXCLUDED.rating_5,
+                last_rated_at = GREATEST(r.last_rated_at, EXCLUDED.last_rated_at);
+        $$ LANGUAGE sql
+    """)
+
+    cursor.execute("""
+        CREATE FUNCTION add_tutor_badges(p_tutor_id TEXT, p_sign INT, p_friendly BOOLEAN, p_punctual BOOLEAN,
+                                         p_engaging BOOLEAN, p_proficient BOOLEAN)
+        RETURNS VOID AS $$
+            INSERT INTO tutor_reputation AS r
+                (tutor_id, friendly_count, punctual_count, engaging_count, proficient_count)
+            SELECT p_tutor_id,
+                   p_sign * COALESCE(p_friendly, FALSE)::int, p_sign * COALESCE(p_punctual, FALSE)::int,
+                   p_sign * COALESCE(p_engaging, FALSE)::int, p_sign * COALESCE(p_proficient, FALSE)::int
+            WHERE EXISTS (SELECT 1 FROM tutor WHERE tutor_id = p_tutor_id)
+            ON CONFLICT (tutor_id) DO UPDATE SET
+                friendly_count   = r.friendly_count + EXCLUDED.friendly_count,
+                punctual_count   = r.punctual_count + EXCLUDED.punctual_count,
+                engaging_count   = r.engaging_count + EXCLUDED.engaging_count,
+                proficient_count = r.proficient_count + EXCLUDED.proficient_count;
+        $$ LANGUAGE sql
+    """)
+
+    cursor.execute("""
+        CREATE FUNCTION tutor_reputation_rating_trigger() RETURNS trigger AS $$
+        DECLARE
+            old_rating INT := CASE WHEN TG_OP <> 'INSERT' AND OLD.rating > 0 THEN OLD.rating END;
+            new_rating INT := CASE WHEN TG_OP <> 'DELETE' AND NEW.rating > 0 THEN NEW.rating END;
+        BEGIN
+            -- Comment edits and pending rows leave the summary alone.
+            IF TG_OP = 'UPDATE' AND OLD.tutor_id IS NOT DISTINCT FROM NEW.tutor_id
+               AND old_rating IS NOT DISTINCT FROM new_rating THEN
+                RETURN NULL;
+            END IF;
+            IF old_rating IS NOT NULL THEN
+                PERFORM add_tutor_rating(OLD.tutor_id::text, old_rating, -1, NULL);
+            END IF;
+            IF new_rating IS NOT NULL THEN
+                PERFORM add_tutor_rating(NEW.tutor_id::text, new_rating, 1, clock_timestamp());
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    cursor.execute("""
+        CREATE FUNCTION tutor_reputation_badges_trigger() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND (OLD.tutor_id, OLD.friendly, OLD.punctual, OLD.engaging, OLD.proficient)
+                    IS NOT DISTINCT FROM (NEW.tutor_id, NEW.friendly, NEW.punctual, NEW.engaging, NEW.proficient) THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                PERFORM add_tutor_badges(OLD.tutor_id::text, -1, OLD.friendly, OLD.punctual, OLD.engaging, OLD.proficient);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                PERFORM add_tutor_badges(NEW.tutor_id::text, 1, NEW.friendly, NEW.punctual, NEW.engaging, NEW.proficient);
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+
+    # Hold off writers until the triggers exist and the first count is in.
+    cursor.execute("LOCK TABLE session_rating, tutor_badges IN SHARE MODE")
+    cursor.execute("""
+        CREATE TRIGGER trg_tutor_reputation
+        AFTER INSERT OR UPDATE OR DELETE ON session_rating
+        FOR EACH ROW EXECUTE FUNCTION tutor_reputation_rating_trigger()
+    """)
+    cursor.execute("""
+        CREATE TRIGGER trg_tutor_reputation
+        AFTER INSERT OR UPDATE OR DELETE ON tutor_badges
+        FOR EACH ROW EXECUTE FUNCTION tutor_reputation_badges_trigger()
+    """)
+
+    # No rated-at column exists yet, so history is dated by when its rating rows were created.
+    badge_sums = ", ".join(f"COUNT(*) FILTER (WHERE b.{badge}) AS {badge}_count" for badge in BADGES)
+    cursor.execute(f"""
+        INSERT INTO tutor_reputation (
+            tutor_id, rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5, last_rated_at,
+            friendly_count, punctual_count, engaging_count, proficient_count
+        )
+        SELECT
+            t.tutor_id,
+            COALESCE(r.rating_count, 0), COALESCE(r.rating_sum, 0),
+            COALESCE(r.rating_1, 0), COALESCE(r.rating_2, 0), COALESCE(r.rating_3, 0),
+            COALESCE(r.rating_4, 0), COALESCE(r.rating_5, 0), r.last_rated_at,
+            COALESCE(b.friendly_count, 0), COALESCE(b.punctual_count, 0),
+            COALESCE(b.engaging_count, 0), COALESCE(b.proficient_count, 0)
+        FROM tutor t
+        LEFT JOIN (
+            SELECT
+                tutor_id,
+                COUNT(*) AS rating_count,
+                SUM(rating) AS rating_sum,
+                COUNT(*) FILTER (WHERE rating = 1) AS rating_1,
+                COUNT(*) FILTER (WHERE rating = 2) AS rating_2,
+                COUNT(*) FILTER (WHERE rating = 3) AS rating_3,
+                COUNT(*) FILTER (WHERE rating = 4) AS rating_4,
+                COUNT(*) FILTER (WHERE rating = 5) AS rating_5,
+                MAX(created_at) AS last_rated_at
+            FROM session_rating
+            WHERE rating > 0
+            GROUP BY tutor_id
+        ) r ON r.tutor_id = t.tutor_id
+        LEFT JOIN (
+            SELECT b.tutor_id, {badge_sums}
+            FROM tutor_badges b
+            GROUP BY b.tutor_id
+        ) b ON b.tutor_id = t.tutor_id
+        WHERE r.tutor_id IS NOT NULL OR b.tutor_id IS NOT NULL
+    """)
+
+
+def downgrade(cursor):
+    cursor.execute("DROP TRIGGER IF EXISTS trg_tutor_reputation ON tutor_badges")
+    cursor.execute("DROP TRIGGER IF EXISTS trg_tutor_reputation ON session_rating")
+    cursor.execute("DROP FUNCTION IF EXISTS tutor_reputation_badges_trigger()")
+    cursor.execute("DROP FUNCTION IF EXISTS tutor_reputation_rating_trigger()")
+    cursor.execute("DROP FUNCTION IF EXISTS add_tutor_badges(TEXT, INT, BOOLEAN, BOOLEAN, BOOLEAN, BOOLEAN)")
+    cursor.execute("DROP FUNCTION IF EXISTS add_tutor_rating(TEXT, INT, INT, TIMESTAMPTZ)")
+    cursor.execute("DROP TABLE IF EXISTS tutor_reputation")
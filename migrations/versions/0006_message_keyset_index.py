@@ -0,0 +1,18 @@
+# migrations/versions/0006_message_keyset_index.py
+"""
+Index for keyset-paginated chat history (MessageModel.get_messages_by_appointment):
+WHERE appointment_id = %s AND message_id < %s ORDER BY message_id DESC LIMIT n.
+"""
+from migrations import create_index, drop_index
+
+TRANSACTIONAL = False
+
+INDEX = ("idx_message_appointment_id", "message", "appointment_id, message_id", None)
+
+
+def upgrade(cursor):
+    create_index(cursor, *INDEX)
+
+
+def downgrade(cursor):
+    drop_index(cursor, INDEX[0])
@@ -4,8 +4,9 @@
 # from your main application file (e.g., 'from app import socketio'). Adjust if needed.
 from app import socketio 
 from dataclasses import dataclass
-from utils.db import get_connection
+from utils.db import get_connection, after_commit
 from psycopg2.extras import RealDictCursor
+from models.senderNameModel.senderNameModel import SenderNames
 
 @dataclass
 class Notification:
@@ -69,10 +70,8 @@ class Notification:
 
                 # 3. Emit the socket event with the updated, unread notification
                 if updated_row:
-                    # Get sender name
-                    cur.execute("SELECT first_name, last_name FROM tutee WHERE id_number = %s", (updated_row['sender_id'],))
-                    sender_name_row = cur.fetchone()
-                    sender_name = f"{sender_name_row['first_name']} {sender_name_row['last_name']}" if sender_name_row else "Someone"
+                    # Get sender name (cached)
+                    sender_name = SenderNames.get(updated_row['sender_id']) or "Someone"
 
                     updated_row_payload = {
                         **updated_row,
@@ -81,8 +80,13 @@ class Notification:
                     }
 
                     personal_room = str(recipient_id)
-                    socketio.emit("new_global_notification", updated_row_payload, room=personal_room)
-                    print(f"🔔 Emitted UPDATED new_global_notification (marked unread) to room: {personal_room}")
+
+                    # Only announce it once it is committed (deferred inside a unit of work)
+                    def emit_update():
+                        socketio.emit("new_global_notification", updated_row_payload, room=personal_room)
+                        print(f"🔔 Emitted UPDATED new_global_notification (marked unread) to room: {personal_room}")
+
+                    after_commit(emit_update)
 
             except Exception as e:
                 print(f"Error updating notification timestamp and unread status: {e}")
@@ -103,11 +107,9 @@ class Notification:
         new_notification_data = None
         try:
             
-            # Get sender name for the message text
-            cur.execute("SELECT first_name, last_name FROM tutee WHERE id_number = %s", (sender_id,))
-            sender = cur.fetchone()
+            # Get sender name for the message text (cached)
             # Handle potential None if tutee not found, though FK should prevent this
-            sender_name = f"{sender['first_name']} {sender['last_name']}" if sender else "Someone"
+            sender_name = SenderNames.get(sender_id) or "Someone"
             
             full_message = f"{sender_name} {msg_suffix}"
             
@@ -131,8 +133,13 @@ class Notification:
                 }
                 
                 personal_room = str(recipient_id)
-                socketio.emit("new_global_notification", new_notification_data, room=personal_room)
-                print(f"🔔 Emitted new_global_notification (type: {type}) to room: {personal_room}")
+
+                # Only announce it once it is committed (deferred inside a unit of work)
+                def emit_new():
+                    socketio.emit("new_global_notification", new_notification_data, room=personal_room)
+                    print(f"🔔 Emitted new_global_notification (type: {type}) to room: {personal_room}")
+
+                after_commit(emit_new)
 
         except Exception as e:
             print(f"Error creating notification: {e}")
@@ -0,0 +1,124 @@
+# models/catalogModel/catalogModel.py
+"""
+In-process cache of the reference data every form and filter needs:
+programs, courses, and the courses currently offered by a tutor.
+
+The catalog is loaded at startup and served from memory. Admin write paths
+call Catalog.invalidate() (after their transaction commits) and the next
+read reloads it. CATALOG_TTL_SECONDS bounds how stale another worker
+process's copy can get, since invalidation is only local.
+
+Each snapshot carries a content hash ETag, identical across processes for
+identical data, so clients can revalidate with If-None-Match.
+"""
+import hashlib
+import json
+import threading
+import time
+
+from psycopg2.extras import RealDictCursor
+
+from config import Config
+from utils.db import after_commit, get_connection
+
+
+class CatalogSnapshot:
+    def __init__(self, programs, courses, offered_courses, version):
+        self.programs = programs
+        self.courses = courses
+        self.offered_courses = offered_courses
+        self.version = version
+        self.loaded_at = time.monotonic()
+        payload = json.dumps([programs, courses, offered_courses], sort_keys=True, default=str)
+        self.etag = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def search_course_codes(self, search, limit, offset):
+        """Same result as `course_code ILIKE '%search%' ORDER BY course_code LIMIT/OFFSET`."""
+        needle = search.lower()
+        codes = sorted({c["course_code"] for c in self.courses if needle in c["course_code"].lower()})
+        return codes[offset:offset + limit]
+
+
+class Catalog:
+    _lock = threading.Lock()
+    _snapshot = None
+    _version = 0
+    _generation = 0   # bumped by every invalidation
+
+    @classmethod
+    def _fresh(cls, snapshot):
+        ttl = getattr(Config, "CATALOG_TTL_SECONDS", 300)
+        return snapshot is not None and not (ttl and time.monotonic() - snapshot.loaded_at > ttl)
+
+    @classmethod
+    def get(cls):
+        snapshot = cls._snapshot
+        if cls._fresh(snapshot):
+            return snapshot
+        with cls._lock:
+            # Another request may have reloaded it while we waited.
+            snapshot = cls._snapshot
+            if cls._fresh(snapshot):
+                return snapshot
+            return cls._read()
+
+    @classmethod
+    def load(cls):
+        """Reads the catalog from the primary and swaps it in."""
+        with cls._lock:
+            return cls._read()
+
+    @classmethod
+    def _read(cls):
+        generation = cls._generation
+        conn = get_connection(readonly=False)
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        try:
+            cur.execute("""
+                SELECT program_code, program_name
+                FROM program
+                ORDER BY program_name;
+            """)
+            programs = [dict(row) for row in cur.fetchall()]
+
+            cur.execute("""
+                SELECT course_code, course_name
+                FROM course
+                ORDER BY course_code;
+            """)
+            courses = [dict(row) for row in cur.fetchall()]
+
+            # Courses offered by at least one tutor
+            cur.execute("""
+                SELECT DISTINCT c.course_code, c.course_name
+                FROM teaches th
+                JOIN course c ON th.course_code = c.course_code
+                ORDER BY c.course_name;
+            """)
+            offered = [dict(row) for row in cur.fetchall()]
+        finally:
+            cur.close()
+            conn.close()
+
+        cls._version += 1
+        snapshot = CatalogSnapshot(programs, courses, offered, cls._version)
+        # An invalidation that landed while we were reading means this copy may be stale already.
+        if generation == cls._generation:
+            cls._snapshot = snapshot
+        return snapshot
+
+    @classmethod
+    def invalidate(cls):
+        """Drops the cached catalog once the current transaction commits."""
+        def drop():
+            cls._generation += 1
+            cls._snapshot = None
+        after_commit(drop)
+
+    @classmethod
+    def warm_up(cls):
+        try:
+            cls.load()
+        except Exception as e:
+            # Not fatal: the first request loads it instead.
+            print(f"⚠️ [Catalog] Could not preload course catalog: {e}")
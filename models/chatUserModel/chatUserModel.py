@@ -1,5 +1,6 @@
 # models/chatUserModel/chatUserModel.py
 from utils.db import get_connection
+from utils.db_prepared import prepared_statement
 
 class UserModel:
     @staticmethod
@@ -7,7 +8,7 @@ class UserModel:
         conn = get_connection()
         cur = conn.cursor()
         
-        query = """
+        query = prepared_statement("chat_users_for_user", """
             SELECT 
                 CASE WHEN a.tutee_id = %s THEN tutor_info.first_name ELSE student_info.first_name END as first_name,
                 CASE WHEN a.tutee_id = %s THEN tutor_info.last_name ELSE student_info.last_name END as last_name,
@@ -35,13 +36,13 @@ class UserModel:
             ORDER BY 
                 (SELECT MAX(timestamp) FROM message WHERE message.appointment_id = a.appointment_id) DESC NULLS LAST, 
                 a.appointment_date DESC;
-        """
+        """)
 
         # 🔴 Pass user_id 6 times
         params = (user_id, user_id, user_id, user_id, user_id, user_id)
 
         try:
-            cur.execute(query, params)
+            query.execute(cur, params)
             results = cur.fetchall()
             
             users = []
@@ -2,6 +2,7 @@ from dataclasses import dataclass, asdict
 from typing import List, Optional
 from psycopg2.extras import RealDictCursor
 from utils.db import get_connection
+from models.catalogModel.catalogModel import Catalog
 
 @dataclass
 class Program:
@@ -50,22 +51,10 @@ class FillOutData:
             if not tutee_res:
                 return None
 
-            # 2. Fetch Programs
-            cur.execute("""
-                SELECT program_code, program_name
-                FROM program
-                ORDER BY program_name;
-            """)
-            programs = [Program(**row) for row in cur.fetchall()]
-
-            # 3. Fetch Courses (Only those offered by active tutors)
-            cur.execute("""
-                SELECT DISTINCT c.course_code, c.course_name
-                FROM teaches th
-                JOIN course c ON th.course_code = c.course_code
-                ORDER BY c.course_name;
-            """)
-            courses = [Course(**row) for row in cur.fetchall()]
+            # 2. Programs and offered courses come from the in-memory catalog
+            catalog = Catalog.get()
+            programs = [Program(**row) for row in catalog.programs]
+            courses = [Course(**row) for row in catalog.offered_courses]
 
             # Return the populated dataclass
             return cls(
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from psycopg2.extras import RealDictCursor
 from psycopg2 import IntegrityError
 from utils.db import get_connection
+from utils import identity
 
 @dataclass
 class PendingAppointment:
@@ -13,16 +14,9 @@ class PendingAppointment:
 
     @staticmethod
     def get_tutee_id_by_google_id(google_id):
-        """Fetches the tutee's ID number using their Google ID."""
-        conn = get_connection()
-        cur = conn.cursor(cursor_factory=RealDictCursor)
-        try:
-            cur.execute("SELECT id_number FROM tutee WHERE google_id = %s LIMIT 1;", (google_id,))
-            result = cur.fetchone()
-            return result["id_number"] if result else None
-        finally:
-            cur.close()
-            conn.close()
+        """Fetches the tutee's ID number using their Google ID (session claims when it's the current user)."""
+        claims = identity.lookup(google_id=google_id)
+        return claims["id_number"] if claims else None
 
     @staticmethod
     def get_tutor_from_vacant(vacant_id):
@@ -39,6 +33,8 @@ class PendingAppointment:
                 return result[0] if result else None
         except Exception as e:
             print(f"Error fetching tutor for vacant_id {vacant_id}: {e}")
+            # The failed statement aborted the transaction; inside a unit of work this dooms it
+            conn.rollback()
             return None
         finally:
             conn.close()
@@ -2,6 +2,8 @@ from dataclasses import dataclass, field
 from datetime import datetime, time
 from psycopg2.extras import RealDictCursor
 from utils.db import get_connection
+from utils import identity
+from utils.db_prepared import prepared_statement
 
 @dataclass
 class AvailabilityCard:
@@ -26,43 +28,31 @@ class AvailabilityCard:
     @classmethod
     def _resolve_viewer_id(cls, email: str) -> str:
         """
-        Internal Helper: Resolves an email to an ID by joining user_account + tutee.
+        Internal Helper: Resolves an email to an ID via the identity claims
+        (the session for the logged-in user, user_account + tutee otherwise).
         Only returns ID if the user is an ACTIVE TUTOR.
         """
         if not email:
             return None
 
-        conn = get_connection()
         try:
-            with conn.cursor() as cur:
-                # 🚨 FIXED QUERY: Join user_account to get email, then link to tutee
-                query = """
-                    SELECT t.id_number, tr.status
-                    FROM user_account ua
-                    JOIN tutee t ON ua.google_id = t.google_id
-                    LEFT JOIN tutor tr ON t.id_number = tr.tutor_id
-                    WHERE ua.email = %s
-                """
-                cur.execute(query, (email,))
-                row = cur.fetchone()
+            claims = identity.lookup(email=email)
 
-                if row:
-                    db_id, tutor_status = row
-                    # BUSINESS RULE: Only prevent self-booking if they are an ACTIVE TUTOR
-                    if tutor_status == 'ACTIVE':
-                        print(f"✅ [Model] User is Active Tutor. Hiding slots for ID: {db_id}")
-                        return db_id
-                    else:
-                        print(f"ℹ️ [Model] User is {tutor_status}. Showing all slots.")
+            if claims and claims["id_number"]:
+                db_id, tutor_status = claims["id_number"], claims["tutor_status"]
+                # BUSINESS RULE: Only prevent self-booking if they are an ACTIVE TUTOR
+                if tutor_status == 'ACTIVE':
+                    print(f"✅ [Model] User is Active Tutor. Hiding slots for ID: {db_id}")
+                    return db_id
                 else:
-                    print(f"⚠️ [Model] Email {email} not found in user_account/tutee tables.")
-                
-                return None
+                    print(f"ℹ️ [Model] User is {tutor_status}. Showing all slots.")
+            else:
+                print(f"⚠️ [Model] Email {email} not found in user_account/tutee tables.")
+            
+            return None
         except Exception as e:
             print(f"❌ [Model] Error resolving user: {e}")
             return None
-        finally:
-            conn.close()
 
     @classmethod
     def fetch_available_slots(cls, course_code: str, date_str: str, user_email: str = None):
@@ -85,8 +75,8 @@ class AvailabilityCard:
         conn = get_connection()
         cur = conn.cursor(cursor_factory=RealDictCursor)
 
-        # 3. Main Query
-        query = """
+        # 3. Main Query (prepared once per pooled connection)
+        query = prepared_statement("available_slots", """
             SELECT
                 av.vacant_id,
                 tr.tutor_id,
@@ -117,10 +107,10 @@ class AvailabilityCard:
                     AND a.appointment_date = %s
               )
             ORDER BY av.start_time;
-        """
+        """)
 
         try:
-            cur.execute(query, [
+            query.execute(cur, [
                 course_code, 
                 day_of_week_name, 
                 viewer_id, 
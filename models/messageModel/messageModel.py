@@ -1,56 +1,149 @@
-from utils.db import get_connection
+import threading
+from collections import OrderedDict
+from utils.db import get_connection, after_commit
 from datetime import datetime
+from config import Config
+from models.recentMessagesModel.recentMessagesModel import RecentMessages
+from utils import message_writer
 
 class MessageModel:
+    # appointment_id -> (tutee_id, tutor_id). An appointment's participants never change,
+    # so entries only leave when the appointment is deleted or the LRU bound pushes them out.
+    _participants = OrderedDict()
+    _participants_lock = threading.Lock()
+
+    @classmethod
+    def get_messages_by_appointment(cls, appointment_id, before=None, after=None, limit=None):
+        """
+        One page of an appointment's messages, oldest first, keyed on message_id:
+        the latest `limit` by default, the `limit` older than `before`, or the
+        `limit` newer than `after`. Returns (messages, has_more), where has_more
+        says whether more messages lie beyond the page in that direction, and
+        ([], False) when the page could not be read (see read_page).
+        """
+        try:
+            return cls.read_page(appointment_id, before=before, after=after, limit=limit)
+        except Exception as e:
+            print(f"Error getting messages: {e}")
+            return [], False
+
+    @classmethod
+    def read_page(cls, appointment_id, before=None, after=None, limit=None):
+        """
+        Same as get_messages_by_appointment, but raises when the database read
+        fails, for callers that must not mistake a failure for "no messages".
+        Recently active rooms are answered from RecentMessages when it can.
+        """
+        page_size = getattr(Config, "CHAT_PAGE_SIZE", 50)
+        limit = max(1, min(int(limit or page_size), getattr(Config, "CHAT_PAGE_MAX_SIZE", 200)))
+        key = cls._appointment_key(appointment_id)
+
+        if key is not None and before is None:
+            if after is None:
+                page = RecentMessages.latest(key, limit)
+                if page is not None:
+                    return page
+                return RecentMessages.load(key, lambda: cls._read_messages(appointment_id, None, None, limit))
+            newer = RecentMessages.since(key, int(after))
+            if newer is not None:
+                return newer[:limit], len(newer) > limit
+        return cls._read_messages(appointment_id, before, after, limit)
+
     @staticmethod
-    def get_messages_by_appointment(appointment_id):
+    def _read_messages(appointment_id, before, after, limit):
+        # With write-behind on, messages may still be queued; get them into the table first.
+        message_writer.sync(appointment_id)
+
+        conditions = ["appointment_id = %s"]
+        params = [appointment_id]
+        if after is not None:
+            conditions.append("message_id > %s")
+            params.append(after)
+            order = "ASC"
+        else:
+            if before is not None:
+                conditions.append("message_id < %s")
+                params.append(before)
+            order = "DESC"
+
         conn = get_connection()
         cur = conn.cursor()
-        query = """
-            SELECT sender_id, message_text, timestamp 
+        # One extra row tells whether there is another page.
+        query = f"""
+            SELECT message_id, sender_id, message_text, timestamp 
             FROM message 
-            WHERE appointment_id = %s 
-            ORDER BY timestamp ASC
+            WHERE {" AND ".join(conditions)}
+            ORDER BY message_id {order}
+            LIMIT %s
         """
         try:
-            cur.execute(query, (appointment_id,))
+            cur.execute(query, params + [limit + 1])
             results = cur.fetchall()
+            has_more = len(results) > limit
+            results = results[:limit]
+            if order == "DESC":
+                results.reverse()
             messages = []
             for row in results:
                 messages.append({
-                    "sender_id": row[0],
-                    "message_text": row[1],
-                    "timestamp": row[2].isoformat() if row[2] else None
+                    "message_id": row[0],
+                    "sender_id": row[1],
+                    "message_text": row[2],
+                    "timestamp": row[3].isoformat() if row[3] else None
                 })
-            return messages
-        except Exception as e:
-            print(f"Error getting messages: {e}")
-            return []
+            return messages, has_more
+        except Exception:
+            # Leave the shared connection usable for the caller's next query
+            conn.rollback()
+            raise
         finally:
             cur.close()
             conn.close()
 
     @staticmethod
     def save_message(appointment_id, sender_id, message_text):
+        """Returns (message_id, timestamp); message_id is None if the insert failed."""
+        if message_writer.enabled():
+            # Queued for a batched insert; the id and timestamp are final already
+            try:
+                message_id, timestamp = message_writer.submit(appointment_id, sender_id, message_text)
+            except Exception as e:
+                print(f"Error queueing message: {e}")
+                return None, datetime.now()
+            MessageModel._remember_recent(appointment_id, message_id, sender_id, message_text, timestamp)
+            return message_id, timestamp
+
         conn = get_connection()
         cur = conn.cursor()
         query = """
             INSERT INTO message (appointment_id, sender_id, message_text)
             VALUES (%s, %s, %s)
-            RETURNING timestamp
+            RETURNING message_id, timestamp
         """
         try:
             cur.execute(query, (appointment_id, sender_id, message_text))
-            timestamp = cur.fetchone()[0]
+            message_id, timestamp = cur.fetchone()
             conn.commit()
-            return timestamp
+            MessageModel._remember_recent(appointment_id, message_id, sender_id, message_text, timestamp)
+            return message_id, timestamp
         except Exception as e:
             print(f"Error saving message: {e}")
-            return datetime.now()
+            return None, datetime.now()
         finally:
             cur.close()
             conn.close()
 
+    @classmethod
+    def _remember_recent(cls, appointment_id, message_id, sender_id, message_text, timestamp):
+        key = cls._appointment_key(appointment_id)
+        if key is not None:
+            RecentMessages.append(key, {
+                "message_id": message_id,
+                "sender_id": sender_id,
+                "message_text": message_text,
+                "timestamp": timestamp.isoformat() if timestamp else None
+            })
+
     @staticmethod
     def mark_messages_as_read(appointment_id, user_id):
         """Mark messages in this appointment as read if they were sent by the OTHER person."""
@@ -72,12 +165,21 @@ class MessageModel:
             conn.close()
 
     # 🟢 NEW: Fetches the student and tutor for an appointment
-    @staticmethod
-    def get_appointment_participants(appointment_id):
+    @classmethod
+    def get_appointment_participants(cls, appointment_id):
         """
         Helper: Returns (tutee_id, tutor_id) for a specific appointment.
         Used to determine who receives the chat notification.
+        Served from memory once the appointment has been seen.
         """
+        key = cls._appointment_key(appointment_id)
+        if key is not None:
+            with cls._participants_lock:
+                cached = cls._participants.get(key)
+                if cached is not None:
+                    cls._participants.move_to_end(key)
+                    return cached
+
         conn = get_connection()
         cur = conn.cursor()
         try:
@@ -89,10 +191,65 @@ class MessageModel:
                 WHERE a.appointment_id = %s
             """
             cur.execute(query, (appointment_id,))
-            return cur.fetchone() # Returns tuple (student_id, tutor_id)
+            row = cur.fetchone() # Returns tuple (student_id, tutor_id)
+            if row and key is not None:
+                cls._remember_participants({key: row})
+            return row
         except Exception as e:
             print(f"Error fetching participants: {e}")
             return None
         finally:
             cur.close()
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+    @classmethod
+    def preload_participants(cls, appointment_ids):
+        """Caches the participants of every appointment in `appointment_ids` not cached yet, in one query."""
+        keys = {cls._appointment_key(appt_id) for appt_id in appointment_ids} - {None}
+        with cls._participants_lock:
+            missing = [key for key in keys if key not in cls._participants]
+        if not missing:
+            return
+
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("""
+                SELECT a.appointment_id, a.tutee_id, av.tutor_id
+                FROM appointment a
+                JOIN availability av ON a.vacant_id = av.vacant_id
+                WHERE a.appointment_id = ANY(%s)
+            """, (missing,))
+            cls._remember_participants({row[0]: (row[1], row[2]) for row in cur.fetchall()})
+        except Exception as e:
+            print(f"Error preloading participants: {e}")
+        finally:
+            cur.close()
+            conn.close()
+
+    @classmethod
+    def forget_participants(cls, appointment_id):
+        """Evicts a deleted appointment once the current transaction commits."""
+        key = cls._appointment_key(appointment_id)
+
+        def drop():
+            with cls._participants_lock:
+                cls._participants.pop(key, None)
+        after_commit(drop)
+
+    @classmethod
+    def _remember_participants(cls, entries):
+        limit = getattr(Config, "CHAT_PARTICIPANT_CACHE_SIZE", 10000)
+        with cls._participants_lock:
+            for key, participants in entries.items():
+                cls._participants[key] = tuple(participants)
+                cls._participants.move_to_end(key)
+            while len(cls._participants) > limit:
+                cls._participants.popitem(last=False)
+
+    @staticmethod
+    def _appointment_key(appointment_id):
+        try:
+            return int(appointment_id)
+        except (TypeError, ValueError):
+            return None
\ No newline at end of file
@@ -0,0 +1,174 @@
+# models/recentMessagesModel/recentMessagesModel.py
+"""
+Per-room ring buffer of the most recent chat messages, so joining (or
+rejoining) a conversation that was active a few minutes ago is answered
+from memory instead of the message table.
+
+A room is buffered once its latest page has been read from the database;
+from then on every message saved through MessageModel.save_message is
+appended, and the oldest fall off past CHAT_RECENT_BUFFER_SIZE. Rooms idle
+for CHAT_RECENT_BUFFER_IDLE_SECONDS are dropped, and the least recently used
+rooms are dropped while all buffers together hold more than
+CHAT_RECENT_BUFFER_MAX_BYTES of message text.
+
+Anything the buffer cannot answer exactly (older pages, a page larger than
+what is buffered) returns None and the caller reads the database. Messages
+saved by other worker processes are not seen here, so a room is also dropped
+CHAT_RECENT_BUFFER_MAX_AGE_SECONDS after it was loaded, however busy it is:
+that bounds how long a buffer can lag behind the database.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+from config import Config
+from utils.db import after_commit
+
+# Rough per-message overhead on top of the text (dict, ids, timestamp string).
+_MESSAGE_OVERHEAD = 200
+
+
+def _size(message):
+    return _MESSAGE_OVERHEAD + len(message.get("message_text") or "")
+
+
+class _Room:
+    def __init__(self, messages, has_more, capacity):
+        self.messages = deque(messages, maxlen=capacity)   # oldest first
+        self.has_more = has_more or len(messages) > capacity   # older messages exist beyond the buffer
+        self.bytes = sum(_size(m) for m in self.messages)
+        self.loaded_at = self.used_at = time.monotonic()
+
+
+class RecentMessages:
+    _lock = threading.Lock()
+    _rooms = OrderedDict()   # appointment_id -> _Room, least recently used first
+    _bytes = 0
+    _loading = {}            # appointment_id -> True once a message was saved while it was being read
+
+    @classmethod
+    def latest(cls, appointment_id, limit):
+        """(messages, has_more) for the latest `limit` messages, or None when not buffered."""
+        with cls._lock:
+            room = cls._use(appointment_id)
+            if room is None:
+                return None
+            buffered = len(room.messages)
+            if buffered < limit and room.has_more:
+                return None
+            page = list(room.messages)[-limit:]
+            return [dict(m) for m in page], buffered > limit or room.has_more
+
+    @classmethod
+    def since(cls, appointment_id, after):
+        """Messages newer than message_id `after`, or None when the buffer does not reach back that far."""
+        with cls._lock:
+            room = cls._use(appointment_id)
+            if room is None:
+                return None
+            if room.has_more and (not room.messages or after < room.messages[0]["message_id"]):
+                return None
+            return [dict(m) for m in room.messages if m["message_id"] > after]
+
+    @classmethod
+    def load(cls, appointment_id, read):
+        """
+        Runs read() -> (messages, has_more) for a room's latest page and buffers
+        the result, unless a message was saved in the meantime or another load of
+        the same room is already running (then the page is only returned).
+        """
+        with cls._lock:
+            owner = appointment_id not in cls._loading
+            if owner:
+                cls._loading[appointment_id] = False
+        if not owner:
+            return read()
+
+        try:
+            messages, has_more = read()
+        except Exception:
+            with cls._lock:
+                cls._loading.pop(appointment_id, None)
+            raise
+
+        capacity = getattr(Config, "CHAT_RECENT_BUFFER_SIZE", 50)
+        with cls._lock:
+            raced = cls._loading.pop(appointment_id, True)
+            if not raced and appointment_id not in cls._rooms:
+                room = _Room([dict(m) for m in messages], has_more, capacity)
+                cls._rooms[appointment_id] = room
+                cls._bytes += room.bytes
+                cls._trim()
+        return messages, has_more
+
+    @classmethod
+    def append(cls, appointment_id, message):
+        """Adds a just-saved message to its room's buffer, if the room is buffered."""
+        with cls._lock:
+            if appointment_id in cls._loading:
+                cls._loading[appointment_id] = True
+            room = cls._use(appointment_id)
+            if room is None:
+                return
+            # Concurrent sends can finish out of order; keep the buffer sorted by id.
+            position = len(room.messages)
+            while position and room.messages[position - 1]["message_id"] > message["message_id"]:
+                position -= 1
+            if position and room.messages[position - 1]["message_id"] == message["message_id"]:
+                return   # the load that created the room already read it
+            if len(room.messages) == room.messages.maxlen:
+                if position == 0:
+                    room.has_more = True
+                    return
+                dropped = room.messages.popleft()
+                room.bytes -= _size(dropped)
+                cls._bytes -= _size(dropped)
+                room.has_more = True
+                position -= 1
+            room.messages.insert(position, dict(message))
+            room.bytes += _size(message)
+            cls._bytes += _size(message)
+            cls._trim()
+
+    @classmethod
+    def forget(cls, appointment_id):
+        """Drops a room's buffer once the current transaction commits (e.g. the appointment was deleted)."""
+        def drop():
+            with cls._lock:
+                room = cls._rooms.pop(appointment_id, None)
+                if room is not None:
+                    cls._bytes -= room.bytes
+        after_commit(drop)
+
+    @classmethod
+    def _use(cls, appointment_id):
+        cls._expire()
+        room = cls._rooms.get(appointment_id)
+        if room is None:
+            return None
+        now = time.monotonic()
+        if now - room.loaded_at > getattr(Config, "CHAT_RECENT_BUFFER_MAX_AGE_SECONDS", 300):
+            del cls._rooms[appointment_id]
+            cls._bytes -= room.bytes
+            return None
+        room.used_at = now
+        cls._rooms.move_to_end(appointment_id)
+        return room
+
+    @classmethod
+    def _expire(cls):
+        idle = getattr(Config, "CHAT_RECENT_BUFFER_IDLE_SECONDS", 600)
+        now = time.monotonic()
+        while cls._rooms:
+            appointment_id, room = next(iter(cls._rooms.items()))
+            if now - room.used_at <= idle:
+                break
+            cls._rooms.popitem(last=False)
+            cls._bytes -= room.bytes
+
+    @classmethod
+    def _trim(cls):
+        limit = getattr(Config, "CHAT_RECENT_BUFFER_MAX_BYTES", 8 * 1024 * 1024)
+        while cls._bytes > limit and cls._rooms:
+            _appointment_id, room = cls._rooms.popitem(last=False)
+            cls._bytes -= room.bytes
@@ -0,0 +1,62 @@
+# models/senderNameModel/senderNameModel.py
+"""
+Bounded in-process LRU of tutee id_number -> display name ("First Last").
+
+Every chat message creates or refreshes a notification that needs the
+sender's name; the notification and chat paths read it from here instead of
+querying tutee each time. register_tutee invalidates the id it writes, and
+entries expire after SENDER_NAME_TTL_SECONDS so edits made by other worker
+processes (or directly in the database) show up eventually.
+
+Unknown ids are not cached: the tutee may be registered a moment later.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+from utils.db import after_commit, get_connection
+
+
+class SenderNames:
+    _lock = threading.Lock()
+    _names = OrderedDict()   # id_number -> (expires_at, display name)
+
+    @classmethod
+    def get(cls, id_number):
+        """Display name for `id_number`, or None when there is no such tutee."""
+        key = str(id_number).strip()
+        now = time.monotonic()
+        with cls._lock:
+            entry = cls._names.get(key)
+            if entry is not None and entry[0] > now:
+                cls._names.move_to_end(key)
+                return entry[1]
+
+        conn = get_connection()
+        cur = conn.cursor()
+        try:
+            cur.execute("SELECT first_name, last_name FROM tutee WHERE id_number = %s", (id_number,))
+            row = cur.fetchone()
+        finally:
+            cur.close()
+            conn.close()
+        if not row:
+            return None
+
+        name = f"{row[0]} {row[1]}"
+        ttl = getattr(Config, "SENDER_NAME_TTL_SECONDS", 3600)
+        with cls._lock:
+            cls._names[key] = (now + ttl, name)
+            cls._names.move_to_end(key)
+            while len(cls._names) > getattr(Config, "SENDER_NAME_CACHE_SIZE", 2048):
+                cls._names.popitem(last=False)
+        return name
+
+    @classmethod
+    def invalidate(cls, id_number):
+        """Forgets `id_number` once the current transaction commits."""
+        def drop():
+            with cls._lock:
+                cls._names.pop(str(id_number).strip(), None)
+        after_commit(drop)
@@ -3,6 +3,8 @@ from typing import List, Optional
 from datetime import datetime
 from psycopg2.extras import RealDictCursor
 from utils.db import get_connection
+from utils.db_prepared import prepared_statement
+from utils import identity
 
 @dataclass
 class ModalContentItem:
@@ -62,17 +64,16 @@ class AppointmentCard:
         cur = conn.cursor(cursor_factory=RealDictCursor)
 
         try:
-            # 1. Get Tutee ID
-            cur.execute("SELECT id_number FROM tutee WHERE google_id = %s LIMIT 1;", (google_id,))
-            tutee_res = cur.fetchone()
-            if not tutee_res:
+            # 1. Get Tutee ID (from the session's identity claims for the current user)
+            claims = identity.lookup(google_id=google_id)
+            if not claims or not claims["id_number"]:
                 return None  # Or raise an exception based on preference
             
-            tutee_id = tutee_res["id_number"]
+            tutee_id = claims["id_number"]
 
             # 2. Fetch Appointments
             # Note: The query already selects 'tutor_id', so we can use it directly below.
-            query = """
+            query = prepared_statement("appointment_cards_for_tutee", """
                 SELECT
                     a.appointment_id,
                     a.appointment_date,
@@ -92,8 +93,8 @@ class AppointmentCard:
                 JOIN course c ON a.course_code = c.course_code
                 WHERE a.tutee_id = %s
                 ORDER BY a.appointment_date ASC, av.start_time ASC;
-            """
-            cur.execute(query, (tutee_id,))
+            """)
+            query.execute(cur, (tutee_id,))
             results = cur.fetchall()
 
             # 3. Transform Rows into Objects
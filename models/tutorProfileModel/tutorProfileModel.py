@@ -0,0 +1,155 @@
+# models/tutorProfileModel/tutorProfileModel.py
+"""
+Everything the tutor profile page shows, read in one round trip: profile
+fields plus availability, courses, rating summary and badge counts as JSON
+aggregates.
+
+Profiles are cached per tutor in the query cache backend (utils/query_cache.py)
+for TUTOR_PROFILE_TTL_SECONDS. GET /api/tutor/<tutor_id> passes the ETag
+built from the tutor's entity_version rows (migration 0002), and the entry is
+keyed by it: any write the version triggers see, including ones made outside
+these models, selects a new entry, so a body is never served under an ETag it
+does not match. Write paths that change what the profile shows also call
+TutorProfile.invalidate(tutor_id) after they commit, which covers callers
+without a version.
+"""
+import pickle
+from dataclasses import dataclass, asdict, field
+from typing import List, Optional
+
+from psycopg2.extras import RealDictCursor
+
+from config import Config
+from utils.db import after_commit, get_connection
+from utils.db_prepared import prepared_statement
+from utils.query_cache import get_backend
+
+_PROFILE = prepared_statement("tutor_profile", """
+    SELECT
+        t.tutor_id,
+        tt.first_name,
+        tt.middle_name,
+        tt.last_name,
+        tt.year_level,
+        tt.program_code,
+        p.program_name,
+        t.status,
+        t.about,
+        t.profile_img_url,
+        tt.google_id,
+        COALESCE((
+            SELECT json_agg(json_build_object(
+                       'vacant_id', av.vacant_id,
+                       'day_of_week', av.day_of_week,
+                       'start_time', to_char(av.start_time, 'HH24:MI:SS'),
+                       'end_time', to_char(av.end_time, 'HH24:MI:SS')
+                   ) ORDER BY av.day_of_week, av.start_time)
+            FROM availability av
+            WHERE av.tutor_id = t.tutor_id
+        ), '[]'::json) AS availability,
+        COALESCE((
+            SELECT json_agg(th.course_code ORDER BY th.course_code)
+            FROM teaches th
+            WHERE th.tutor_id = t.tutor_id
+        ), '[]'::json) AS courses,
+        (
+            SELECT json_build_object(
+                       'average', ROUND(AVG(sr.rating)::numeric, 2),
+                       'count', COUNT(*)
+                   )
+            FROM session_rating sr
+            WHERE sr.tutor_id = t.tutor_id
+              AND sr.rating > 0
+        ) AS rating_summary,
+        (
+            SELECT json_build_object(
+                       'friendly_count', COALESCE(SUM(CASE WHEN b.friendly THEN 1 ELSE 0 END), 0),
+                       'punctual_count', COALESCE(SUM(CASE WHEN b.punctual THEN 1 ELSE 0 END), 0),
+                       'engaging_count', COALESCE(SUM(CASE WHEN b.engaging THEN 1 ELSE 0 END), 0),
+                       'proficient_count', COALESCE(SUM(CASE WHEN b.proficient THEN 1 ELSE 0 END), 0)
+                   )
+            FROM tutor_badges b
+            WHERE b.tutor_id = t.tutor_id
+        ) AS badge_counts
+    FROM tutor t
+    JOIN tutee tt ON t.tutor_id = tt.id_number
+    LEFT JOIN program p ON tt.program_code = p.program_code
+    WHERE t.tutor_id = %s
+""")
+
+
+def _cache_tag(tutor_id):
+    return f"tutor_profile:{tutor_id}"
+
+
+@dataclass
+class TutorProfile:
+    tutor_id: str
+    first_name: str
+    middle_name: Optional[str]
+    last_name: str
+    year_level: int
+    program_code: str
+    program_name: Optional[str]
+    status: str
+    about: str
+    profile_img_url: Optional[str]
+    google_id: str
+    availability: List[dict] = field(default_factory=list)
+    courses: List[str] = field(default_factory=list)
+    rating_summary: dict = field(default_factory=dict)
+    badge_counts: dict = field(default_factory=dict)
+
+    @classmethod
+    def fetch(cls, tutor_id):
+        """Reads the profile from the database. Returns None if there is no such tutor."""
+        conn = get_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        try:
+            _PROFILE.execute(cur, (tutor_id,))
+            row = cur.fetchone()
+            if not row:
+                return None
+            row["about"] = row["about"] or ""
+            return cls(**row)
+        finally:
+            cur.close()
+            conn.close()
+
+    @classmethod
+    def get(cls, tutor_id, version=None):
+        """
+        The profile as an API dict, from the per-tutor cache when fresh.
+        `version` is the tutor's entity_version ETag when the caller has one.
+        """
+        backend = get_backend()
+        if backend is None:
+            profile = cls.fetch(tutor_id)
+            return profile.to_api_response() if profile else None
+
+        tags = (_cache_tag(tutor_id),)
+        key = f"{_cache_tag(tutor_id)}:{version}" if version else _cache_tag(tutor_id)
+        cached = backend.get(key, tags)
+        if cached is not None:
+            return pickle.loads(cached)
+
+        versions = backend.versions(tags)
+        profile = cls.fetch(tutor_id)
+        if profile is None:
+            return None
+        data = profile.to_api_response()
+        ttl = getattr(Config, "TUTOR_PROFILE_TTL_SECONDS", 300)
+        backend.set(key, pickle.dumps(data), tags, versions, ttl)
+        return data
+
+    @staticmethod
+    def invalidate(tutor_id):
+        """Drops the cached profile of `tutor_id` once the current transaction commits."""
+        def drop():
+            backend = get_backend()
+            if backend is not None:
+                backend.invalidate([_cache_tag(tutor_id)])
+        after_commit(drop)
+
+    def to_api_response(self):
+        return asdict(self)
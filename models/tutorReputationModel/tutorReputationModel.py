@@ -0,0 +1,79 @@
+# models/tutorReputationModel/tutorReputationModel.py
+"""
+Per-tutor reputation (rating count, average and histogram, last rated, badge
+totals) read from the `tutor_reputation` row that migration 0005 keeps
+current, instead of aggregating session_rating and tutor_badges.
+"""
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Optional
+
+from psycopg2.extras import RealDictCursor
+
+from utils.db import get_connection
+
+_COLUMNS = """
+    tutor_id, rating_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5, last_rated_at,
+    friendly_count, punctual_count, engaging_count, proficient_count
+"""
+
+
+@dataclass
+class TutorReputation:
+    tutor_id: str
+    rating_count: int = 0
+    rating_sum: int = 0
+    rating_1: int = 0
+    rating_2: int = 0
+    rating_3: int = 0
+    rating_4: int = 0
+    rating_5: int = 0
+    last_rated_at: Optional[datetime] = None
+    friendly_count: int = 0
+    punctual_count: int = 0
+    engaging_count: int = 0
+    proficient_count: int = 0
+
+    @property
+    def average(self):
+        return round(self.rating_sum / self.rating_count, 2) if self.rating_count else None
+
+    @classmethod
+    def fetch(cls, tutor_id):
+        """Reputation of one tutor; zeros for a tutor nobody has rated or badged yet."""
+        return cls.fetch_many([tutor_id])[tutor_id]
+
+    @classmethod
+    def fetch_many(cls, tutor_ids):
+        """{tutor_id: TutorReputation} for every id in `tutor_ids`, in one query."""
+        ids = list(dict.fromkeys(tutor_ids))
+        if not ids:
+            return {}
+
+        conn = get_connection()
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        try:
+            cur.execute(f"SELECT {_COLUMNS} FROM tutor_reputation WHERE tutor_id = ANY(%s)", (ids,))
+            rows = cur.fetchall()
+        finally:
+            cur.close()
+            conn.close()
+
+        found = {row["tutor_id"]: cls(**row) for row in rows}
+        return {tutor_id: found.get(tutor_id) or cls(tutor_id=tutor_id) for tutor_id in ids}
+
+    def badge_counts(self):
+        """Same shape as GET /api/tutor/badge_counts/<tutor_id>."""
+        return {
+            "friendly_count": self.friendly_count,
+            "punctual_count": self.punctual_count,
+            "engaging_count": self.engaging_count,
+            "proficient_count": self.proficient_count,
+        }
+
+    def to_api_response(self):
+        data = asdict(self)
+        data["average"] = self.average
+        data["histogram"] = {str(stars): data.pop(f"rating_{stars}") for stars in range(1, 6)}
+        data["last_rated_at"] = self.last_rated_at.isoformat() if self.last_rated_at else None
+        return data
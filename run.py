@@ -1,6 +1,10 @@
 import eventlet 
 eventlet.monkey_patch()
 
+# psycopg2 is a C extension, so monkey_patch() alone leaves DB waits blocking the hub
+from utils.db_green import enable_green_io
+enable_green_io()
+
 from app import create_app, socketio
 
 # Create the app (Configurations are now applied inside create_app)
@@ -5,6 +5,9 @@ from flask_socketio import join_room, leave_room, emit
 from flask import request
 from models.messageModel.messageModel import MessageModel
 from models.NotificationModel.NotificationModel import Notification 
+from controllers.chatController.sendService import send_chat_message
+from utils.db_timeout import statement_timeout
+from config import Config
 
 # 🟢 NEW: Connect Handler for Personal Notifications (Necessary for Real-Time Booking)
 @socketio.on('connect')
@@ -29,8 +32,12 @@ def handle_monitor(data):
         room = f"appointment_{appt_id}"
         join_room(room)
 
+    # Warm the participant cache so messages in these chats skip the lookup
+    MessageModel.preload_participants(appointment_ids)
+
 # 2. UPDATED: Join Logic (Active Chat)
 @socketio.on("join_appointment")
+@statement_timeout(2000)
 def handle_join(data):
     appointment_id = data.get("appointment_id")
     user_id = data.get("user_id")
@@ -46,13 +53,60 @@ def handle_join(data):
     room = f"appointment_{appointment_id}"
     join_room(room)
 
+    MessageModel.preload_participants([appt_id_int])
     MessageModel.mark_messages_as_read(appt_id_int, user_id)
     Notification.mark_chat_notifications_as_read(appt_id_int, user_id)
 
-    messages = MessageModel.get_messages_by_appointment(appointment_id)
-    emit("load_messages", messages, room=request.sid)
+    # Reconnecting clients send the last message they have and only get what is newer,
+    # unless the gap is more than a page or the read fails: then they resync from the latest page.
+    last_message_id = data.get("last_message_id")
+    if last_message_id is not None:
+        try:
+            newer, gap_too_large = MessageModel.read_page(
+                appt_id_int, after=int(last_message_id), limit=getattr(Config, "CHAT_PAGE_MAX_SIZE", 200)
+            )
+        except (TypeError, ValueError):
+            newer, gap_too_large = None, True
+        except Exception as e:
+            print(f"Error reading missed messages for appt {appt_id_int}, resyncing: {e}")
+            newer, gap_too_large = None, True
+        if not gap_too_large:
+            emit("load_messages", {
+                "appointment_id": appt_id_int,
+                "messages": newer,
+                "delta": True
+            }, room=request.sid)
+            return
+
+    # Latest page only; older pages come through load_older_messages
+    messages, has_more = MessageModel.get_messages_by_appointment(appt_id_int)
+    emit("load_messages", {
+        "appointment_id": appt_id_int,
+        "messages": messages,
+        "has_more": has_more,
+        "resync": last_message_id is not None
+    }, room=request.sid)
+
+@socketio.on("load_older_messages")
+@statement_timeout(2000)
+def handle_load_older(data):
+    try:
+        appt_id_int = int(data.get("appointment_id"))
+        before = int(data.get("before"))
+        limit = int(data["limit"]) if data.get("limit") else None
+    except (TypeError, ValueError):
+        print(f"Error: invalid load_older_messages payload {data}")
+        return
+
+    messages, has_more = MessageModel.get_messages_by_appointment(appt_id_int, before=before, limit=limit)
+    emit("older_messages", {
+        "appointment_id": appt_id_int,
+        "messages": messages,
+        "has_more": has_more
+    }, room=request.sid)
 
 @socketio.on("send_message")
+@statement_timeout(2000)
 def handle_message(data):
     appointment_id = data.get("appointment_id")
     sender_id = data.get("sender_id")
@@ -61,72 +115,17 @@ def handle_message(data):
     if not appointment_id or not sender_id or not message_text:
         return
 
-    room = f"appointment_{appointment_id}"
-    
-    # A. Save Message (existing logic)
-    timestamp = MessageModel.save_message(appointment_id, sender_id, message_text)
-
-    # B. Emit to Chat Room (existing logic for real-time display)
-    emit("receive_message", {
-        "appointment_id": appointment_id,
-        "sender_id": sender_id,
-        "message_text": message_text,
-        "timestamp": timestamp.isoformat()
-    }, room=room)
-    
-    # -----------------------------------------------------------
-    # C. NOTIFICATION LOGIC (Refined for robustness)
-    # -----------------------------------------------------------
     try:
-        # 🟢 FIX: Convert ID to integer for database operations (reference_id is BIGINT)
-        appt_id_int = int(appointment_id) 
-
-        # 1. Find who is in this appointment (pass the integer ID)
-        participants = MessageModel.get_appointment_participants(appt_id_int) 
-        
-        if not participants:
-            print(f"❌ Error sending chat notification: Could not find participants for appt {appt_id_int}")
-            return
-            
-        student_id, tutor_id = participants
-        
-        # 2. Determine Recipient (The one who is NOT the sender)
-        if str(sender_id) == str(student_id):
-            recipient_id = tutor_id
-        else:
-            recipient_id = student_id
-        
-        # 3. Validation: Ensure recipient_id is valid
-        if not recipient_id:
-            print(f"❌ Error sending chat notification: Recipient ID is None for appt {appt_id_int}")
-            return
+        appt_id_int = int(appointment_id)
+    except (TypeError, ValueError):
+        print(f"Error: Could not convert appointment_id '{appointment_id}' to integer.")
+        return
 
-        # 4. Create Notification in DB
-        Notification.create_chat_notification(
-            appointment_id=appt_id_int, # Pass integer ID
-            recipient_id=recipient_id,
-            sender_id=sender_id
-        )
-        print(f"🔔 Chat Notification created/reset for {recipient_id}")
-        
-        # 🟢 CRITICAL ADDITION: Emit a global notification event to the recipient's personal room
-        new_notification = Notification.get_latest_notification_by_recipient(recipient_id)
-
-        if new_notification:
-            # Emit to the recipient's personal room
-            personal_room = str(recipient_id)
-            # The client-side logic will format this notification object
-            emit("new_global_notification", new_notification, room=personal_room)
-            print(f"🔔 Emitted new_global_notification to room: {personal_room}")
-            
-    except ValueError:
-         print(f"❌ Error sending chat notification: Appointment ID '{appointment_id}' is not a valid integer.")
-    except Exception as e:
-        # The database error will be caught here if the INSERT/FK fails
-        print(f"❌ Error sending chat notification: {e}")
-    # -----------------------------------------------------------
+    # Save + broadcast to the room; the recipient's notification is sent in the background
+    send_chat_message(appt_id_int, sender_id, message_text)
     
 @socketio.on("mark_read")
+@statement_timeout(1000)
 def handle_mark_read(data):
     appointment_id = data.get("appointment_id")
     user_id = data.get("user_id")
@@ -0,0 +1,64 @@
+import pytest
+
+from config import Config
+from utils import db_nplusone
+from utils.db_nplusone import NPlusOneError, fingerprint
+
+
+def test_fingerprint_ignores_values():
+    assert fingerprint("SELECT * FROM tutor WHERE tutor_id = 'T-1' AND rating > 4") == \
+        fingerprint("select *  from tutor\n WHERE tutor_id = 'O''Brien' AND rating > 3.5")
+
+
+def test_fingerprint_collapses_placeholders_and_in_lists():
+    assert fingerprint("SELECT 1 FROM course WHERE course_code IN (%s, %s, %s)") == \
+        "select ? from course where course_code in (?)"
+    assert fingerprint("UPDATE tutee SET name = %(name)s WHERE id = $1") == \
+        "update tutee set name = ? where id = ?"
+
+
+def test_fingerprint_keeps_identifiers_with_digits():
+    assert fingerprint("SELECT rating_5 FROM t2") == "select rating_5 from t2"
+
+
+@pytest.fixture
+def nplusone_config():
+    saved = {name: getattr(Config, name, None) for name in ("DB_NPLUSONE_MODE", "DB_NPLUSONE_THRESHOLD")}
+    yield Config
+    for name, value in saved.items():
+        setattr(Config, name, value)
+
+
+@pytest.mark.nplusone(allow=True)   # exercises the detector itself
+def test_observe_reports_once_past_threshold(nplusone_config):
+    nplusone_config.DB_NPLUSONE_MODE = "log"
+    nplusone_config.DB_NPLUSONE_THRESHOLD = 2
+    reports = []
+    db_nplusone.listeners.append(reports.append)
+    try:
+        counts = {}
+        for tutor_id in range(5):
+            db_nplusone.observe(counts, f"SELECT * FROM tutor WHERE tutor_id = {tutor_id}", "GET /x")
+    finally:
+        db_nplusone.listeners.remove(reports.append)
+
+    assert len(reports) == 1
+    assert reports[0].count == 3
+    assert "GET /x" in reports[0].format()
+
+
+@pytest.mark.nplusone(allow=True)   # exercises the detector itself
+def test_observe_raises_in_raise_mode(nplusone_config):
+    nplusone_config.DB_NPLUSONE_MODE = "raise"
+    nplusone_config.DB_NPLUSONE_THRESHOLD = 1
+    counts = {}
+    db_nplusone.observe(counts, "SELECT 1 FROM course WHERE course_code = 'A'")
+    with pytest.raises(NPlusOneError):
+        db_nplusone.observe(counts, "SELECT 1 FROM course WHERE course_code = 'B'")
+
+
+def test_observe_is_off_by_default(nplusone_config):
+    nplusone_config.DB_NPLUSONE_MODE = "off"
+    counts = {}
+    db_nplusone.observe(counts, "SELECT 1")
+    assert counts == {}
@@ -0,0 +1,119 @@
+import threading
+
+import psycopg2.extensions
+import pytest
+
+from utils.db_pool import ConnectionPool, PoolExhaustedError
+
+
+class FakeInfo:
+    transaction_status = psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConnection:
+    def __init__(self, created_at=0.0):
+        self.closed = False
+        self.autocommit = False
+        self.info = FakeInfo()
+        self.written_tables = set()
+        self.prepared = set()
+        self.created_at = created_at
+        self.last_used = created_at
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info = FakeInfo()
+
+    def close(self):
+        self.closed = True
+
+
+class FakePool(ConnectionPool):
+    """ConnectionPool that opens FakeConnections instead of talking to PostgreSQL."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("check_interval", 3600)
+        super().__init__({}, **kwargs)
+        self.opened = []
+
+    def _connect(self):
+        conn = FakeConnection(created_at=__import__("time").monotonic())
+        self.opened.append(conn)
+        return conn
+
+
+def test_rejects_invalid_sizes():
+    with pytest.raises(ValueError):
+        FakePool(minconn=3, maxconn=2)
+
+
+def test_fill_opens_minconn_and_getconn_reuses_them():
+    pool = FakePool(minconn=2, maxconn=4)
+    pool.fill()
+    assert pool.stats()["idle"] == 2
+
+    conn = pool.getconn()
+    assert conn in pool.opened
+    assert len(pool.opened) == 2
+    pool.putconn(conn)
+    assert pool.stats() == {"size": 2, "idle": 2, "in_use": 0, "waiting": 0, "minconn": 2, "maxconn": 4}
+
+
+def test_putconn_rolls_back_open_transactions():
+    pool = FakePool(minconn=0, maxconn=1)
+    conn = pool.getconn()
+    conn.info = type("Info", (), {"transaction_status": psycopg2.extensions.TRANSACTION_STATUS_INTRANS})()
+    conn.written_tables.add("tutor")
+    pool.putconn(conn)
+    assert conn.rollbacks == 1
+    assert conn.written_tables == set()
+
+
+def test_exhausted_pool_times_out():
+    pool = FakePool(minconn=0, maxconn=1, timeout=0.05)
+    pool.getconn()
+    with pytest.raises(PoolExhaustedError, match="Timed out"):
+        pool.getconn()
+
+
+def test_full_wait_queue_fails_fast():
+    pool = FakePool(minconn=0, maxconn=1, timeout=5, max_waiting=0)
+    pool.getconn()
+    with pytest.raises(PoolExhaustedError, match="already waiting"):
+        pool.getconn()
+
+
+def test_waiter_gets_returned_connection():
+    pool = FakePool(minconn=0, maxconn=1, timeout=5)
+    held = pool.getconn()
+    got = []
+    waiter = threading.Thread(target=lambda: got.append(pool.getconn()))
+    waiter.start()
+    pool.putconn(held)
+    waiter.join(timeout=5)
+    assert got == [held]
+
+
+def test_expired_and_closed_connections_are_replaced():
+    pool = FakePool(minconn=0, maxconn=2, max_lifetime=1)
+    conn = pool.getconn()
+    conn.created_at -= 10
+    pool.putconn(conn)
+    assert conn.closed
+    assert pool.stats()["size"] == 0
+
+    conn = pool.getconn()
+    conn.closed = True
+    pool.putconn(conn)
+    assert pool.stats()["size"] == 0
+    assert pool.getconn() is not conn
+
+
+def test_closeall_closes_idle_connections():
+    pool = FakePool(minconn=2, maxconn=2)
+    pool.fill()
+    pool.closeall()
+    assert all(conn.closed for conn in pool.opened)
+    with pytest.raises(psycopg2.pool.PoolError):
+        pool.getconn()
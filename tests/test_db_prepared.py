@@ -0,0 +1,63 @@
+import pytest
+from psycopg2 import errors
+
+from utils.db_prepared import PreparedStatement, prepared_statement
+
+
+class FakeConnection:
+    def __init__(self):
+        self.prepared = set()
+
+
+class FakeCursor:
+    def __init__(self, fail_execute=None):
+        self.connection = FakeConnection()
+        self.sent = []
+        self.fail_execute = fail_execute
+
+    def execute(self, sql, params=None):
+        self.sent.append((sql, params))
+        if sql.startswith("EXECUTE") and self.fail_execute:
+            error, self.fail_execute = self.fail_execute, None
+            raise error
+
+
+def test_placeholders_become_server_parameters():
+    statement = PreparedStatement("t_rewrite", "SELECT * FROM course WHERE code LIKE 'A%%' AND id = %s AND x = %s;")
+    assert statement.param_count == 2
+    assert statement.server_sql == "SELECT * FROM course WHERE code LIKE 'A%%' AND id = $1 AND x = $2"
+
+
+def test_prepares_once_per_connection():
+    statement = PreparedStatement("t_once", "SELECT name FROM tutee WHERE id_number = %s AND name LIKE 'a%%'")
+    cur = FakeCursor()
+    statement.execute(cur, ("1",))
+    statement.execute(cur, ("2",))
+    assert cur.sent == [
+        ("PREPARE t_once AS SELECT name FROM tutee WHERE id_number = $1 AND name LIKE 'a%'", None),
+        ("EXECUTE t_once (%s)", ("1",)),
+        ("EXECUTE t_once (%s)", ("2",)),
+    ]
+
+
+def test_failed_first_execute_keeps_the_prepare_recorded():
+    statement = PreparedStatement("t_fail", "SELECT %s::timestamp")
+    cur = FakeCursor(fail_execute=errors.QueryCanceled("canceling statement due to statement timeout"))
+    with pytest.raises(errors.QueryCanceled):
+        statement.execute(cur, ("2024-01-01",))
+    assert "t_fail" in cur.connection.prepared
+
+    statement.execute(cur, ("2024-01-01",))
+    assert [sql for sql, _ in cur.sent].count("PREPARE t_fail AS SELECT $1::timestamp") == 1
+
+
+def test_wrong_parameter_count():
+    with pytest.raises(ValueError):
+        PreparedStatement("t_count", "SELECT %s").execute(FakeCursor(), ())
+
+
+def test_registry_rejects_conflicting_sql():
+    prepared_statement("t_registry", "SELECT 1")
+    assert prepared_statement("t_registry", "SELECT 1").sql == "SELECT 1"
+    with pytest.raises(ValueError):
+        prepared_statement("t_registry", "SELECT 2")
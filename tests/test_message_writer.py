@@ -0,0 +1,119 @@
+import itertools
+import threading
+import time
+
+import psycopg2
+import pytest
+
+from config import Config
+from utils import message_writer
+
+
+class FakeDatabase:
+    """Stands in for the sequence and the message table."""
+
+    def __init__(self):
+        self.sequence = itertools.count(100)
+        self.rows = []
+        self.batches = []
+        self.reject = set()      # message ids that violate a constraint
+        self.down = False
+        self.reservations = 0
+        self.latency = 0
+
+    def reserve_ids(self, count):
+        self.reservations += 1
+        reserved = [next(self.sequence) for _ in range(count)]
+        if self.reservations == 1:
+            time.sleep(self.latency)     # the first block is drawn first but comes back last
+        return reserved
+
+    def insert(self, rows):
+        if self.down:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+        if any(row[0] in self.reject for row in rows):
+            raise psycopg2.IntegrityError("violates foreign key constraint")
+        self.batches.append(len(rows))
+        self.rows.extend(rows)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(message_writer, "_reserve_ids", database.reserve_ids)
+    monkeypatch.setattr(message_writer, "_insert", database.insert)
+    monkeypatch.setattr(message_writer, "_started", True)      # no background task: tests flush by hand
+    monkeypatch.setattr(Config, "CHAT_WRITE_BEHIND_BATCH_SIZE", 3, raising=False)
+    for queue in (message_writer._pending, message_writer._ids, message_writer._in_flight):
+        queue.clear()
+    message_writer._wake.clear()
+    message_writer._full.clear()
+    return database
+
+
+def test_submit_assigns_reserved_ids_without_writing(db):
+    first, _ = message_writer.submit(1, "2020-0001", "a")
+    second, timestamp = message_writer.submit(1, "2020-0001", "b")
+    assert (first, second) == (100, 101)
+    assert timestamp is not None
+    assert db.rows == []
+    assert message_writer.pending() == 2
+    assert message_writer._wake.is_set()
+    assert not message_writer._full.is_set()
+
+
+def test_flush_writes_in_batches(db):
+    for n in range(7):
+        message_writer.submit(1, "2020-0001", str(n))
+    assert message_writer._full.is_set()
+    assert message_writer.flush() == 7
+    assert db.batches == [3, 3, 1]
+    assert [row[0] for row in db.rows] == list(range(100, 107))
+    assert message_writer.pending() == 0
+
+
+def test_rejected_rows_are_dropped_and_the_rest_written(db):
+    ids = [message_writer.submit(1, "2020-0001", str(n))[0] for n in range(3)]
+    db.reject.add(ids[1])
+    assert message_writer.flush() == 2
+    assert [row[0] for row in db.rows] == [ids[0], ids[2]]
+
+
+def test_transient_failure_keeps_messages_queued_in_order(db):
+    ids = [message_writer.submit(1, "2020-0001", str(n))[0] for n in range(2)]
+    db.down = True
+    with pytest.raises(psycopg2.OperationalError):
+        message_writer.flush()
+    assert [row[0] for row in message_writer._pending] == ids
+    assert message_writer._in_flight == []
+
+    db.down = False
+    assert message_writer.flush() == 2
+
+
+def test_sync_flushes_only_for_the_appointment_being_read(db):
+    message_writer.submit(1, "2020-0001", "a")
+    message_writer.sync(2)
+    assert db.rows == []
+    message_writer.sync("1")
+    assert len(db.rows) == 1
+
+
+def test_concurrent_submitters_across_a_block_boundary_keep_ids_in_order(db):
+    db.latency = 0.02        # both submitters find the block empty while one is reserving
+    start = threading.Barrier(2)
+
+    def submitter():
+        start.wait()
+        for n in range(5):
+            message_writer.submit(1, "2020-0001", str(n))
+
+    threads = [threading.Thread(target=submitter) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    queued = [row[0] for row in message_writer._pending]
+    assert queued == list(range(100, 110))
+    assert db.reservations == 4      # ten ids in blocks of three, none reserved twice
@@ -0,0 +1,67 @@
+import pytest
+from flask import Flask, g
+
+from utils import db
+from utils.query_cache import LRUBackend, LocalSharedStore, SharedBackend, cached, read_tables, written_tables
+
+
+def test_read_and_written_tables():
+    sql = "SELECT * FROM tutor t JOIN teaches te ON te.tutor_id = t.tutor_id, LATERAL unnest(x)"
+    assert read_tables(sql) == {"tutor", "teaches"}
+    assert written_tables("INSERT INTO session_rating (x) VALUES (1)") == {"session_rating"}
+    assert written_tables("UPDATE tutor SET status = 'ACTIVE'") == {"tutor"}
+    assert written_tables("DELETE FROM \"message\" WHERE message_id = 1") == {"message"}
+
+
+@pytest.fixture(params=["lru", "shared"])
+def backend(request):
+    if request.param == "lru":
+        return LRUBackend(max_entries=2)
+    return SharedBackend(LocalSharedStore())
+
+
+def test_hit_until_a_tag_is_invalidated(backend):
+    versions = backend.versions(["tutor"])
+    backend.set("k", [1, 2], ["tutor"], versions, ttl=60)
+    assert backend.get("k", ["tutor"]) == [1, 2]
+
+    backend.invalidate(["tutor"])
+    assert backend.get("k", ["tutor"]) is None
+
+
+def test_write_during_query_is_not_cached(backend):
+    versions = backend.versions(["tutor"])
+    backend.invalidate(["tutor"])       # a write lands while the query runs
+    backend.set("k", "stale", ["tutor"], versions, ttl=60)
+    assert backend.get("k", ["tutor"]) is None
+
+
+def test_expired_entries_miss(backend):
+    backend.set("k", "v", ["course"], backend.versions(["course"]), ttl=-1)
+    assert backend.get("k", ["course"]) is None
+
+
+def test_clear(backend):
+    backend.set("k", "v", ["course"], backend.versions(["course"]), ttl=60)
+    backend.clear()
+    assert backend.get("k", ["course"]) is None
+
+
+def test_lru_evicts_least_recently_used():
+    backend = LRUBackend(max_entries=2)
+    for key in ("a", "b"):
+        backend.set(key, key, [], (), ttl=60)
+    backend.get("a", [])
+    backend.set("c", "c", [], (), ttl=60)
+    assert backend.get("b", []) is None
+    assert backend.get("a", []) == "a"
+    assert len(backend) == 2
+
+
+def test_cached_views_read_from_the_primary(monkeypatch):
+    monkeypatch.setattr(db, "get_replica_pool", lambda: object())
+    monkeypatch.setattr(db, "_checkout", lambda replica: "replica" if replica else "primary")
+    with Flask(__name__).app_context():
+        g.db_readonly = True            # a @read_replica request
+        assert db.get_connection() == "replica"
+        assert cached(ttl=60)(db.get_connection)() == "primary"
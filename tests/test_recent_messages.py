@@ -0,0 +1,105 @@
+import pytest
+
+from config import Config
+from models.recentMessagesModel.recentMessagesModel import RecentMessages
+
+
+def message(message_id, text="hi"):
+    return {"message_id": message_id, "sender_id": "2020-0001", "message_text": text, "timestamp": None}
+
+
+def ids(page):
+    return [m["message_id"] for m in page]
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer(monkeypatch):
+    monkeypatch.setattr(RecentMessages, "_rooms", type(RecentMessages._rooms)())
+    monkeypatch.setattr(RecentMessages, "_loading", {})
+    monkeypatch.setattr(RecentMessages, "_bytes", 0)
+    monkeypatch.setattr(Config, "CHAT_RECENT_BUFFER_SIZE", 5, raising=False)
+    monkeypatch.setattr(Config, "CHAT_RECENT_BUFFER_IDLE_SECONDS", 600, raising=False)
+    monkeypatch.setattr(Config, "CHAT_RECENT_BUFFER_MAX_AGE_SECONDS", 300, raising=False)
+    monkeypatch.setattr(Config, "CHAT_RECENT_BUFFER_MAX_BYTES", 1024 * 1024, raising=False)
+
+
+def test_unbuffered_room_is_not_answered():
+    assert RecentMessages.latest(1, 10) is None
+    assert RecentMessages.since(1, 0) is None
+    RecentMessages.append(1, message(1))       # ignored until the room is loaded
+    assert RecentMessages.latest(1, 10) is None
+
+
+def test_load_then_append():
+    assert RecentMessages.load(1, lambda: ([message(1), message(2)], False)) == ([message(1), message(2)], False)
+    RecentMessages.append(1, message(4))
+    RecentMessages.append(1, message(3))       # finished out of order
+    messages, has_more = RecentMessages.latest(1, 10)
+    assert ids(messages) == [1, 2, 3, 4]
+    assert not has_more
+    assert ids(RecentMessages.since(1, 2)) == [3, 4]
+
+
+def test_append_skips_a_message_the_load_already_read():
+    RecentMessages.load(2, lambda: ([message(5)], False))
+    RecentMessages.append(2, message(5))
+    assert ids(RecentMessages.latest(2, 10)[0]) == [5]
+
+
+def test_capacity_drops_oldest_and_reports_more():
+    RecentMessages.load(1, lambda: ([message(i) for i in range(1, 6)], False))
+    RecentMessages.append(1, message(6))
+    messages, has_more = RecentMessages.latest(1, 5)
+    assert ids(messages) == [2, 3, 4, 5, 6]
+    assert has_more
+    assert RecentMessages.latest(1, 10) is None          # needs more than is buffered
+    assert RecentMessages.since(1, 0) is None            # reaches past the buffer
+    assert ids(RecentMessages.since(1, 4)) == [5, 6]
+
+
+def test_save_during_load_keeps_room_unbuffered():
+    def read():
+        RecentMessages.append(1, message(3))   # saved while the page is being read
+        return [message(1), message(2)], False
+
+    assert ids(RecentMessages.load(1, read)[0]) == [1, 2]
+    assert RecentMessages.latest(1, 10) is None
+
+
+def test_failed_load_can_be_retried():
+    def fail():
+        raise RuntimeError("db down")
+
+    with pytest.raises(RuntimeError):
+        RecentMessages.load(1, fail)
+    RecentMessages.load(1, lambda: ([message(1)], False))
+    assert ids(RecentMessages.latest(1, 10)[0]) == [1]
+
+
+def test_rooms_expire_by_idle_time_and_by_age(monkeypatch):
+    RecentMessages.load(1, lambda: ([message(1)], False))
+    monkeypatch.setattr(Config, "CHAT_RECENT_BUFFER_MAX_AGE_SECONDS", -1)
+    assert RecentMessages.latest(1, 10) is None          # busy, but loaded too long ago
+
+    monkeypatch.setattr(Config, "CHAT_RECENT_BUFFER_MAX_AGE_SECONDS", 300)
+    RecentMessages.load(1, lambda: ([message(1)], False))
+    monkeypatch.setattr(Config, "CHAT_RECENT_BUFFER_IDLE_SECONDS", -1)
+    assert RecentMessages.latest(1, 10) is None
+    assert RecentMessages._bytes == 0
+
+
+def test_byte_limit_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(Config, "CHAT_RECENT_BUFFER_MAX_BYTES", 700)
+    RecentMessages.load(1, lambda: ([message(1, "x" * 100)], False))
+    RecentMessages.load(2, lambda: ([message(2, "x" * 100)], False))
+    RecentMessages.latest(1, 1)                          # room 1 is now the most recent
+    RecentMessages.load(3, lambda: ([message(3, "x" * 100)], False))
+    assert RecentMessages.latest(2, 1) is None
+    assert RecentMessages.latest(1, 1) is not None
+    assert RecentMessages.latest(3, 1) is not None
+
+
+def test_forget_drops_the_room():
+    RecentMessages.load(1, lambda: ([message(1)], False))
+    RecentMessages.forget(1)                             # no unit of work: runs right away
+    assert RecentMessages.latest(1, 10) is None
@@ -1,10 +1,26 @@
+import threading
+import time
+from contextlib import contextmanager
+
 import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE, TRANSACTION_STATUS_INERROR
 from psycopg2.extras import RealDictCursor
 import os
+from flask import g, has_app_context, request, session
 from config import Config
+from utils.db_pool import ConnectionPool, PoolExhaustedError
+from utils import db_metrics, db_timeout
+
+_pool = None
+_replica_pool = None
+_pool_lock = threading.Lock()
+
+# Requests that may write; a successful one opens the read-your-writes window.
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
 
-def get_connection():
-    conn = psycopg2.connect(
+
+def _connect_kwargs():
+    return dict(
         dbname=Config.DB_NAME,
         user=Config.DB_USER,
         password=Config.DB_PASSWORD,
@@ -12,4 +28,410 @@ def get_connection():
         port=Config.DB_PORT
     )
 
-    return conn
\ No newline at end of file
+
+def _build_pool(connect_kwargs, readonly=False):
+    pool = ConnectionPool(
+        connect_kwargs,
+        minconn=getattr(Config, "DB_POOL_MIN", 1),
+        maxconn=getattr(Config, "DB_POOL_MAX", 10),
+        timeout=getattr(Config, "DB_POOL_TIMEOUT", 10.0),
+        max_waiting=getattr(Config, "DB_POOL_MAX_WAITING", 50),
+        max_lifetime=getattr(Config, "DB_POOL_MAX_LIFETIME", 1800.0),
+        check_interval=getattr(Config, "DB_POOL_CHECK_INTERVAL", 30.0),
+        readonly=readonly,
+    )
+    try:
+        pool.fill()
+    except psycopg2.Error as e:
+        # Not fatal: connections are opened on demand by getconn().
+        print(f"⚠️ [DB] Could not pre-open pool connections: {e}")
+    return pool
+
+
+def get_pool():
+    """Returns the process-wide pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _build_pool(_connect_kwargs())
+    return _pool
+
+
+def get_replica_pool():
+    """Returns the read-replica pool, or None when DB_REPLICA_DSN is not configured."""
+    global _replica_pool
+    dsn = getattr(Config, "DB_REPLICA_DSN", None)
+    if not dsn:
+        return None
+    if _replica_pool is None:
+        with _pool_lock:
+            if _replica_pool is None:
+                _replica_pool = _build_pool({"dsn": dsn}, readonly=True)
+    return _replica_pool
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a pooled psycopg2 connection.
+
+    Behaves like the connection returned by psycopg2.connect(), except that
+    close() hands it back to the pool instead of closing the socket. A wrapper
+    that is garbage collected without close() is returned automatically.
+    """
+
+    def __init__(self, pool, conn):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_conn", conn)
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get("_conn")
+        if conn is None:
+            raise psycopg2.InterfaceError("connection already returned to the pool")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    @property
+    def closed(self):
+        return 1 if self._conn is None else self._conn.closed
+
+    def cursor(self, *args, **kwargs):
+        return db_metrics.open_cursor(self._conn, *args, **kwargs)
+
+    def close(self):
+        conn = self.__dict__.get("_conn")
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            self._pool.putconn(conn)
+
+    # `with conn:` keeps psycopg2 semantics: commit on success, rollback on error.
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class UnitOfWorkRolledBack(Exception):
+    """Raised when a unit of work could not commit because a step inside it rolled back."""
+
+
+class _ConnectionScope:
+    """
+    One pooled connection shared by everything that runs inside a Flask request
+    or Socket.IO event (or inside a unit_of_work() outside of one).
+    """
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.conn = None
+        self.handles = 0          # ScopedConnection handles not yet closed
+        self.uow_depth = 0        # nesting level of unit_of_work() blocks
+        self.rollback_only = False
+        self.after_commit = []
+
+    def acquire(self):
+        if self.conn is None:
+            started = time.perf_counter()
+            self.conn = self.pool.getconn()
+            db_metrics.record_acquire(started)
+        return self.conn
+
+    def in_transaction(self):
+        return self.conn is not None and self.conn.info.transaction_status != TRANSACTION_STATUS_IDLE
+
+    def release(self):
+        conn, self.conn = self.conn, None
+        self.handles = 0
+        self.uow_depth = 0
+        self.rollback_only = False
+        self.after_commit = []
+        if conn is not None:
+            self.pool.putconn(conn)
+
+
+class ScopedConnection:
+    """
+    Handle onto the scope's shared connection.
+
+    Models keep calling commit(), rollback() and close() as before:
+      * close() releases this handle only; when the last handle of the scope
+        closes, anything left uncommitted is rolled back, exactly as closing a
+        private connection used to do.
+      * inside unit_of_work(), commit() is deferred to the end of the unit and
+        rollback() dooms the whole unit.
+    """
+
+    def __init__(self, scope):
+        scope.acquire()
+        object.__setattr__(self, "_scope", scope)
+        object.__setattr__(self, "_closed", False)
+        scope.handles += 1
+
+    def __getattr__(self, name):
+        if self.__dict__.get("_closed", True):
+            raise psycopg2.InterfaceError("connection already closed")
+        return getattr(self._scope.acquire(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._scope.acquire(), name, value)
+
+    @property
+    def closed(self):
+        return 1 if self._closed or self._scope.conn is None else self._scope.conn.closed
+
+    def cursor(self, *args, **kwargs):
+        if self._closed:
+            raise psycopg2.InterfaceError("connection already closed")
+        return db_metrics.open_cursor(self._scope.acquire(), *args, **kwargs)
+
+    def commit(self):
+        scope = self._scope
+        if scope.uow_depth:
+            return
+        scope.acquire().commit()
+
+    def rollback(self):
+        scope = self._scope
+        scope.acquire().rollback()
+        if scope.uow_depth:
+            scope.rollback_only = True
+
+    def close(self):
+        if self.__dict__.get("_closed", True):
+            return
+        object.__setattr__(self, "_closed", True)
+        scope = self._scope
+        scope.handles -= 1
+        if scope.handles <= 0 and not scope.uow_depth and scope.in_transaction():
+            scope.conn.rollback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+_local = threading.local()
+
+
+def _scope_attr(replica):
+    return "_db_replica_scope" if replica else "_db_scope"
+
+
+def _current_scope(create, replica=False):
+    holder = g if has_app_context() else _local
+    scope = getattr(holder, _scope_attr(replica), None)
+    if scope is None and create:
+        scope = _ConnectionScope(get_replica_pool() if replica else get_pool())
+        setattr(holder, _scope_attr(replica), scope)
+    return scope
+
+
+def release_scope(exc=None):
+    """Returns the request/event connections to their pools (registered as a teardown hook)."""
+    holder = g if has_app_context() else _local
+    for replica in (False, True):
+        scope = getattr(holder, _scope_attr(replica), None)
+        if scope is not None:
+            setattr(holder, _scope_attr(replica), None)
+            scope.release()
+
+
+# ---------------------------------------------------------
+# Read replica routing
+# ---------------------------------------------------------
+def read_replica(view):
+    """
+    Marks a GET view as safe to serve from the read replica:
+
+        @tutor_list.route("/all")
+        @read_replica
+        def get_tutor_list(): ...
+
+    Every get_connection() inside such a request goes to the replica, unless
+    the session wrote something within the last DB_REPLICA_RYW_SECONDS or the
+    view is also @cached (cached results are always read from the primary).
+    """
+    view._db_read_replica = True
+    return view
+
+
+def _recently_wrote():
+    window = getattr(Config, "DB_REPLICA_RYW_SECONDS", 5)
+    last_write = session.get("_db_last_write")
+    return last_write is not None and time.time() - last_write < window
+
+
+def _route_reads():
+    if request.method not in ("GET", "HEAD") or get_replica_pool() is None:
+        return
+    from flask import current_app
+    view = current_app.view_functions.get(request.endpoint)
+    if getattr(view, "_db_read_replica", False) and not _recently_wrote():
+        g.db_readonly = True
+
+
+def _remember_write(response):
+    # Anonymous requests get no stamp: it would only hand them a session cookie.
+    if request.method not in SAFE_METHODS and response.status_code < 400 and session.get("user"):
+        session["_db_last_write"] = time.time()
+    return response
+
+
+def init_app(app):
+    app.before_request(_route_reads)
+    app.after_request(_remember_write)
+    app.teardown_appcontext(release_scope)
+    db_metrics.init_app(app)
+    # Registered last so its after_request runs first and Server-Timing lands on the 503/504 too.
+    db_timeout.init_app(app)
+
+
+def get_connection(readonly=None):
+    """
+    Returns a database connection.
+
+    Inside a Flask request or Socket.IO event every call shares one pooled
+    connection (stored on flask.g) that is returned at teardown. Outside of
+    one, each call checks out its own pooled connection.
+
+    readonly=True asks for the read replica, readonly=False forces the
+    primary, and the default follows the request's @read_replica routing,
+    except inside a @cached view: a lagging replica would put rows back in
+    the cache that a committed write has just invalidated. Without a
+    configured replica everything goes to the primary.
+    """
+    if readonly is None:
+        readonly = (has_app_context() and g.get("db_readonly", False)
+                    and g.get("query_cache") is None)
+
+    if readonly and get_replica_pool() is not None:
+        try:
+            return _checkout(replica=True)
+        except (psycopg2.OperationalError, PoolExhaustedError) as e:
+            print(f"⚠️ [DB] Read replica unavailable, using primary: {e}")
+
+    try:
+        return _checkout(replica=False)
+    except PoolExhaustedError as e:
+        db_timeout.note_error(e)
+        raise
+
+
+def get_private_connection():
+    """
+    A pooled primary connection of its own, even inside a request or socket
+    event: for writes that must commit independently of the request's
+    transaction (e.g. utils/message_writer.py). close() returns it to the pool.
+    """
+    pool = get_pool()
+    started = time.perf_counter()
+    conn = pool.getconn()
+    db_metrics.record_acquire(started)
+    return PooledConnection(pool, conn)
+
+
+def _checkout(replica):
+    in_scope = has_app_context() or getattr(_local, _scope_attr(replica), None) is not None
+    if in_scope:
+        return ScopedConnection(_current_scope(create=True, replica=replica))
+    pool = get_replica_pool() if replica else get_pool()
+    started = time.perf_counter()
+    conn = pool.getconn()
+    db_metrics.record_acquire(started)
+    return PooledConnection(pool, conn)
+
+
+def after_commit(callback):
+    """
+    Runs `callback` once the current unit of work commits, or right away when
+    there is none. Use it for side effects such as socket emits that must not
+    announce rows that could still be rolled back.
+    """
+    scope = _current_scope(create=False)
+    if scope is not None and scope.uow_depth:
+        scope.after_commit.append(callback)
+    else:
+        callback()
+
+
+@contextmanager
+def unit_of_work():
+    """
+    Groups several model calls into one transaction on the shared connection:
+
+        with unit_of_work():
+            new_id = PendingAppointment.create(...)
+            Notification.create_booking_notification(...)
+
+    Model-level commits are deferred and a single COMMIT is issued when the
+    block exits. An exception, or a model calling rollback(), rolls back
+    everything; the latter raises UnitOfWorkRolledBack at the end of the block.
+    Nested blocks join the outermost one.
+    """
+    owns_scope = not has_app_context() and getattr(_local, _scope_attr(False), None) is None
+    scope = _current_scope(create=True)
+    handle = ScopedConnection(scope)
+    scope.uow_depth += 1
+    outermost = scope.uow_depth == 1
+
+    try:
+        try:
+            yield handle
+        except BaseException:
+            scope.uow_depth -= 1
+            scope.rollback_only = True
+            if outermost:
+                scope.conn.rollback()
+                scope.rollback_only = False
+                scope.after_commit = []
+            raise
+
+        scope.uow_depth -= 1
+        if not outermost:
+            return
+
+        # A step that swallowed a database error without rolling back leaves the
+        # transaction aborted; COMMIT would silently turn into ROLLBACK.
+        if scope.rollback_only or scope.conn.info.transaction_status == TRANSACTION_STATUS_INERROR:
+            scope.conn.rollback()
+            scope.rollback_only = False
+            scope.after_commit = []
+            raise UnitOfWorkRolledBack("A step inside the unit of work rolled back; nothing was committed")
+
+        scope.conn.commit()
+        callbacks, scope.after_commit = scope.after_commit, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                # The transaction is already committed; a failed side effect must not undo the request.
+                print(f"❌ [DB] after_commit callback failed: {e}")
+    finally:
+        handle.close()
+        if owns_scope:
+            release_scope()
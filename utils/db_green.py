@@ -0,0 +1,65 @@
+# utils/db_green.py
+"""
+Cooperative (green) PostgreSQL I/O for the eventlet server.
+
+psycopg2 is a C extension, so eventlet.monkey_patch() cannot make its socket
+waits cooperative: every query blocks the whole hub and, with it, every other
+Socket.IO client. Registering a psycopg2 wait callback makes the driver hand
+control back to the hub whenever it would block on the server's socket.
+"""
+import psycopg2
+from psycopg2 import extensions
+
+from config import Config
+
+
+def eventlet_wait_callback(conn, timeout=-1):
+    """psycopg2 wait callback that parks the current greenlet until the socket is ready."""
+    from eventlet.hubs import trampoline
+
+    while True:
+        try:
+            state = conn.poll()
+            if state == extensions.POLL_OK:
+                break
+            elif state == extensions.POLL_READ:
+                trampoline(conn.fileno(), read=True)
+            elif state == extensions.POLL_WRITE:
+                trampoline(conn.fileno(), write=True)
+            else:
+                raise psycopg2.OperationalError(f"Bad result from poll: {state!r}")
+        except KeyboardInterrupt:
+            # Same as psycopg2.extras.wait_select: cancel the running query and keep
+            # polling, so the interrupt surfaces as QueryCanceled and the connection
+            # is left reusable instead of mid-query.
+            conn.cancel()
+            continue
+
+
+def enable_green_io():
+    """
+    Installs the eventlet wait callback. Call it right after eventlet.monkey_patch().
+    Returns True when green mode is active.
+    """
+    if not getattr(Config, "DB_GREEN_IO", True):
+        return False
+
+    try:
+        import eventlet.patcher
+    except ImportError:
+        return False
+
+    if not eventlet.patcher.is_monkey_patched("socket"):
+        print("⚠️ [DB] eventlet is not monkey patched; keeping blocking database I/O.")
+        return False
+
+    extensions.set_wait_callback(eventlet_wait_callback)
+    return True
+
+
+def disable_green_io():
+    extensions.set_wait_callback(None)
+
+
+def green_io_enabled():
+    return extensions.get_wait_callback() is not None
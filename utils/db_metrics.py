@@ -0,0 +1,353 @@
+# utils/db_metrics.py
+"""
+Per-request query instrumentation for the DB layer.
+
+Cursors handed out by utils.db record every statement's duration, row count
+and caller. The numbers are aggregated per HTTP request and per Socket.IO
+event and surfaced as:
+
+  * a `Server-Timing` header on every HTTP response
+    (db time, query count, connection-acquire time, total time),
+  * an optional `_db_debug` block in JSON object responses when
+    DB_DEBUG_QUERIES is on and the request asks for it (?_db_debug=1 or
+    an `X-DB-Debug: 1` header),
+  * a process-wide rollup per endpoint / socket event (endpoint_stats()).
+
+Repeated statement shapes are also fed to the N+1 detector (utils/db_nplusone.py),
+and SELECTs inside @cached views go through utils/query_cache.py.
+"""
+import os
+import sys
+import threading
+import time
+
+import psycopg2.extensions
+from flask import g, has_app_context, has_request_context, request
+
+from config import Config
+from utils import db_nplusone, db_timeout, query_cache
+
+# Keep the per-request statement list bounded; totals are always exact.
+MAX_RECORDED_QUERIES = 200
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_UTILS_DIR = os.path.join(_PROJECT_ROOT, "utils")
+
+_local = threading.local()
+_rollup = {}
+_rollup_lock = threading.Lock()
+_cursor_classes = {}
+
+
+class QueryStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.acquire_time = 0.0
+        self.acquire_count = 0
+        self.cache_hits = 0
+        self.queries = []
+        self.fingerprints = {}    # normalized SQL -> executions, for utils/db_nplusone.py
+
+    def record_query(self, sql, duration, rowcount, caller):
+        self.query_count += 1
+        self.db_time += duration
+        if len(self.queries) < MAX_RECORDED_QUERIES:
+            self.queries.append({
+                "sql": sql,
+                "ms": round(duration * 1000, 3),
+                "rows": rowcount,
+                "caller": caller,
+            })
+
+    def record_acquire(self, duration):
+        self.acquire_count += 1
+        self.acquire_time += duration
+
+    def summary(self):
+        return {
+            "query_count": self.query_count,
+            "db_ms": round(self.db_time * 1000, 3),
+            "acquire_ms": round(self.acquire_time * 1000, 3),
+            "cache_hits": self.cache_hits,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+        }
+
+
+def current_stats(create=True):
+    """Returns the collector for the current request/event (or collect() block), if any."""
+    if has_app_context():
+        stats = g.get("_db_stats")
+        if stats is None and create:
+            stats = g._db_stats = QueryStats()
+        return stats
+    return getattr(_local, "stats", None)
+
+
+class collect:
+    """
+    Collects query stats outside of a request, e.g. in scripts or tests:
+
+        with collect() as stats:
+            MessageModel.get_messages_by_appointment(1)
+        print(stats.summary())
+    """
+
+    def __enter__(self):
+        self._previous = getattr(_local, "stats", None)
+        _local.stats = QueryStats()
+        return _local.stats
+
+    def __exit__(self, *exc):
+        _local.stats = self._previous
+        return False
+
+
+def _caller():
+    """First frame outside utils/ and the driver, e.g. 'models/messageModel/messageModel.py:save_message'."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(_PROJECT_ROOT) and not filename.startswith(_UTILS_DIR):
+            return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _sql_string(cursor, query):
+    if hasattr(query, "as_string"):
+        return query.as_string(cursor)
+    if isinstance(query, bytes):
+        return query.decode("utf-8", "replace")
+    return query
+
+
+def _statement_text(cursor, query):
+    return " ".join(str(_sql_string(cursor, query)).split())
+
+
+def _record(cursor, query, started, succeeded):
+    duration = time.perf_counter() - started
+    stats = current_stats()
+    if stats is None:
+        return
+    sql = _statement_text(cursor, query)
+    stats.record_query(sql, duration, cursor.rowcount, _caller())
+    if succeeded:
+        db_nplusone.observe(stats.fingerprints, sql, _event_name())
+
+
+def record_cache_hit():
+    stats = current_stats()
+    if stats is not None:
+        stats.cache_hits += 1
+
+
+def _timed(cursor, query, run):
+    started = time.perf_counter()
+    try:
+        result = run()
+    except BaseException as e:
+        _record(cursor, query, started, succeeded=False)
+        db_timeout.note_error(e)
+        raise
+    _record(cursor, query, started, succeeded=True)
+    return result
+
+
+def open_cursor(conn, *args, **kwargs):
+    """conn.cursor(...) with the chosen (or default) cursor class instrumented."""
+    base = kwargs.pop("cursor_factory", None) or conn.cursor_factory or psycopg2.extensions.cursor
+    return conn.cursor(*args, cursor_factory=instrumented(base), **kwargs)
+
+
+def instrumented(cursor_class):
+    """Returns a subclass of `cursor_class` whose statements are timed and recorded."""
+    cls = _cursor_classes.get(cursor_class)
+    if cls is not None:
+        return cls
+
+    # Besides timing, every statement opening a transaction gets the request's
+    # statement_timeout budget (utils/db_timeout.py), and reads/writes are
+    # reported to the query cache (utils/query_cache.py). A cache hit never
+    # reaches the server: the rows are served from `_cached`.
+    class InstrumentedCursor(cursor_class):
+        _cached = None   # [rows, description, position] while serving a cached result
+
+        def execute(self, query, vars=None):
+            self._cached = None
+            plan = query_cache.plan(query, vars, cursor_class, self.connection) if self.name is None else None
+            if plan is not None and plan.hit is not None:
+                self._cached = [*plan.hit, 0]
+                record_cache_hit()
+                return None
+
+            sent = db_timeout.apply(self, query)
+            result = _timed(self, query, lambda: super(InstrumentedCursor, self).execute(sent, vars))
+            query_cache.note_statement(self.connection, _sql_string(self, query))
+            if plan is not None:
+                rows = super().fetchall()
+                plan.store(rows, self.description)
+                self._cached = [rows, self.description, 0]
+            return result
+
+        def executemany(self, query, vars_list):
+            db_timeout.apply(self)
+            result = _timed(self, query, lambda: super(InstrumentedCursor, self).executemany(query, vars_list))
+            query_cache.note_statement(self.connection, _sql_string(self, query))
+            return result
+
+        def fetchone(self):
+            if self._cached is None:
+                return super().fetchone()
+            rows, _, position = self._cached
+            if position >= len(rows):
+                return None
+            self._cached[2] = position + 1
+            return rows[position]
+
+        def fetchmany(self, size=None):
+            if self._cached is None:
+                return super().fetchmany(self.arraysize if size is None else size)
+            rows, _, position = self._cached
+            end = position + (self.arraysize if size is None else size)
+            self._cached[2] = min(end, len(rows))
+            return rows[position:end]
+
+        def fetchall(self):
+            if self._cached is None:
+                return super().fetchall()
+            rows, _, position = self._cached
+            self._cached[2] = len(rows)
+            return rows[position:]
+
+        def __iter__(self):
+            if self._cached is None:
+                return super().__iter__()
+            return iter(self.fetchall())
+
+        @property
+        def rowcount(self):
+            return len(self._cached[0]) if self._cached is not None else super().rowcount
+
+        @property
+        def description(self):
+            return self._cached[1] if self._cached is not None else super().description
+
+        def callproc(self, procname, vars=None):
+            db_timeout.apply(self)
+            return _timed(self, f"CALL {procname}", lambda: super(InstrumentedCursor, self).callproc(procname, vars))
+
+    InstrumentedCursor.__name__ = f"Instrumented{cursor_class.__name__}"
+    InstrumentedCursor.__qualname__ = InstrumentedCursor.__name__
+    _cursor_classes[cursor_class] = InstrumentedCursor
+    return InstrumentedCursor
+
+
+def record_acquire(started):
+    stats = current_stats()
+    if stats is not None:
+        stats.record_acquire(time.perf_counter() - started)
+
+
+# ---------------------------------------------------------
+# Per-endpoint rollup
+# ---------------------------------------------------------
+def _event_name():
+    if not has_request_context():
+        return None
+    event = getattr(request, "event", None)
+    if getattr(request, "sid", None) is not None and isinstance(event, dict):
+        return f"socket:{event.get('message')}"
+    return request.endpoint
+
+
+def _add_to_rollup(name, stats):
+    if not name:
+        return
+    with _rollup_lock:
+        entry = _rollup.setdefault(name, {
+            "calls": 0, "queries": 0, "db_ms": 0.0, "acquire_ms": 0.0, "max_db_ms": 0.0,
+        })
+        db_ms = stats.db_time * 1000
+        entry["calls"] += 1
+        entry["queries"] += stats.query_count
+        entry["db_ms"] += db_ms
+        entry["acquire_ms"] += stats.acquire_time * 1000
+        entry["max_db_ms"] = max(entry["max_db_ms"], db_ms)
+
+
+def endpoint_stats():
+    """Per-endpoint totals since the process started, hottest (by total DB time) first."""
+    with _rollup_lock:
+        rows = [
+            {
+                "endpoint": name,
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in entry.items()},
+                "avg_queries": round(entry["queries"] / entry["calls"], 2),
+                "avg_db_ms": round(entry["db_ms"] / entry["calls"], 3),
+            }
+            for name, entry in _rollup.items()
+        ]
+    return sorted(rows, key=lambda r: r["db_ms"], reverse=True)
+
+
+# ---------------------------------------------------------
+# Flask hooks
+# ---------------------------------------------------------
+def _start_request():
+    current_stats(create=True)
+
+
+def _debug_requested():
+    return getattr(Config, "DB_DEBUG_QUERIES", False) and (
+        request.args.get("_db_debug") == "1" or request.headers.get("X-DB-Debug") == "1"
+    )
+
+
+def _finish_request(response):
+    stats = current_stats(create=False)
+    if stats is None:
+        return response
+
+    summary = stats.summary()
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={summary["db_ms"]};desc="{summary["query_count"]} queries", '
+        f'db-acquire;dur={summary["acquire_ms"]}, '
+        f'total;dur={summary["total_ms"]}'
+    )
+
+    if _debug_requested() and response.is_json and not response.is_streamed:
+        body = response.get_json(silent=True)
+        if isinstance(body, dict):
+            from flask import json
+            body["_db_debug"] = {**summary, "endpoint": request.endpoint, "queries": stats.queries}
+            response.set_data(json.dumps(body))
+
+    return response
+
+
+def _finish_context(exc=None):
+    stats = current_stats(create=False)
+    if stats is None:
+        return
+    name = _event_name()
+    _add_to_rollup(name, stats)
+
+    # HTTP requests report through Server-Timing; socket events only have the log.
+    if name and name.startswith("socket:"):
+        summary = stats.summary()
+        slow_ms = getattr(Config, "DB_SLOW_EVENT_MS", 200)
+        if getattr(Config, "DB_DEBUG_QUERIES", False) or summary["db_ms"] >= slow_ms:
+            print(
+                f"⏱️ [DB] {name}: {summary['query_count']} queries, "
+                f"db {summary['db_ms']}ms, acquire {summary['acquire_ms']}ms, total {summary['total_ms']}ms"
+            )
+
+
+def init_app(app):
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_finish_context)
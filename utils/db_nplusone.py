@@ -0,0 +1,111 @@
+# utils/db_nplusone.py
+"""
+N+1 query detection for development and test runs.
+
+Every statement recorded by utils/db_metrics.py is reduced to a fingerprint
+(the SQL with literals and parameter placeholders normalized away). When the
+same fingerprint runs more than DB_NPLUSONE_THRESHOLD times within one
+request, Socket.IO event or db_metrics.collect() block, a report with the
+call-site stack is produced:
+
+    DB_NPLUSONE_MODE=log    print the report (once per statement shape)
+    DB_NPLUSONE_MODE=raise  raise NPlusOneError from the offending execute()
+    DB_NPLUSONE_MODE=off    disabled (default)
+
+utils/pytest_nplusone.py turns reports into test failures.
+"""
+import os
+import re
+import sysconfig
+import traceback
+
+from config import Config
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_UTILS_DIR = os.path.join(_PROJECT_ROOT, "utils")
+_LIBRARY_DIRS = tuple({sysconfig.get_paths()[key] for key in ("stdlib", "purelib", "platlib")})
+
+# Callables notified with every NPlusOneReport (used by the pytest plugin).
+listeners = []
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\$\d+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+class NPlusOneError(Exception):
+    """Raised in DB_NPLUSONE_MODE=raise when a statement shape repeats too often."""
+
+    def __init__(self, report):
+        super().__init__(report.format())
+        self.report = report
+
+
+class NPlusOneReport:
+    def __init__(self, fingerprint, count, threshold, stack, context):
+        self.fingerprint = fingerprint
+        self.count = count
+        self.threshold = threshold
+        self.stack = stack
+        self.context = context
+
+    def format(self):
+        where = f" in {self.context}" if self.context else ""
+        return (
+            f"Possible N+1{where}: statement ran more than {self.threshold} times\n"
+            f"  {self.fingerprint}\n"
+            f"Call site:\n{self.stack}"
+        )
+
+
+def fingerprint(sql):
+    """Normalizes a statement so the same query with different values compares equal."""
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?)", sql)
+    return _SPACES.sub(" ", sql).strip().lower()
+
+
+def _mode():
+    return (getattr(Config, "DB_NPLUSONE_MODE", "off") or "off").lower()
+
+
+def enabled():
+    return _mode() in ("log", "raise")
+
+
+def _call_site():
+    # Application frames only: skip the DB layer, the standard library and installed packages.
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if not frame.filename.startswith(_UTILS_DIR + os.sep)
+        and not frame.filename.startswith(_LIBRARY_DIRS)
+        and not frame.filename.startswith("<")
+    ]
+    return "".join(traceback.format_list(frames[-8:])).rstrip()
+
+
+def observe(counts, sql, context=None):
+    """
+    Counts one execution of `sql` in `counts` (a per-request dict) and reports
+    the first time its shape goes over the threshold.
+    """
+    if not enabled():
+        return
+
+    key = fingerprint(sql)
+    counts[key] = counts.get(key, 0) + 1
+    threshold = int(getattr(Config, "DB_NPLUSONE_THRESHOLD", None) or 5)
+    if counts[key] != threshold + 1:
+        return
+
+    report = NPlusOneReport(key, counts[key], threshold, _call_site(), context)
+    for listener in listeners:
+        listener(report)
+
+    if _mode() == "raise":
+        raise NPlusOneError(report)
+    print(f"⚠️ [DB] {report.format()}")
@@ -0,0 +1,224 @@
+# utils/db_pool.py
+"""
+Process-wide PostgreSQL connection pool used behind utils.db.get_connection().
+
+Connections are checked out with getconn() and handed back with putconn().
+The pool keeps between `minconn` and `maxconn` physical connections open,
+health-checks idle connections before handing them out, recycles connections
+older than `max_lifetime` and makes callers wait (up to `timeout` seconds, with
+at most `max_waiting` callers queued) when every connection is busy.
+"""
+import threading
+import time
+from collections import deque
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import PoolError
+
+
+class PoolExhaustedError(PoolError):
+    """Raised when no connection became free in time or the wait queue is full."""
+
+
+# Called with the set of tables a transaction wrote, right after it commits (utils/query_cache.py).
+commit_listeners = []
+
+
+class PoolConnection(psycopg2.extensions.connection):
+    """
+    psycopg2 connection that remembers when it was opened and last returned,
+    which server-side prepared statements it holds (utils/db_prepared.py) and
+    which tables the open transaction wrote to (utils/query_cache.py).
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.prepared = set()
+        self.written_tables = set()
+
+    def commit(self):
+        super().commit()
+        if self.written_tables:
+            written, self.written_tables = self.written_tables, set()
+            for listener in commit_listeners:
+                try:
+                    listener(written)
+                except Exception as e:
+                    # Already committed; a failing listener must not turn that into an error.
+                    print(f"❌ [DB] commit listener failed: {e}")
+
+    def rollback(self):
+        super().rollback()
+        self.written_tables = set()
+
+
+class ConnectionPool:
+    def __init__(self, connect_kwargs, minconn=1, maxconn=10, timeout=10.0,
+                 max_waiting=50, max_lifetime=1800.0, check_interval=30.0, readonly=False):
+        if maxconn < 1 or minconn < 0 or minconn > maxconn:
+            raise ValueError("Invalid pool size: expected 0 <= minconn <= maxconn and maxconn >= 1")
+
+        self.connect_kwargs = dict(connect_kwargs)
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_waiting = max_waiting
+        self.max_lifetime = max_lifetime
+        self.check_interval = check_interval
+        self.readonly = readonly
+
+        self._idle = deque()
+        self._size = 0        # open connections, idle + checked out
+        self._waiting = 0     # callers blocked in getconn()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # ------------------------------------------------------------------
+    # Checkout / return
+    # ------------------------------------------------------------------
+    def getconn(self):
+        """Returns a healthy connection, opening or waiting for one if needed."""
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            candidate = None
+            with self._cond:
+                if self._closed:
+                    raise PoolError("Connection pool is closed")
+
+                while not self._idle and self._size >= self.maxconn:
+                    if self._waiting >= self.max_waiting:
+                        raise PoolExhaustedError(
+                            f"Connection pool exhausted: {self._waiting} requests already waiting"
+                        )
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolExhaustedError(
+                            f"Timed out after {self.timeout}s waiting for a database connection"
+                        )
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+                if self._idle:
+                    candidate = self._idle.pop()
+                else:
+                    self._size += 1
+
+            # Network work happens outside the lock so other callers are not blocked.
+            if candidate is None:
+                try:
+                    return self._connect()
+                except Exception:
+                    self._forget()
+                    raise
+
+            if self._is_healthy(candidate):
+                return candidate
+            self._discard(candidate)
+
+    def putconn(self, conn):
+        """Hands a connection back, rolling back anything left open on it."""
+        if conn.closed:
+            self._forget()
+            return
+
+        try:
+            if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            conn.written_tables.clear()
+            if conn.autocommit:
+                conn.autocommit = False
+        except psycopg2.Error:
+            self._discard(conn)
+            return
+
+        if self._expired(conn):
+            self._discard(conn)
+            return
+
+        conn.last_used = time.monotonic()
+        with self._cond:
+            if self._closed:
+                close_now = True
+            else:
+                close_now = False
+                self._idle.append(conn)
+                self._cond.notify()
+        if close_now:
+            self._discard(conn)
+
+    def fill(self):
+        """Opens connections until `minconn` are available."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.minconn:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                self._forget()
+                raise
+            self.putconn(conn)
+
+    def closeall(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "waiting": self._waiting,
+                "minconn": self.minconn,
+                "maxconn": self.maxconn,
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _connect(self):
+        conn = psycopg2.connect(connection_factory=PoolConnection, **self.connect_kwargs)
+        if self.readonly:
+            conn.set_session(readonly=True)
+        return conn
+
+    def _expired(self, conn):
+        return bool(self.max_lifetime) and time.monotonic() - conn.created_at > self.max_lifetime
+
+    def _is_healthy(self, conn):
+        if conn.closed or self._expired(conn):
+            return False
+        if time.monotonic() - conn.last_used < self.check_interval:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._forget()
+
+    def _forget(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
@@ -0,0 +1,94 @@
+# utils/db_prepared.py
+"""
+Server-side prepared statements for the hottest multi-join queries.
+
+A model declares its statement once at import time:
+
+    _SLOTS = prepared_statement("available_slots", "SELECT ... WHERE th.course_code = %s ...")
+
+and runs it with `_SLOTS.execute(cur, params)` instead of `cur.execute(sql, params)`.
+
+Each pooled connection remembers which statements it has prepared. The first
+call on a connection sends `PREPARE ...` and records it before running
+`EXECUTE ...`: PREPARE is not undone by a rollback, so an EXECUTE that fails
+(statement timeout, bad input) must not leave it unrecorded. Later calls only
+send `EXECUTE name (...)`, so PostgreSQL skips parsing and planning the SQL
+text again. Connections the pool opens afresh start with
+nothing prepared, so statements are prepared again on demand.
+
+Set DB_PREPARED_STATEMENTS=0 when a transaction-pooling proxy such as
+PgBouncer sits in front of the database: session state like prepared
+statements does not survive there. Statements then run as plain SQL.
+"""
+import re
+
+from psycopg2 import errors
+
+from config import Config
+
+_PLACEHOLDER = re.compile(r"%%|%s")
+_NAME = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+_registry = {}
+
+
+class PreparedStatement:
+    def __init__(self, name, sql):
+        self.name = name
+        self.sql = sql
+        self.server_sql, self.param_count = _to_server_placeholders(sql)
+        args = ", ".join(["%s"] * self.param_count)
+        self._execute_sql = f"EXECUTE {name}" + (f" ({args})" if args else "")
+        # Sent without parameters, so psycopg2 does not unescape %% here.
+        self._prepare_sql = f"PREPARE {name} AS {self.server_sql.replace('%%', '%')}"
+
+    def execute(self, cursor, params=()):
+        params = tuple(params)
+        if len(params) != self.param_count:
+            raise ValueError(f"{self.name} expects {self.param_count} parameters, got {len(params)}")
+
+        prepared = getattr(cursor.connection, "prepared", None)
+        if prepared is None or not getattr(Config, "DB_PREPARED_STATEMENTS", True):
+            # Not a pooled connection (or disabled): plain statement.
+            return cursor.execute(self.sql, params)
+
+        if self.name not in prepared:
+            cursor.execute(self._prepare_sql)
+            prepared.add(self.name)
+
+        try:
+            return cursor.execute(self._execute_sql, params)
+        except errors.InvalidSqlStatementName:
+            # The server lost its session state (e.g. DISCARD ALL); re-prepare next time.
+            prepared.clear()
+            raise
+
+    def __repr__(self):
+        return f"PreparedStatement({self.name!r})"
+
+
+def _to_server_placeholders(sql):
+    """Rewrites psycopg2's %s placeholders to $1, $2, ... and counts them (%% stays as is)."""
+    count = 0
+
+    def number(match):
+        nonlocal count
+        if match.group(0) == "%%":
+            return "%%"
+        count += 1
+        return f"${count}"
+
+    return _PLACEHOLDER.sub(number, sql.strip().rstrip(";")), count
+
+
+def prepared_statement(name, sql):
+    """Registers (or returns the already registered) statement `name`."""
+    if not _NAME.match(name):
+        raise ValueError(f"Invalid prepared statement name: {name!r}")
+    existing = _registry.get(name)
+    if existing is not None:
+        if existing.sql != sql:
+            raise ValueError(f"Prepared statement {name!r} is already registered with different SQL")
+        return existing
+    statement = _registry[name] = PreparedStatement(name, sql)
+    return statement
@@ -0,0 +1,150 @@
+# utils/db_stream.py
+"""
+Streams large result sets to the client without holding them in memory.
+
+    @tutee_bp.route("/all")
+    def get_all_tutees():
+        return stream_query("SELECT * FROM tutee")
+
+The rows are read through a named (server-side) cursor, `itersize` at a
+time, and written out as they arrive, so memory stays flat no matter how big
+the table is. The body is a JSON array by default, or NDJSON (one object per
+line) when the client sends `?format=ndjson` or `Accept: application/x-ndjson`.
+`key` and `extra` wrap the array in an object, so endpoints that answer
+`{"success": true, "tutors": [...]}` keep their shape.
+
+The stream uses its own pooled connection (replica-routed like
+get_connection()), held until the last row is sent or the client disconnects.
+The first batch is fetched before the response starts, so SQL errors and
+timeouts in the query itself still reach the view's error handling.
+
+Inside a @cached view (utils/query_cache.py) a cached result is streamed
+without touching the database, and a result of up to QUERY_CACHE_MAX_ROWS
+rows is cached once it has been streamed in full.
+"""
+import copy
+import itertools
+import time
+
+import psycopg2
+from flask import Response, current_app, g, has_app_context, request, stream_with_context
+from psycopg2.extras import RealDictCursor
+
+from config import Config
+from utils import db_metrics, query_cache
+from utils.db import get_pool, get_replica_pool
+from utils.db_pool import PoolExhaustedError
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+_cursor_names = itertools.count(1)
+
+
+def _wants_ndjson():
+    return request.args.get("format") == "ndjson" or NDJSON_MIMETYPE in request.headers.get("Accept", "")
+
+
+def _checkout():
+    readonly = has_app_context() and g.get("db_readonly", False)
+    pools = [get_replica_pool(), get_pool()] if readonly and get_replica_pool() is not None else [get_pool()]
+    for i, pool in enumerate(pools):
+        started = time.perf_counter()
+        try:
+            conn = pool.getconn()
+        except (psycopg2.OperationalError, PoolExhaustedError) as e:
+            if i == len(pools) - 1:
+                raise
+            print(f"⚠️ [DB] Read replica unavailable, using primary: {e}")
+            continue
+        db_metrics.record_acquire(started)
+        return pool, conn
+
+
+def stream_query(sql, params=None, transform=None, key=None, extra=None, itersize=None, ndjson=None):
+    """
+    Returns a streaming Response with the rows of `sql` as JSON.
+
+    transform   optional function applied to each row (a dict) before encoding
+    key, extra  wrap the array: {**extra, key: [...]} (JSON array mode only)
+    itersize    rows per round trip (default DB_STREAM_ITERSIZE)
+    ndjson      force (True) or refuse (False) NDJSON; default follows the request
+    """
+    itersize = itersize or getattr(Config, "DB_STREAM_ITERSIZE", 500)
+    if ndjson is None:
+        ndjson = _wants_ndjson()
+
+    mimetype = NDJSON_MIMETYPE if ndjson else "application/json"
+    plan = query_cache.plan(sql, params, RealDictCursor)
+    if plan is not None and plan.hit is not None:
+        db_metrics.record_cache_hit()
+        rows = plan.hit[0]
+        batches = (rows[i:i + itersize] for i in range(0, len(rows), itersize))
+        body = _generate(batches, transform, key, extra, ndjson, lambda: None)
+        return Response(stream_with_context(body), mimetype=mimetype)
+
+    pool, conn = _checkout()
+    try:
+        cursor = db_metrics.open_cursor(conn, f"stream_{next(_cursor_names)}", cursor_factory=RealDictCursor)
+        cursor.itersize = itersize
+        cursor.execute(sql, params)
+        first = cursor.fetchmany(itersize)
+    except BaseException:
+        pool.putconn(conn)
+        raise
+
+    released = []
+
+    def release():
+        # Runs when the body finishes, or from call_on_close if it never started.
+        if released:
+            return
+        released.append(True)
+        try:
+            cursor.close()
+        except psycopg2.Error:
+            pass
+        pool.putconn(conn)
+
+    body = _generate(_batches(cursor, first, itersize, plan), transform, key, extra, ndjson, release)
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.call_on_close(release)
+    return response
+
+
+def _batches(cursor, batch, itersize, plan):
+    # Copies of the rows are kept for the cache: transforms may edit rows in place.
+    kept = [] if plan is not None else None
+    while batch:
+        if kept is not None:
+            kept.extend(copy.copy(row) for row in batch)
+            if len(kept) > plan.max_rows:
+                kept = None
+        yield batch
+        batch = cursor.fetchmany(itersize)
+    if kept is not None:
+        plan.store(kept, cursor.description)
+
+
+def _generate(batches, transform, key, extra, ndjson, release):
+    dumps = current_app.json.dumps
+    try:
+        if not ndjson:
+            if key is None:
+                yield "["
+            else:
+                head = dumps(extra or {})[:-1]
+                yield f'{head}{", " if len(head) > 1 else ""}{dumps(key)}: ['
+
+        first_row = True
+        for batch in batches:
+            rows = [dumps(transform(row) if transform else row) for row in batch]
+            if ndjson:
+                yield "\n".join(rows) + "\n"
+            else:
+                yield ("" if first_row else ",") + ",".join(rows)
+            first_row = False
+
+        if not ndjson:
+            yield "]" if key is None else "]}"
+    finally:
+        release()
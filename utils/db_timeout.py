@@ -0,0 +1,139 @@
+# utils/db_timeout.py
+"""
+Per-endpoint statement_timeout budgets.
+
+Budgets are declared on routes, socket handlers or whole blueprints:
+
+    @bp.route("/api/admin/export")
+    @statement_timeout(60000)
+    def export(): ...
+
+    @socketio.on("send_message")
+    @statement_timeout(2000)
+    def handle_message(data): ...
+
+    blueprint_statement_timeout(requests_bp, 5000)
+
+Everything else gets DB_STATEMENT_TIMEOUT_MS (0 disables it). The budget is
+applied with `SET LOCAL statement_timeout` at the start of every transaction
+the request opens, so it never leaks to the next user of the pooled connection.
+
+When PostgreSQL cancels a statement (or no pooled connection frees up in
+time) the HTTP response becomes a JSON 504 (or 503), even if the view caught
+the exception and built its own 500. Socket handlers get a `db_error` event.
+"""
+from functools import wraps
+
+from flask import g, has_app_context, has_request_context, jsonify, request
+from flask_socketio import emit
+from psycopg2 import errors
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from config import Config
+from utils.db_pool import PoolExhaustedError
+
+TIMEOUT_RESPONSE = ({"error": "The database took too long to respond. Please try again.", "code": "DB_TIMEOUT"}, 504)
+BUSY_RESPONSE = ({"error": "The server is busy. Please try again shortly.", "code": "DB_BUSY"}, 503)
+
+
+def current_budget():
+    """statement_timeout in ms for the running request/event, or 0 for none."""
+    if has_app_context():
+        budget = g.get("db_statement_timeout")
+        if budget is not None:
+            return budget
+    return getattr(Config, "DB_STATEMENT_TIMEOUT_MS", 0)
+
+
+def statement_timeout(ms):
+    """Sets the statement_timeout budget (ms) for a view or Socket.IO handler."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            g.db_statement_timeout = ms
+            if not _in_socket_event():
+                return fn(*args, **kwargs)
+
+            # Socket.IO has no response to rewrite; tell the client instead.
+            try:
+                result = fn(*args, **kwargs)
+            except (errors.QueryCanceled, PoolExhaustedError) as e:
+                note_error(e)
+                result = None
+            _emit_socket_error()
+            return result
+        return wrapper
+    return decorator
+
+
+def blueprint_statement_timeout(blueprint, ms):
+    """Default budget for every route of `blueprint`; @statement_timeout on a route still wins."""
+    @blueprint.before_request
+    def _set_budget():
+        g.db_statement_timeout = ms
+
+
+def _in_socket_event():
+    return has_request_context() and getattr(request, "sid", None) is not None and hasattr(request, "event")
+
+
+# ---------------------------------------------------------
+# Hooks used by utils/db.py and the instrumented cursor
+# ---------------------------------------------------------
+def apply(cursor, query=None):
+    """
+    Returns `query` to run on `cursor`. When it opens a new transaction under a
+    budget, `SET LOCAL statement_timeout` is sent first: prefixed onto the
+    same round trip for plain SQL, as its own statement otherwise (named
+    cursors, composed SQL, or no `query` given).
+    """
+    budget = current_budget()
+    conn = cursor.connection
+    if not budget or conn.autocommit or conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+        return query
+
+    set_local = f"SET LOCAL statement_timeout = {int(budget)}"
+    if cursor.name is None and isinstance(query, str):
+        return f"{set_local}; {query}"
+    with conn.cursor() as cur:
+        cur.execute(set_local)
+    return query
+
+
+def note_error(exc):
+    """Remembers a cancelled statement or exhausted pool so the response can report it."""
+    if not has_app_context():
+        return
+    if isinstance(exc, errors.QueryCanceled):
+        g.db_error_response = TIMEOUT_RESPONSE
+    elif isinstance(exc, PoolExhaustedError):
+        g.db_error_response = BUSY_RESPONSE
+
+
+def _emit_socket_error():
+    error = g.pop("db_error_response", None)
+    if error is not None:
+        body, status = error
+        emit("db_error", {**body, "status": status, "event": request.event.get("message")}, room=request.sid)
+
+
+def _replace_response(response):
+    error = g.get("db_error_response")
+    if error is None or response.status_code < 500:
+        return response
+    body, status = error
+    replacement = jsonify(body)
+    replacement.status_code = status
+    return replacement
+
+
+def _handle_error(exc):
+    note_error(exc)
+    body, status = g.db_error_response
+    return jsonify(body), status
+
+
+def init_app(app):
+    app.after_request(_replace_response)
+    app.register_error_handler(errors.QueryCanceled, _handle_error)
+    app.register_error_handler(PoolExhaustedError, _handle_error)
@@ -0,0 +1,146 @@
+# utils/identity.py
+"""
+Identity claims for the logged-in user, resolved once and kept in the session.
+
+Google only gives us `sub` (google_id) and `email`; almost every endpoint also
+needs the tutee id_number, the account role/status and the tutor status. These
+are resolved at login (and at register_tutee) and stored as session["identity"]:
+
+    claims = identity.claims()        # None when not logged in
+    claims["id_number"], claims["role"], claims["status"], claims["tutor_status"]
+
+Claims older than IDENTITY_TTL_SECONDS are re-read on next use. Flows that
+change someone's role or status (tutor approval, bans, appeals) call
+identity.invalidate(...) so that user's claims are re-read on their next
+request in this process; the TTL covers the other worker processes.
+
+lookup(google_id=..., email=...) answers from the session when it is the
+logged-in user and falls back to the database for anyone else.
+"""
+import threading
+import time
+
+from flask import has_request_context, session
+from psycopg2.extras import RealDictCursor
+
+from config import Config
+from utils.db import after_commit, get_connection
+
+SESSION_KEY = "identity"
+
+_lock = threading.Lock()
+_stale_since = {}   # ("google_id" | "id_number", value) -> time of the last change
+
+
+def _ttl():
+    return getattr(Config, "IDENTITY_TTL_SECONDS", 300)
+
+
+def resolve(google_id=None, email=None):
+    """Reads the claims for one user from the database (by google_id, else email)."""
+    column, value = ("google_id", google_id) if google_id else ("email", email)
+    if not value:
+        return None
+
+    conn = get_connection()
+    try:
+        with conn.cursor(cursor_factory=RealDictCursor) as cur:
+            cur.execute(f"""
+                SELECT
+                    ua.google_id,
+                    ua.email,
+                    te.id_number,
+                    ua.role,
+                    ua.status AS account_status,
+                    t.status AS tutor_status
+                FROM user_account ua
+                LEFT JOIN tutee te ON ua.google_id = te.google_id
+                LEFT JOIN tutor t ON te.id_number = t.tutor_id
+                WHERE ua.{column} = %s
+                LIMIT 1;
+            """, (value,))
+            row = cur.fetchone()
+    finally:
+        conn.close()
+
+    if not row:
+        return {"google_id": google_id, "email": email, "registered": False, "id_number": None,
+                "role": "GUEST", "status": "ACTIVE", "tutor_status": None, "resolved_at": time.time()}
+
+    return {
+        "google_id": row["google_id"],
+        "email": row["email"],
+        "registered": True,     # a user_account row exists; get_user reports it as registered_tutee
+        "id_number": row["id_number"],
+        "role": row["role"],
+        "status": row["account_status"],
+        "tutor_status": row["tutor_status"],
+        "resolved_at": time.time(),
+    }
+
+
+def refresh():
+    """Re-reads the logged-in user's claims into the session and returns them."""
+    user = session.get("user")
+    if not user:
+        session.pop(SESSION_KEY, None)
+        return None
+    fresh = resolve(google_id=user.get("sub"), email=user.get("email"))
+    session[SESSION_KEY] = fresh
+    return fresh
+
+
+def _is_fresh(cached, user):
+    if not cached or cached.get("google_id") != user.get("sub"):
+        return False
+    resolved_at = cached.get("resolved_at", 0)
+    if _ttl() and time.time() - resolved_at > _ttl():
+        return False
+    for key in (("google_id", cached.get("google_id")), ("id_number", cached.get("id_number"))):
+        changed = _stale_since.get(key)
+        if changed is not None and changed >= resolved_at:
+            return False
+    return True
+
+
+def claims():
+    """Claims of the logged-in user (refreshed when stale), or None when logged out."""
+    if not has_request_context():
+        return None
+    user = session.get("user")
+    if not user:
+        return None
+    cached = session.get(SESSION_KEY)
+    if _is_fresh(cached, user):
+        return cached
+    return refresh()
+
+
+def lookup(google_id=None, email=None):
+    """Claims for `google_id`/`email`: from the session for the current user, else from the database."""
+    current = session.get("user") if has_request_context() else None
+    if current and ((google_id and google_id == current.get("sub")) or
+                    (not google_id and email and email == current.get("email"))):
+        return claims()
+    return resolve(google_id=google_id, email=email)
+
+
+def invalidate(google_id=None, id_number=None):
+    """Marks a user's claims stale once the current transaction commits."""
+    def mark():
+        now = time.time()
+        with _lock:
+            # Entries older than the TTL are moot: those claims expire anyway.
+            for key, changed in list(_stale_since.items()):
+                if _ttl() and now - changed > _ttl():
+                    del _stale_since[key]
+            if google_id:
+                _stale_since[("google_id", google_id)] = now
+            if id_number:
+                _stale_since[("id_number", id_number)] = now
+    after_commit(mark)
+
+
+def forget():
+    """Drops the cached claims (logout)."""
+    session.pop(SESSION_KEY, None)
@@ -0,0 +1,237 @@
+# utils/message_writer.py
+"""
+Write-behind persistence for chat messages, enabled with CHAT_WRITE_BEHIND=1.
+
+    message_id, timestamp = message_writer.submit(appointment_id, sender_id, message_text)
+
+submit() gives the message its id and timestamp and returns at once, so the
+sender's socket event can broadcast it without waiting for a commit. Ids
+come from blocks reserved from the message_id sequence
+(CHAT_WRITE_BEHIND_BATCH_SIZE at a time, one reservation at a time), so
+they are real ids that later keyset pages and reconnect deltas can use, and
+they grow in submission order.
+
+A background task (a greenlet under eventlet) inserts the queued messages
+as multi-row INSERTs, one transaction per batch. It sleeps until a message
+is queued, lets a batch gather for up to CHAT_WRITE_BEHIND_INTERVAL_MS
+(less once a full batch is waiting) and flushes.
+
+Reads see queued messages too: MessageModel reads the message table only
+after sync(appointment_id), which flushes first whenever that appointment
+has messages queued or being written.
+
+Durability:
+  * a batch that fails is retried row by row; rows the database rejects
+    (e.g. the appointment was deleted meanwhile) are logged and dropped,
+    anything else (connection lost, ...) stays queued for the next flush
+  * flush() drains the queue; it runs at interpreter exit, and SIGTERM is
+    turned into a normal exit (unless a server already handles SIGTERM) so
+    that a plain `kill` drains too. A hard kill loses at most the messages
+    of the last CHAT_WRITE_BEHIND_INTERVAL_MS.
+"""
+import atexit
+import signal
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import psycopg2
+from psycopg2.extras import execute_values
+
+from config import Config
+from utils.db import get_private_connection
+
+_lock = threading.Lock()          # guards _pending, _in_flight and _ids
+_flush_lock = threading.Lock()    # one flush at a time (background task, readers, exit)
+_reserve_lock = threading.Lock()  # one id reservation at a time
+_wake = threading.Event()         # set when the queue stops being empty
+_full = threading.Event()         # set when a full batch is waiting
+_pending = deque()                # (message_id, appointment_id, sender_id, message_text, timestamp)
+_in_flight = []                   # the batch being inserted right now
+_ids = deque()                    # reserved, not yet used message ids
+_started = False
+
+_INSERT = """
+    INSERT INTO message (message_id, appointment_id, sender_id, message_text, timestamp)
+    OVERRIDING SYSTEM VALUE
+    VALUES %s
+"""
+
+
+def enabled():
+    return getattr(Config, "CHAT_WRITE_BEHIND", False)
+
+
+def _batch_size():
+    return getattr(Config, "CHAT_WRITE_BEHIND_BATCH_SIZE", 100)
+
+
+def start(socketio=None):
+    """Starts the background flusher (on `socketio`'s async mode when given). No-op when disabled."""
+    global _started
+    with _lock:
+        if _started or not enabled():
+            return
+        _started = True
+
+    if socketio is not None:
+        socketio.start_background_task(_run)
+    else:
+        threading.Thread(target=_run, name="message-writer", daemon=True).start()
+
+    atexit.register(_flush_at_exit)
+    if signal.getsignal(signal.SIGTERM) is signal.SIG_DFL:
+        try:
+            signal.signal(signal.SIGTERM, _exit_on_sigterm)
+        except ValueError:
+            pass   # not the main thread; atexit still covers normal shutdowns
+    print(f"✍️ [Chat] Write-behind message persistence on "
+          f"({_batch_size()} per batch, every {getattr(Config, 'CHAT_WRITE_BEHIND_INTERVAL_MS', 5)} ms)")
+
+
+def _exit_on_sigterm(signum, frame):
+    raise SystemExit(0)
+
+
+def _flush_at_exit():
+    try:
+        written = flush()
+        if written:
+            print(f"✍️ [Chat] Flushed {written} queued message(s) before exit")
+    except Exception as e:
+        print(f"❌ [Chat] {pending()} message(s) could not be written before exit: {e}")
+
+
+def submit(appointment_id, sender_id, message_text):
+    """Queues a message for insertion and returns its (message_id, timestamp)."""
+    if not _started:
+        start()
+    timestamp = datetime.now()
+    while True:
+        with _lock:
+            # Taking the id and queueing the row together keeps _pending in id order
+            if _ids:
+                message_id = _ids.popleft()
+                _pending.append((message_id, appointment_id, sender_id, message_text, timestamp))
+                first, full = len(_pending) == 1, len(_pending) >= _batch_size()
+                break
+        _refill_ids()
+    if first:
+        _wake.set()
+    if full:
+        _full.set()
+    return message_id, timestamp
+
+
+def sync(appointment_id):
+    """Writes the queue now if it holds (or is writing) messages of `appointment_id`."""
+    if not _started:
+        return
+    key = str(appointment_id)
+    with _lock:
+        waiting = any(str(row[1]) == key for row in _pending) or any(str(row[1]) == key for row in _in_flight)
+    if waiting:
+        flush()
+
+
+def _refill_ids():
+    # One reservation at a time: a submitter that waited here finds the block
+    # the previous one reserved instead of reserving (and interleaving) another.
+    with _reserve_lock:
+        with _lock:
+            if _ids:
+                return
+        reserved = _reserve_ids(_batch_size())
+        with _lock:
+            _ids.extend(reserved)
+
+
+def _reserve_ids(count):
+    conn = get_private_connection()
+    cur = conn.cursor()
+    try:
+        # nextval() is not transactional: the ids stay ours whatever happens to this transaction.
+        cur.execute(
+            "SELECT nextval(pg_get_serial_sequence('message', 'message_id')) FROM generate_series(1, %s)",
+            (count,),
+        )
+        reserved = [row[0] for row in cur.fetchall()]
+        conn.commit()
+        return reserved
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _run():
+    interval = getattr(Config, "CHAT_WRITE_BEHIND_INTERVAL_MS", 5) / 1000.0
+    while True:
+        _wake.wait()
+        _full.wait(interval)   # group commit: let the batch fill up a little
+        # Cleared before flushing: a message queued from here on wakes the next round.
+        _wake.clear()
+        _full.clear()
+        try:
+            flush()
+        except Exception as e:
+            print(f"❌ [Chat] Write-behind flush failed, retrying in 1s: {e}")
+            time.sleep(1)
+            _wake.set()
+
+
+def flush():
+    """Inserts everything queued so far. Returns the number of messages written."""
+    written = 0
+    with _flush_lock:
+        while True:
+            with _lock:
+                batch = [_pending.popleft() for _ in range(min(len(_pending), _batch_size()))]
+                _in_flight[:] = batch
+            if not batch:
+                return written
+            try:
+                _insert(batch)
+                written += len(batch)
+            except psycopg2.Error as e:
+                print(f"⚠️ [Chat] Batch of {len(batch)} messages failed ({e}); retrying one by one")
+                written += _insert_each(batch)
+            finally:
+                with _lock:
+                    _in_flight.clear()
+
+
+def _insert(rows):
+    conn = get_private_connection()
+    cur = conn.cursor()
+    try:
+        execute_values(cur, _INSERT, rows, page_size=len(rows))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+def _insert_each(rows):
+    written = 0
+    for index, row in enumerate(rows):
+        try:
+            _insert([row])
+            written += 1
+        except (psycopg2.IntegrityError, psycopg2.DataError) as e:
+            print(f"❌ [Chat] Dropping message {row[0]} for appointment {row[1]}: {e}")
+        except psycopg2.Error:
+            # Transient (connection, timeout): keep the rest queued, in order, for the next flush.
+            with _lock:
+                _pending.extendleft(reversed(rows[index:]))
+            raise
+    return written
+
+
+def pending():
+    """Number of messages queued and not yet written."""
+    with _lock:
+        return len(_pending)
@@ -0,0 +1,57 @@
+# utils/pytest_nplusone.py
+"""
+pytest plugin that fails tests which trigger the N+1 detector.
+
+Enable it with `pytest -p utils.pytest_nplusone` (or `pytest_plugins =
+["utils.pytest_nplusone"]` in a conftest.py). Each test runs inside a
+db_metrics.collect() block, so model calls made directly from the test are
+counted as well as requests made through app.test_client().
+
+    --nplusone-threshold=N       allowed repeats of one statement shape (default: DB_NPLUSONE_THRESHOLD)
+    @pytest.mark.nplusone(threshold=20)   per-test override
+    @pytest.mark.nplusone(allow=True)     known offender, report only
+"""
+import pytest
+
+from config import Config
+from utils import db_metrics, db_nplusone
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("nplusone", "N+1 query detection")
+    group.addoption(
+        "--nplusone-threshold", type=int, default=None,
+        help="fail a test when one SQL statement shape runs more than this many times in a request",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "nplusone(threshold=None, allow=False): tune or silence N+1 query detection for a test"
+    )
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("nplusone")
+    options = marker.kwargs if marker else {}
+    threshold = options.get("threshold") or item.config.getoption("nplusone_threshold")
+
+    saved = {name: getattr(Config, name, None) for name in ("DB_NPLUSONE_MODE", "DB_NPLUSONE_THRESHOLD")}
+    Config.DB_NPLUSONE_MODE = "log"
+    if threshold is not None:
+        Config.DB_NPLUSONE_THRESHOLD = threshold
+
+    reports = []
+    db_nplusone.listeners.append(reports.append)
+    try:
+        with db_metrics.collect():
+            result = yield
+    finally:
+        db_nplusone.listeners.remove(reports.append)
+        for name, value in saved.items():
+            setattr(Config, name, value)
+
+    if reports and not options.get("allow", False):
+        pytest.fail("\n\n".join(report.format() for report in reports), pytrace=False)
+    return result
@@ -0,0 +1,352 @@
+# utils/query_cache.py
+"""
+Result cache for read queries, invalidated by writes to the tables they read.
+
+Views opt in with one decorator; every SELECT they run is then served from
+the cache when possible:
+
+    @tutor_bp.route("/<tutor_id>")
+    @cached(ttl=60)
+    def get_tutor(tutor_id): ...
+
+Entries are keyed by statement + params (+ row type) and tagged with the
+tables the statement reads (FROM/JOIN). Any INSERT/UPDATE/DELETE/TRUNCATE
+sent through utils.db marks its tables as written on the connection, and the
+tags are invalidated when that transaction commits (immediately in
+autocommit). Writes that bypass utils.db (Supabase, psql) are only covered
+by the TTL. Results of more than QUERY_CACHE_MAX_ROWS rows are not cached.
+
+Backends:
+  * LRUBackend    in-process, bounded by QUERY_CACHE_MAX_ENTRIES and the TTL
+  * SharedBackend over a SharedStore (get/set/incr, e.g. Redis or
+                  memcached) so several workers share entries and
+                  invalidations; LocalSharedStore is an in-process stand-in
+
+QUERY_CACHE_BACKEND selects "memory" (default), "shared" or "off";
+set_backend() plugs in anything else implementing CacheBackend.
+"""
+import hashlib
+import pickle
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import g, has_app_context
+
+from config import Config
+from utils import db_pool
+
+_READ_TABLES = re.compile(r'\b(?:FROM|JOIN)\s+(?:ONLY\s+)?("?[A-Za-z_][\w.]*"?)', re.IGNORECASE)
+_WRITE_TABLES = re.compile(
+    r'\b(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?|MERGE\s+INTO)\s+(?:ONLY\s+)?("?[A-Za-z_][\w.]*"?)',
+    re.IGNORECASE,
+)
+_WRITE_VERB = re.compile(r"\b(?:INSERT|UPDATE|DELETE|TRUNCATE|MERGE)\b", re.IGNORECASE)
+_READ_ONLY_START = re.compile(r"^\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+_LOCKING = re.compile(r"\bFOR\s+(?:UPDATE|SHARE|NO\s+KEY\s+UPDATE|KEY\s+SHARE)\b", re.IGNORECASE)
+# Words the patterns above can catch that are not tables: `DO UPDATE SET`, `FROM generate_series(...)`, ...
+_NOT_TABLES = {"set", "select", "lateral", "unnest", "generate_series", "jsonb_array_elements", "json_array_elements"}
+
+
+def _table(name):
+    return name.strip('"').split(".")[-1].lower()
+
+
+def read_tables(sql):
+    """Tables `sql` reads, e.g. {'tutor', 'tutee'}."""
+    return {t for t in map(_table, _READ_TABLES.findall(sql)) if t not in _NOT_TABLES}
+
+
+def written_tables(sql):
+    """Tables `sql` writes to."""
+    return {t for t in map(_table, _WRITE_TABLES.findall(sql)) if t not in _NOT_TABLES}
+
+
+# ---------------------------------------------------------
+# Backends
+# ---------------------------------------------------------
+class CacheBackend:
+    """
+    Stores pickled results. Each tag has a version that invalidate() bumps; an
+    entry is only returned while all of its tags still have the versions
+    read before the query ran, so a write landing mid-query is never cached.
+    """
+
+    def versions(self, tags):
+        raise NotImplementedError
+
+    def get(self, key, tags):
+        raise NotImplementedError
+
+    def set(self, key, value, tags, versions, ttl):
+        raise NotImplementedError
+
+    def invalidate(self, tags):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LRUBackend(CacheBackend):
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()   # key -> (expires_at, versions, value)
+        self._tag_versions = {}
+        self._lock = threading.Lock()
+
+    def versions(self, tags):
+        with self._lock:
+            return tuple(self._tag_versions.get(tag, 0) for tag in tags)
+
+    def get(self, key, tags):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, versions, value = entry
+            current = tuple(self._tag_versions.get(tag, 0) for tag in tags)
+            if expires_at < time.monotonic() or versions != current:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, tags, versions, ttl):
+        with self._lock:
+            if versions != tuple(self._tag_versions.get(tag, 0) for tag in tags):
+                return
+            self._entries[key] = (time.monotonic() + ttl, versions, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tags):
+        # Entries under these tags become unreachable and age out of the LRU.
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SharedStore:
+    """The few primitives SharedBackend needs from a shared key-value store."""
+
+    def get_many(self, keys):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def incr(self, key):
+        raise NotImplementedError
+
+    def delete_prefix(self, prefix):
+        raise NotImplementedError
+
+
+class LocalSharedStore(SharedStore):
+    """In-process SharedStore, standing in for Redis/memcached in development and tests."""
+
+    def __init__(self):
+        self._data = {}   # key -> (expires_at or None, value)
+        self._lock = threading.Lock()
+
+    def _live(self, key, now):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at is not None and expires_at < now:
+            del self._data[key]
+            return None
+        return value
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        with self._lock:
+            return [self._live(key, now) for key in keys]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl if ttl else None, value)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._live(key, time.monotonic()) or 0) + 1
+            self._data[key] = (None, value)
+            return value
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+
+class SharedBackend(CacheBackend):
+    def __init__(self, store, prefix="qc:"):
+        self.store = store
+        self.prefix = prefix
+
+    def _tag_key(self, tag):
+        return f"{self.prefix}tag:{tag}"
+
+    def versions(self, tags):
+        return tuple(int(v or 0) for v in self.store.get_many([self._tag_key(t) for t in tags]))
+
+    def get(self, key, tags):
+        stored, *current = self.store.get_many([self.prefix + key] + [self._tag_key(t) for t in tags])
+        if stored is None:
+            return None
+        versions, value = pickle.loads(stored)
+        if versions != tuple(int(v or 0) for v in current):
+            return None
+        return value
+
+    def set(self, key, value, tags, versions, ttl):
+        if versions != self.versions(tags):
+            return
+        self.store.set(self.prefix + key, pickle.dumps((versions, value)), ttl)
+
+    def invalidate(self, tags):
+        for tag in tags:
+            self.store.incr(self._tag_key(tag))
+
+    def clear(self):
+        self.store.delete_prefix(self.prefix)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The configured backend, or None when QUERY_CACHE_BACKEND is "off"."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                kind = getattr(Config, "QUERY_CACHE_BACKEND", "memory")
+                if kind == "off":
+                    return None
+                if kind == "shared":
+                    _backend = SharedBackend(LocalSharedStore())
+                else:
+                    _backend = LRUBackend(getattr(Config, "QUERY_CACHE_MAX_ENTRIES", 2000))
+    return _backend
+
+
+def set_backend(backend):
+    """Replaces the backend, e.g. with SharedBackend(RedisStore(...))."""
+    global _backend
+    _backend = backend
+
+
+def invalidate(tables):
+    backend = get_backend()
+    if backend is not None and tables:
+        backend.invalidate(sorted(tables))
+
+
+# Tables written by a transaction are invalidated when it commits.
+db_pool.commit_listeners.append(invalidate)
+
+
+# ---------------------------------------------------------
+# Opting in
+# ---------------------------------------------------------
+def cached(ttl=None, tables=()):
+    """
+    Caches the SELECTs run by the decorated view or function for `ttl`
+    seconds (default QUERY_CACHE_TTL_SECONDS). `tables` adds tags the SQL
+    does not name, e.g. the tables behind a view or function. Connections
+    taken inside it go to the primary even in a @read_replica view.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not has_app_context():
+                return fn(*args, **kwargs)
+            previous = g.get("query_cache")
+            g.query_cache = (ttl, frozenset(tables))
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                g.query_cache = previous
+        return wrapper
+    return decorator
+
+
+class CachePlan:
+    """A cacheable statement: its key and tags, and the cached result if there was one."""
+
+    def __init__(self, backend, key, tags, ttl):
+        self.backend = backend
+        self.key = key
+        self.tags = tags
+        self.ttl = ttl
+        self.max_rows = getattr(Config, "QUERY_CACHE_MAX_ROWS", 1000)
+        self.versions = backend.versions(tags)
+        self.hit = None
+        stored = backend.get(key, tags)
+        if stored is not None:
+            self.hit = pickle.loads(stored)   # (rows, description); a fresh copy per use
+
+    def store(self, rows, description):
+        if len(rows) > self.max_rows:
+            return
+        value = pickle.dumps((list(rows), description))
+        self.backend.set(self.key, value, self.tags, self.versions, self.ttl)
+
+
+def plan(query, params, row_type, connection=None):
+    """
+    Returns a CachePlan when `query` should go through the cache (a plain
+    SELECT inside a cached() view), else None.
+    """
+    if not has_app_context():
+        return None
+    scope = g.get("query_cache")
+    if scope is None or not isinstance(query, str):
+        return None
+    if not _READ_ONLY_START.match(query) or _WRITE_VERB.search(query) or _LOCKING.search(query):
+        return None
+    backend = get_backend()
+    if backend is None:
+        return None
+
+    ttl, extra_tags = scope
+    tags = tuple(sorted(read_tables(query) | extra_tags))
+    # This transaction's own uncommitted writes must be read from the database.
+    pending = getattr(connection, "written_tables", None)
+    if pending and pending.intersection(tags):
+        return None
+
+    digest = hashlib.sha1(repr((row_type.__name__, " ".join(query.split()), params)).encode("utf-8"))
+    return CachePlan(backend, digest.hexdigest(), tags, ttl or getattr(Config, "QUERY_CACHE_TTL_SECONDS", 60))
+
+
+def note_statement(connection, query):
+    """Records the tables a write statement touched (called for every statement sent)."""
+    if not isinstance(query, str) or not _WRITE_VERB.search(query):
+        return
+    tables = written_tables(query)
+    if not tables:
+        return
+    if connection.autocommit:
+        invalidate(tables)
+        return
+    pending = getattr(connection, "written_tables", None)
+    if pending is None:
+        # Not a pooled connection: there is no commit hook, so invalidate right away.
+        invalidate(tables)
+    else:
+        pending.update(tables)
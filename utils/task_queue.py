@@ -0,0 +1,95 @@
+# utils/task_queue.py
+"""
+In-process background queue for side effects the caller should not wait for.
+
+    task_queue.submit(notify_recipient, appointment_id, sender_id)
+
+Tasks run on TASK_QUEUE_WORKERS background tasks (greenlets under eventlet,
+started with socketio.start_background_task) and outside any Flask request,
+so each model call checks out its own pooled connection. A task that raises
+is logged and skipped.
+
+With the default single worker tasks run one at a time in submission order,
+which the chat notification upsert relies on: two notify_recipient calls for
+the same appointment running at once can both insert a NEW_MESSAGE row.
+Only raise TASK_QUEUE_WORKERS if every queued task is safe to run
+concurrently with the others.
+
+The queue is bounded by TASK_QUEUE_MAX_SIZE: when it is full the task runs
+inline instead, which slows the caller down rather than losing the work.
+Whatever is still queued runs at interpreter exit.
+"""
+import atexit
+import queue
+import threading
+
+from config import Config
+
+_lock = threading.Lock()
+_tasks = None     # queue.Queue of (fn, args, kwargs), created by start()
+_started = False
+
+
+def start(socketio=None):
+    """Starts the workers (on `socketio`'s async mode when given)."""
+    global _tasks, _started
+    with _lock:
+        if _started:
+            return
+        _tasks = queue.Queue(maxsize=getattr(Config, "TASK_QUEUE_MAX_SIZE", 1000))
+        _started = True
+
+    for number in range(max(1, getattr(Config, "TASK_QUEUE_WORKERS", 1))):
+        if socketio is not None:
+            socketio.start_background_task(_work)
+        else:
+            threading.Thread(target=_work, name=f"task-queue-{number}", daemon=True).start()
+    atexit.register(drain)
+
+
+def submit(fn, *args, **kwargs):
+    """Queues fn(*args, **kwargs) to run in the background."""
+    if not _started:
+        start()
+    try:
+        _tasks.put_nowait((fn, args, kwargs))
+    except queue.Full:
+        print(f"⚠️ [Tasks] Queue full; running {fn.__name__} inline")
+        _run(fn, args, kwargs)
+
+
+def _work():
+    while True:
+        fn, args, kwargs = _tasks.get()
+        try:
+            _run(fn, args, kwargs)
+        finally:
+            _tasks.task_done()
+
+
+def _run(fn, args, kwargs):
+    try:
+        fn(*args, **kwargs)
+    except Exception as e:
+        print(f"❌ [Tasks] {fn.__name__} failed: {e}")
+
+
+def drain():
+    """Runs every queued task on the calling thread. Returns how many ran."""
+    ran = 0
+    while _tasks is not None:
+        try:
+            fn, args, kwargs = _tasks.get_nowait()
+        except queue.Empty:
+            break
+        try:
+            _run(fn, args, kwargs)
+            ran += 1
+        finally:
+            _tasks.task_done()
+    return ran
+
+
+def pending():
+    """Number of tasks queued and not yet picked up by a worker."""
+    return _tasks.qsize() if _tasks is not None else 0
@@ -12,6 +12,8 @@ export default function ChatInterface({ googleId: propGoogleId }) {
     const [users, setUsers] = useState([]);
     const [selectedUser, setSelectedUser] = useState(null);
     const [messages, setMessages] = useState([]);
+    const [hasOlderMessages, setHasOlderMessages] = useState(false);
+    const [loadingOlder, setLoadingOlder] = useState(false);
     const [socket, setSocket] = useState(null);
     const [loading, setLoading] = useState(true);
     
@@ -31,12 +33,14 @@ export default function ChatInterface({ googleId: propGoogleId }) {
     const usersRef = useRef([]);      
     const dbUserRef = useRef(null);   
     const notificationsRef = useRef([]); 
+    const messagesRef = useRef([]);
 
     // Keep Refs synced with State
     useEffect(() => { selectedUserRef.current = selectedUser; }, [selectedUser]);
     useEffect(() => { usersRef.current = users; }, [users]);
     useEffect(() => { dbUserRef.current = dbUser; }, [dbUser]);
     useEffect(() => { notificationsRef.current = notifications; }, [notifications]); 
+    useEffect(() => { messagesRef.current = messages; }, [messages]);
 
     // Handle Window Resize
     useEffect(() => {
@@ -161,6 +165,7 @@ export default function ChatInterface({ googleId: propGoogleId }) {
                 // ... (deduplication/optimistic update logic)
                 setMessages((prev) => {
                     const isDuplicate = prev.some(m => {
+                        if (m.message_id && msg.message_id) return m.message_id === msg.message_id;
                         if (m.id && msg.id) return m.id === msg.id;
                         if (m.tempId && msg.tempId) return m.tempId === msg.tempId;
                         return false; 
@@ -220,8 +225,26 @@ export default function ChatInterface({ googleId: propGoogleId }) {
             }
         };
 
-        const onLoadMessages = (msgs) => {
-            setMessages(msgs);
+        // Only the latest page arrives on join; older pages are requested on demand
+        const onLoadMessages = (page) => {
+            if (String(page.appointment_id) !== String(selectedUserRef.current?.appointment_id)) return;
+            if (page.delta) {
+                // Reconnect: only messages newer than the last one we had
+                setMessages(prev => {
+                    const known = new Set(prev.map(m => m.message_id).filter(Boolean));
+                    return [...prev, ...page.messages.filter(m => !known.has(m.message_id))];
+                });
+                return;
+            }
+            setMessages(page.messages);
+            setHasOlderMessages(page.has_more);
+        };
+
+        const onOlderMessages = (page) => {
+            setLoadingOlder(false);
+            if (String(page.appointment_id) !== String(selectedUserRef.current?.appointment_id)) return;
+            setMessages(prev => [...page.messages, ...prev]);
+            setHasOlderMessages(page.has_more);
         };
 
         // B. Handle Reconnection
@@ -237,9 +260,12 @@ export default function ChatInterface({ googleId: propGoogleId }) {
             const activeChat = selectedUserRef.current;
             const user = dbUserRef.current;
             if (activeChat && user) {
+                // Ask only for what we missed while disconnected
+                const lastKnown = [...messagesRef.current].reverse().find(m => m.message_id);
                 socket.emit("join_appointment", {
                     appointment_id: activeChat.appointment_id,
-                    user_id: user.id_number
+                    user_id: user.id_number,
+                    last_message_id: lastKnown ? lastKnown.message_id : undefined
                 });
             }
         };
@@ -300,12 +326,14 @@ export default function ChatInterface({ googleId: propGoogleId }) {
 
         socket.on("receive_message", onReceiveMessage);
         socket.on("load_messages", onLoadMessages);
+        socket.on("older_messages", onOlderMessages);
         socket.on("connect", onConnect);
         socket.on("new_global_notification", onNewGlobalNotification); 
 
         return () => {
             socket.off("receive_message", onReceiveMessage);
             socket.off("load_messages", onLoadMessages);
+            socket.off("older_messages", onOlderMessages);
             socket.off("connect", onConnect);
             socket.off("new_global_notification", onNewGlobalNotification); 
         };
@@ -413,9 +441,21 @@ export default function ChatInterface({ googleId: propGoogleId }) {
                 user_id: dbUser.id_number
             });
             setMessages([]); 
+            setHasOlderMessages(false);
         }
     };
 
+    const loadOlderMessages = () => {
+        const oldest = messages.find(m => m.message_id);
+        if (!socket || !selectedUser || !oldest || loadingOlder) return;
+
+        setLoadingOlder(true);
+        socket.emit("load_older_messages", {
+            appointment_id: selectedUser.appointment_id,
+            before: oldest.message_id
+        });
+    };
+
     const sendMessage = (text) => {
         if (!socket || !selectedUser || !dbUser) return;
         
@@ -480,6 +520,9 @@ export default function ChatInterface({ googleId: propGoogleId }) {
                     selectedUser={selectedUser}
                     onSelectUser={handleSelectUser}
                     messages={messages}
+                    hasOlderMessages={hasOlderMessages}
+                    loadingOlder={loadingOlder}
+                    onLoadOlder={loadOlderMessages}
                     onSendMessage={sendMessage}
                     currentUser={dbUser}
                     loading={loading}
@@ -506,6 +549,9 @@ export default function ChatInterface({ googleId: propGoogleId }) {
                         <CurrentChat
                             user={selectedUser}
                             messages={messages}
+                            hasOlderMessages={hasOlderMessages}
+                            loadingOlder={loadingOlder}
+                            onLoadOlder={loadOlderMessages}
                             onSendMessage={sendMessage}
                             currentUser={dbUser}
                         />
@@ -2,17 +2,18 @@ import { useState, useEffect, useRef } from "react";
 import { useNavigate } from "react-router-dom";
 import "./CurrentChat.css";
 
-export default function CurrentChat({ user, messages, onSendMessage, currentUser, onBack }) {
+export default function CurrentChat({ user, messages, hasOlderMessages, loadingOlder, onLoadOlder, onSendMessage, currentUser, onBack }) {
     const [inputText, setInputText] = useState("");
     const [showReportModal, setShowReportModal] = useState(false);
 
     const messagesEndRef = useRef(null);
     const navigate = useNavigate();
 
-    // 1. Auto-scroll
+    // 1. Auto-scroll (only when a newer message arrives, not when older pages are prepended)
+    const lastMessage = messages[messages.length - 1];
     useEffect(() => {
         messagesEndRef.current?.scrollIntoView({ behavior: "smooth" });
-    }, [messages]);
+    }, [lastMessage]);
 
     // 2. Handle sending
     const handleSend = () => {
@@ -141,6 +142,17 @@ export default function CurrentChat({ user, messages, onSendMessage, currentUser
 
                 {/* ── MESSAGES AREA ── */}
                 <div className="flex-grow-1 overflow-auto p-3 chat-messages-area" style={{ minHeight: 0 }}>
+                    {hasOlderMessages && onLoadOlder && (
+                        <div className="text-center mb-3">
+                            <button
+                                className="btn btn-sm btn-outline-secondary"
+                                onClick={onLoadOlder}
+                                disabled={loadingOlder}
+                            >
+                                {loadingOlder ? "Loading..." : "Load earlier messages"}
+                            </button>
+                        </div>
+                    )}
                     {messages.map((msg, index) => {
                         const isMe = msg.sender_id === currentUser.id_number;
 
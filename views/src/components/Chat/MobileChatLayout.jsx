@@ -7,6 +7,9 @@ export default function MobileChatLayout({
     selectedUser,
     onSelectUser,
     messages,
+    hasOlderMessages,
+    loadingOlder,
+    onLoadOlder,
     onSendMessage,
     currentUser,
     loading,
@@ -19,6 +22,9 @@ export default function MobileChatLayout({
                 <CurrentChat
                     user={selectedUser}
                     messages={messages}
+                    hasOlderMessages={hasOlderMessages}
+                    loadingOlder={loadingOlder}
+                    onLoadOlder={onLoadOlder}
                     onSendMessage={onSendMessage}
                     currentUser={currentUser}
                     onBack={onBack} // Pass back function to show arrow